@@ -1,14 +1,236 @@
 # algorithms.py with metrics
+#
+# Each algorithm is written once as a generator "core" that sorts `a` in place,
+# yields (written_indices, active_index, sorted_boundary) for every step and
+# returns its {"comparisons", "moves"} counters. The public functions either
+# collect those steps into a StepTrace or stream them (see SortStream).
+# Passing record=False runs the same core in metrics-only mode: no steps are
+# yielded or stored and the first return value is the sorted list itself.
+# Auxiliary buffers go through _aux so probe.probe_run can count them; on a
+# plain list it returns the buffer untouched. Inside `with memory_profile():`
+# metrics also carry tracemalloc figures (see _run). Every public sort also
+# takes key= and reverse= (see _sort_by_key).
+import sys
 import time
 import math
+import random
+import tracemalloc
+from array import array
+from contextlib import contextmanager
 
+from steptrace import StepTrace
 
-def insertion_sort(arr):
-    a = arr.copy()
-    steps = []
+_memory_profiling = False
+_memory_active = False  # a profiled _run is in progress (nested runs skip)
+
+
+@contextmanager
+def memory_profile():
+    """Add peak_bytes, aux_bytes and trace_bytes to the metrics of every run
+    started inside the block. Uses tracemalloc, so runs are much slower."""
+    global _memory_profiling
+    previous = _memory_profiling
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    _memory_profiling = True
+    try:
+        yield
+    finally:
+        _memory_profiling = previous
+        if started:
+            tracemalloc.stop()
+
+
+def _run(core, a, record):
+    # record=False: the core never yields, so this times the bare algorithm
+    global _memory_active
+    profile = _memory_profiling and not _memory_active
+    if profile:
+        _memory_active = True
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    try:
+        steps = StepTrace(a) if record else None
+        start = time.perf_counter()
+        try:
+            while True:
+                written, active_i, boundary = next(core)
+                steps.record(a, written, active_i, boundary)
+        except StopIteration as stop:
+            counters = stop.value
+        seconds = time.perf_counter() - start
+        metrics = {**counters, "seconds": seconds}
+        if profile:
+            # peak_bytes: everything allocated during the run, trace included;
+            # aux_bytes: the part not held by the trace at the end
+            peak = tracemalloc.get_traced_memory()[1] - base
+            trace_bytes = steps.nbytes if record else 0
+            metrics["peak_bytes"] = peak
+            metrics["aux_bytes"] = max(0, peak - trace_bytes)
+            metrics["trace_bytes"] = trace_bytes
+    finally:
+        if profile:
+            _memory_active = False
+    return (steps if record else a), metrics
+
+
+def _aux(a, buf):
+    # auxiliary buffer for the core sorting `a` (see probe.py)
+    if type(a) is list:
+        return buf
+    return a.probe.aux(buf)
+
+
+def _check_backend(backend):
+    # counting/radix/bucket sort also accept backend="numpy" (kernels_numpy.py)
+    if backend != "python":
+        raise ValueError(f"unknown backend: {backend!r}")
+
+
+# --- key= / reverse= ---
+# key(x) is called exactly once per element, into a compact key array
+# (array("q") for int keys; float keys as their order-preserving int64 bit
+# patterns). Comparison sorts run on decorated keys key * n + index (or
+# -key * n + index for reverse), so they only ever move small ints, never the
+# records, which are permuted once at the end. Counting, radix and bucket
+# sort run on the raw keys, so their mode, passes and buckets follow the key
+# range, and the records are then placed stably by key. Other keys (str, tuple, ...)
+# are decorated as (key, index) tuples, (key, -index) for reverse, and need
+# a comparison sort. Keyed sorts are metrics-only (record=False): a trace
+# would animate the decorated keys, not the records. Metrics are those of the
+# decorated keys, plus "key_calls"/"key_bytes".
+# backend="numpy" and workers= need decorated keys that fit in int64, i.e.
+# int keys with |key| * n < 2**63; workers= rejects float keys up front.
+#
+# The index breaks ties, so with key= or reverse= every sort is stable.
+# Without them, insertion, merge (also with workers=), tim, counting, radix,
+# sample and bucket sort with a stable inner sort (tim, insertion, merge,
+# bucket) keep equal elements in input order; quick sort (both modes), heap
+# sort, shell sort and bucket sort with inner="quick"/"heap"/"shell" do not.
+_INT64_MIN = -(1 << 63)
+
+
+def _float_order_key(k):
+    # int64 whose order matches the float's (IEEE bits, negatives flipped)
+    bits = array("q", array("d", [k + 0.0]).tobytes())[0]  # + 0.0: -0.0 == 0.0
+    return bits if bits >= 0 else _INT64_MIN - 1 - bits
+
+
+def _key_array(values, key):
+    # (keys, kind): kind is "int", "float" (stored as order keys) or "other"
+    keys = [key(v) for v in values] if key is not None else list(values)
+    if all(type(k) is int or type(k) is bool for k in keys):
+        try:
+            return array("q", keys), "int"
+        except OverflowError:
+            return keys, "int"  # big ints are still ints
+    if all(type(k) in (int, bool, float) for k in keys):
+        return array("q", [_float_order_key(k) for k in keys]), "float"
+    return keys, "other"
+
+
+def _sort_by_key(sort, arr, key, reverse, record, numeric_only=False, int64_keys=False,
+                 by_placement=False, **kwargs):
+    """sort(decorated keys, record=False, **kwargs), then the records permuted once.
+
+    by_placement: sort the raw keys instead and place the records stably
+    after it (the non-comparison sorts, whose cost depends on the key range).
+    """
+    if record:
+        raise ValueError("key=/reverse= sorts do not record steps; use record=False")
+    n = len(arr)
+    keys, kind = _key_array(arr, key)
+    if int64_keys and kind == "float":
+        # float order keys span all of int64, times n they never fit
+        raise TypeError(f"{sort.__name__} with workers needs int keys, not float keys")
+    if int64_keys and kind == "int" and keys:
+        if (max(-min(keys), max(keys)) + 1) * n > 1 << 63:
+            raise OverflowError(f"{sort.__name__} with workers needs |key| * n < 2**63")
+    if kind == "other" and numeric_only:
+        raise TypeError(f"{sort.__name__} needs int or float keys")
+    key_metrics = {
+        "key_calls": n if key is not None else 0,
+        "key_bytes": keys.itemsize * len(keys) if isinstance(keys, array) else sys.getsizeof(keys),
+    }
+    sign = -1 if reverse else 1
+
+    if by_placement:
+        signed = [sign * k for k in keys] if reverse else list(keys)
+        out, metrics = sort(signed, record=False, **kwargs)
+        # the records with key k fill the slots from k's first position in
+        # the sorted keys onwards, in input order
+        slot = {}
+        for p, k in enumerate(out):
+            slot.setdefault(k, p)
+        result = [None] * n
+        for i, k in enumerate(signed):
+            p = slot[k]
+            slot[k] = p + 1
+            result[p] = arr[i]
+        return result, {**metrics, **key_metrics}
+
+    if kind != "other":
+        decorated = [sign * k * n + i for i, k in enumerate(keys)]
+        out, metrics = sort(decorated, record=False, **kwargs)
+        return [arr[d % n] for d in out], {**metrics, **key_metrics}
+
+    # reverse: ascending by (key, -index), then the output reversed, which
+    # puts equal keys back in input order
+    decorated = [(k, sign * i) for i, k in enumerate(keys)]
+    out, metrics = sort(decorated, record=False, **kwargs)
+    if reverse:
+        return [arr[-i] for _, i in reversed(out)], {**metrics, **key_metrics}
+    return [arr[i] for _, i in out], {**metrics, **key_metrics}
+
+
+class SortStream:
+    """Iterator over the steps of one sort, produced as the sort runs.
+
+    Each event is {"array", "written", "active_index", "sorted_boundary"}.
+    "array" is the live working list (copy it to keep a frame), "written"
+    the indices changed by that step. Once the stream is exhausted,
+    `metrics` holds the usual dict; "seconds" only counts time spent
+    inside the algorithm, not in the consumer.
+    """
+
+    def __init__(self, core, a):
+        self._core = core
+        self.array = a
+        self.metrics = None
+        self._seconds = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.metrics is not None:
+            raise StopIteration
+        start = time.perf_counter()
+        try:
+            written, active_i, boundary = next(self._core)
+        except StopIteration as stop:
+            self._seconds += time.perf_counter() - start
+            self.metrics = {**stop.value, "seconds": self._seconds}
+            raise StopIteration
+        self._seconds += time.perf_counter() - start
+        return {
+            "array": self.array,
+            "written": written,
+            "active_index": active_i,
+            "sorted_boundary": boundary,
+        }
+
+    def run(self):
+        """Drain the remaining steps and return the metrics."""
+        for _ in self:
+            pass
+        return self.metrics
+
+
+def _insertion_sort(a, record=True):
     comparisons = 0
     moves = 0
-    start = time.perf_counter()
     for i in range(1, len(a)):
         key = a[i]
         j = i - 1
@@ -18,26 +240,33 @@ def insertion_sort(arr):
             if a[j] > key:
                 a[j + 1] = a[j]
                 moves += 1
-                steps.append(
-                    {"array": a.copy(), "active_index": j + 1, "sorted_boundary": i}
-                )
+                if record:
+                    yield (j + 1,), j + 1, i
                 j -= 1
             else:
                 break
         a[j + 1] = key
         moves += 1
-        steps.append({"array": a.copy(), "active_index": j + 1, "sorted_boundary": i})
-    end = time.perf_counter()
-    metrics = {"comparisons": comparisons, "moves": moves, "seconds": end - start}
-    return steps, metrics
+        if record:
+            yield (j + 1,), j + 1, i
+    return {"comparisons": comparisons, "moves": moves}
 
 
-def merge_sort(arr):
+def insertion_sort(arr, record=True, key=None, reverse=False):
+    if key is not None or reverse:
+        return _sort_by_key(insertion_sort, arr, key, reverse, record)
     a = arr.copy()
-    steps = []
+    return _run(_insertion_sort(a, record=record), a, record)
+
+
+def insertion_sort_stream(arr):
+    a = arr.copy()
+    return SortStream(_insertion_sort(a), a)
+
+
+def _merge_sort(a, record=True):
     comparisons = 0
     moves = 0
-    start = time.perf_counter()
 
     def merge(left, mid, right):
         nonlocal comparisons, moves
@@ -53,16 +282,14 @@ def merge_sort(arr):
             if left_part[i] <= right_part[j]:
                 a[k] = left_part[i]
                 moves += 1
-                steps.append(
-                    {"array": a.copy(), "active_index": k, "sorted_boundary": right}
-                )
+                if record:
+                    yield (k,), k, right
                 i += 1
             else:
                 a[k] = right_part[j]
                 moves += 1
-                steps.append(
-                    {"array": a.copy(), "active_index": k, "sorted_boundary": right}
-                )
+                if record:
+                    yield (k,), k, right
                 j += 1
             k += 1
 
@@ -70,9 +297,8 @@ def merge_sort(arr):
         while i < len(left_part):
             a[k] = left_part[i]
             moves += 1
-            steps.append(
-                {"array": a.copy(), "active_index": k, "sorted_boundary": right}
-            )
+            if record:
+                yield (k,), k, right
             i += 1
             k += 1
 
@@ -80,9 +306,8 @@ def merge_sort(arr):
         while j < len(right_part):
             a[k] = right_part[j]
             moves += 1
-            steps.append(
-                {"array": a.copy(), "active_index": k, "sorted_boundary": right}
-            )
+            if record:
+                yield (k,), k, right
             j += 1
             k += 1
 
@@ -90,28 +315,380 @@ def merge_sort(arr):
         if left >= right:
             return
         mid = (left + right) // 2
-        sort(left, mid)
-        sort(mid + 1, right)
-        merge(left, mid, right)
+        yield from sort(left, mid)
+        yield from sort(mid + 1, right)
+        yield from merge(left, mid, right)
 
     if len(a) > 0:
-        sort(0, len(a) - 1)
+        yield from sort(0, len(a) - 1)
 
-    end = time.perf_counter()
-    metrics = {"comparisons": comparisons, "moves": moves, "seconds": end - start}
-    return steps, metrics
+    return {"comparisons": comparisons, "moves": moves}
 
 
-def quick_sort(arr):
+def merge_sort(arr, record=True, workers=None, speedup=False, key=None, reverse=False):
+    if key is not None or reverse:
+        return _sort_by_key(merge_sort, arr, key, reverse, record, numeric_only=workers is not None,
+                            int64_keys=workers is not None, workers=workers, speedup=speedup)
+    if workers is not None:
+        # multi-process version (parallel.py); metrics-only
+        from parallel import parallel_merge_sort
+        return parallel_merge_sort(arr, workers, record=record, speedup=speedup)
     a = arr.copy()
-    steps = []
+    return _run(_merge_sort(a, record=record), a, record)
+
+
+def merge_sort_stream(arr):
+    a = arr.copy()
+    return SortStream(_merge_sort(a), a)
+
+
+# --- Tim Sort: adaptive natural merge sort ---
+# Detects ascending / strictly descending runs (the latter reversed in place),
+# extends runs shorter than minrun with binary insertion, keeps a run stack
+# obeying the len[i-2] > len[i-1] + len[i] and len[i-1] > len[i] invariants
+# and merges with galloping once one side keeps winning. Merge steps report
+# the end of the merged region as sorted_boundary, as in merge_sort.
+MIN_GALLOP = 7
+
+
+def _min_run(n):
+    r = 0
+    while n >= 64:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+
+def _tim_sort(a, record=True):
     comparisons = 0
     moves = 0
+    min_gallop = MIN_GALLOP
+    runs = []  # [base, length] of pending runs
+
+    def gallop_left(key, arr, base, n, hint):
+        # k such that arr[base + k - 1] < key <= arr[base + k]
+        nonlocal comparisons
+        last_ofs, ofs = 0, 1
+        comparisons += 1
+        if arr[base + hint] < key:
+            max_ofs = n - hint
+            while ofs < max_ofs:
+                comparisons += 1
+                if arr[base + hint + ofs] < key:
+                    last_ofs = ofs
+                    ofs = (ofs << 1) + 1
+                else:
+                    break
+            ofs = min(ofs, max_ofs)
+            last_ofs, ofs = last_ofs + hint, ofs + hint
+        else:
+            max_ofs = hint + 1
+            while ofs < max_ofs:
+                comparisons += 1
+                if arr[base + hint - ofs] < key:
+                    break
+                last_ofs = ofs
+                ofs = (ofs << 1) + 1
+            ofs = min(ofs, max_ofs)
+            last_ofs, ofs = hint - ofs, hint - last_ofs
+        last_ofs += 1
+        while last_ofs < ofs:
+            m = last_ofs + ((ofs - last_ofs) >> 1)
+            comparisons += 1
+            if arr[base + m] < key:
+                last_ofs = m + 1
+            else:
+                ofs = m
+        return ofs
+
+    def gallop_right(key, arr, base, n, hint):
+        # k such that arr[base + k - 1] <= key < arr[base + k]
+        nonlocal comparisons
+        last_ofs, ofs = 0, 1
+        comparisons += 1
+        if key < arr[base + hint]:
+            max_ofs = hint + 1
+            while ofs < max_ofs:
+                comparisons += 1
+                if key < arr[base + hint - ofs]:
+                    last_ofs = ofs
+                    ofs = (ofs << 1) + 1
+                else:
+                    break
+            ofs = min(ofs, max_ofs)
+            last_ofs, ofs = hint - ofs, hint - last_ofs
+        else:
+            max_ofs = n - hint
+            while ofs < max_ofs:
+                comparisons += 1
+                if key < arr[base + hint + ofs]:
+                    break
+                last_ofs = ofs
+                ofs = (ofs << 1) + 1
+            ofs = min(ofs, max_ofs)
+            last_ofs, ofs = last_ofs + hint, ofs + hint
+        last_ofs += 1
+        while last_ofs < ofs:
+            m = last_ofs + ((ofs - last_ofs) >> 1)
+            comparisons += 1
+            if key < arr[base + m]:
+                ofs = m
+            else:
+                last_ofs = m + 1
+        return ofs
 
-    def swap(i, j, *, active_i=None, sorted_b=None):
+    def count_run(lo, hi):
+        nonlocal comparisons
+        if lo + 1 == hi:
+            return 1, False
+        comparisons += 1
+        n = 2
+        if a[lo + 1] < a[lo]:
+            while lo + n < hi:
+                comparisons += 1
+                if a[lo + n] < a[lo + n - 1]:
+                    n += 1
+                else:
+                    break
+            return n, True
+        while lo + n < hi:
+            comparisons += 1
+            if a[lo + n] < a[lo + n - 1]:
+                break
+            n += 1
+        return n, False
+
+    def reverse(lo, hi):
         nonlocal moves
-        if i == j:
+        i, j = lo, hi - 1
+        while i < j:
+            a[i], a[j] = a[j], a[i]
+            moves += 2
+            if record:
+                yield (i, j), i, -1
+            i += 1
+            j -= 1
+
+    def binary_insertion(lo, hi, start):
+        # a[lo:start] is sorted; insert a[start:hi] one by one
+        nonlocal comparisons, moves
+        for i in range(start, hi):
+            pivot = a[i]
+            left, right = lo, i
+            while left < right:
+                m = (left + right) >> 1
+                comparisons += 1
+                if pivot < a[m]:
+                    right = m
+                else:
+                    left = m + 1
+            if left < i:
+                a[left + 1 : i + 1] = a[left:i]
+                a[left] = pivot
+                moves += i - left + 1
+                if record:
+                    yield tuple(range(left, i + 1)), left, i
+
+    def put(k, v, boundary):
+        nonlocal moves
+        a[k] = v
+        moves += 1
+        if record:
+            return ((k,), k, boundary)
+
+    def merge_lo(base1, len1, base2, len2):
+        # left run is the smaller one: copy it out and merge forwards
+        nonlocal comparisons, min_gallop
+        tmp = a[base1 : base1 + len1]
+        i, j, k = 0, base2, base1
+        end2 = base2 + len2
+        boundary = end2 - 1
+        while i < len1 and j < end2:
+            count1 = count2 = 0
+            while i < len1 and j < end2:
+                comparisons += 1
+                if a[j] < tmp[i]:
+                    step = put(k, a[j], boundary)
+                    j += 1
+                    count2 += 1
+                    count1 = 0
+                else:
+                    step = put(k, tmp[i], boundary)
+                    i += 1
+                    count1 += 1
+                    count2 = 0
+                k += 1
+                if step:
+                    yield step
+                if count1 >= min_gallop or count2 >= min_gallop:
+                    break
+            # galloping mode: move whole blocks while either side keeps winning
+            while i < len1 and j < end2:
+                c1 = gallop_right(a[j], tmp, i, len1 - i, 0)
+                for _ in range(c1):
+                    step = put(k, tmp[i], boundary)
+                    i += 1
+                    k += 1
+                    if step:
+                        yield step
+                if i >= len1:
+                    break
+                c2 = gallop_left(tmp[i], a, j, end2 - j, 0)
+                for _ in range(c2):
+                    step = put(k, a[j], boundary)
+                    j += 1
+                    k += 1
+                    if step:
+                        yield step
+                if c1 < MIN_GALLOP and c2 < MIN_GALLOP:
+                    min_gallop += 1
+                    break
+                min_gallop = max(1, min_gallop - 1)
+        # leftovers of the right run are already in place
+        while i < len1:
+            step = put(k, tmp[i], boundary)
+            i += 1
+            k += 1
+            if step:
+                yield step
+
+    def merge_hi(base1, len1, base2, len2):
+        # right run is the smaller one: copy it out and merge backwards
+        nonlocal comparisons, min_gallop
+        tmp = a[base2 : base2 + len2]
+        i, j, k = len2 - 1, base1 + len1 - 1, base2 + len2 - 1
+        boundary = k
+        while i >= 0 and j >= base1:
+            count1 = count2 = 0
+            while i >= 0 and j >= base1:
+                comparisons += 1
+                if tmp[i] < a[j]:
+                    step = put(k, a[j], boundary)
+                    j -= 1
+                    count1 += 1
+                    count2 = 0
+                else:
+                    step = put(k, tmp[i], boundary)
+                    i -= 1
+                    count2 += 1
+                    count1 = 0
+                k -= 1
+                if step:
+                    yield step
+                if count1 >= min_gallop or count2 >= min_gallop:
+                    break
+            while i >= 0 and j >= base1:
+                # left-run elements greater than tmp[i] all go to the right
+                p = gallop_right(tmp[i], a, base1, j - base1 + 1, j - base1)
+                c1 = j - base1 + 1 - p
+                for _ in range(c1):
+                    step = put(k, a[j], boundary)
+                    j -= 1
+                    k -= 1
+                    if step:
+                        yield step
+                if j < base1:
+                    break
+                p = gallop_left(a[j], tmp, 0, i + 1, i)
+                c2 = i + 1 - p
+                for _ in range(c2):
+                    step = put(k, tmp[i], boundary)
+                    i -= 1
+                    k -= 1
+                    if step:
+                        yield step
+                if c1 < MIN_GALLOP and c2 < MIN_GALLOP:
+                    min_gallop += 1
+                    break
+                min_gallop = max(1, min_gallop - 1)
+        # leftovers of the left run are already in place
+        while i >= 0:
+            step = put(k, tmp[i], boundary)
+            i -= 1
+            k -= 1
+            if step:
+                yield step
+
+    def merge_at(idx):
+        base1, len1 = runs[idx]
+        base2, len2 = runs[idx + 1]
+        runs[idx] = [base1, len1 + len2]
+        del runs[idx + 1]
+        # skip the prefix of run 1 / suffix of run 2 that is already in place
+        k = gallop_right(a[base2], a, base1, len1, 0)
+        base1 += k
+        len1 -= k
+        if len1 == 0:
             return
+        len2 = gallop_left(a[base1 + len1 - 1], a, base2, len2, len2 - 1)
+        if len2 == 0:
+            return
+        if len1 <= len2:
+            yield from merge_lo(base1, len1, base2, len2)
+        else:
+            yield from merge_hi(base1, len1, base2, len2)
+
+    def merge_collapse():
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or (
+                n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]
+            ):
+                if runs[n - 1][1] < runs[n + 1][1]:
+                    n -= 1
+            elif runs[n][1] > runs[n + 1][1]:
+                break
+            yield from merge_at(n)
+
+    def merge_force_collapse():
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if n > 0 and runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+            yield from merge_at(n)
+
+    n = len(a)
+    natural_runs = 0
+    if n > 1:
+        minrun = _min_run(n)
+        lo = 0
+        while lo < n:
+            run_len, descending = count_run(lo, n)
+            natural_runs += 1
+            if descending:
+                yield from reverse(lo, lo + run_len)
+            if run_len < minrun:
+                force = min(minrun, n - lo)
+                yield from binary_insertion(lo, lo + force, lo + run_len)
+                run_len = force
+            runs.append([lo, run_len])
+            yield from merge_collapse()
+            lo += run_len
+        yield from merge_force_collapse()
+
+    return {"comparisons": comparisons, "moves": moves, "runs": natural_runs}
+
+
+def tim_sort(arr, record=True, key=None, reverse=False):
+    if key is not None or reverse:
+        return _sort_by_key(tim_sort, arr, key, reverse, record)
+    a = arr.copy()
+    return _run(_tim_sort(a, record=record), a, record)
+
+
+def tim_sort_stream(arr):
+    a = arr.copy()
+    return SortStream(_tim_sort(a), a)
+
+
+def _quick_sort(a, record=True):
+    comparisons = 0
+    moves = 0
+
+    def swap(i, j):
+        nonlocal moves
+        if i == j:
+            return False
         (
             a[i],
             a[j],
@@ -120,13 +697,7 @@ def quick_sort(arr):
             a[i],
         )
         moves += 2
-        steps.append(
-            {
-                "array": a.copy(),
-                "active_index": i if active_i is None else active_i,
-                "sorted_boundary": -1 if sorted_b is None else sorted_b,
-            }
-        )
+        return True
 
     def partition(low, high):
         nonlocal comparisons, moves
@@ -137,140 +708,428 @@ def quick_sort(arr):
             comparisons += 1
             if a[j] <= pivot:
                 i += 1
-                swap(i, j, active_i=j)
+                if swap(i, j) and record:
+                    yield (i, j), j, -1
         # put pivot back to place
-        swap(i + 1, high, active_i=i + 1, sorted_b=i + 1)
+        if swap(i + 1, high) and record:
+            yield (i + 1, high), i + 1, i + 1
         return i + 1
 
     def qs(low, high):
         if low < high:
-            p = partition(low, high)
-            qs(low, p - 1)
-            qs(p + 1, high)
+            p = yield from partition(low, high)
+            yield from qs(low, p - 1)
+            yield from qs(p + 1, high)
 
-    start = time.perf_counter()
     if a:
-        qs(0, len(a) - 1)
-    seconds = time.perf_counter() - start
+        yield from qs(0, len(a) - 1)
+
+    return {"comparisons": comparisons, "moves": moves}
+
+
+# --- Introsort: iterative quick sort with ninther pivots ---
+# Explicit stack instead of recursion (smaller side handled first, so the
+# stack stays O(log n)), median-of-three / Tukey ninther pivot moved to
+# a[high] for the usual Lomuto partition, heap sort once a range exceeds the
+# 2*log2(n) depth limit and insertion sort for ranges of INTRO_SMALL or less.
+# Steps and metrics follow _quick_sort: a swap is 2 moves, sorted_boundary
+# marks an element that reached its final position.
+INTRO_SMALL = 16
+
+
+def _introsort(a, record=True):
+    comparisons = 0
+    moves = 0
 
-    metrics = {"comparisons": comparisons, "moves": moves, "seconds": seconds}
-    return steps, metrics
+    def swap(i, j):
+        nonlocal moves
+        if i == j:
+            return False
+        a[i], a[j] = a[j], a[i]
+        moves += 2
+        return True
+
+    def med3(i, j, k):
+        nonlocal comparisons
+        comparisons += 1
+        if a[i] < a[j]:
+            comparisons += 1
+            if a[j] < a[k]:
+                return j
+            comparisons += 1
+            return k if a[i] < a[k] else i
+        comparisons += 1
+        if a[i] < a[k]:
+            return i
+        comparisons += 1
+        return k if a[j] < a[k] else j
+
+    def choose_pivot(low, high):
+        mid = (low + high) // 2
+        if high - low < 40:
+            return med3(low, mid, high)
+        step = (high - low) // 8
+        return med3(
+            med3(low, low + step, low + 2 * step),
+            med3(mid - step, mid, mid + step),
+            med3(high - 2 * step, high - step, high),
+        )
+
+    def partition(low, high):
+        nonlocal comparisons
+        p = choose_pivot(low, high)
+        if swap(p, high) and record:
+            yield (p, high), p, -1
+        pivot = a[high]
+        i = low - 1
+        for j in range(low, high):
+            comparisons += 1
+            if a[j] <= pivot:
+                i += 1
+                if swap(i, j) and record:
+                    yield (i, j), j, -1
+        if swap(i + 1, high) and record:
+            yield (i + 1, high), i + 1, i + 1
+        return i + 1
+
+    def insertion(low, high):
+        nonlocal comparisons, moves
+        for i in range(low + 1, high + 1):
+            key = a[i]
+            j = i - 1
+            while j >= low:
+                comparisons += 1
+                if a[j] > key:
+                    a[j + 1] = a[j]
+                    moves += 1
+                    if record:
+                        yield (j + 1,), j + 1, -1
+                    j -= 1
+                else:
+                    break
+            a[j + 1] = key
+            moves += 1
+            if record:
+                yield (j + 1,), j + 1, -1
 
+    def heap_range(low, high):
+        size = high - low + 1
 
-def counting_sort(arr, k=None):
+        def sift(root, end):
+            nonlocal comparisons
+            while True:
+                largest = root
+                l = 2 * root + 1
+                r = l + 1
+                if l < end:
+                    comparisons += 1
+                    if a[low + l] > a[low + largest]:
+                        largest = l
+                if r < end:
+                    comparisons += 1
+                    if a[low + r] > a[low + largest]:
+                        largest = r
+                if largest == root:
+                    return
+                if swap(low + root, low + largest) and record:
+                    yield (low + root, low + largest), low + root, -1
+                root = largest
+
+        for i in range(size // 2 - 1, -1, -1):
+            yield from sift(i, size)
+        for end in range(size - 1, 0, -1):
+            if swap(low, low + end) and record:
+                yield (low, low + end), low + end, low + end
+            yield from sift(0, end)
+
+    if len(a) > 1:
+        stack = [(0, len(a) - 1, 2 * int(math.log2(len(a))))]
+        while stack:
+            low, high, depth = stack.pop()
+            if high - low + 1 <= INTRO_SMALL:
+                yield from insertion(low, high)
+            elif depth == 0:
+                yield from heap_range(low, high)
+            else:
+                p = yield from partition(low, high)
+                left, right = (low, p - 1), (p + 1, high)
+                if left[1] - left[0] > right[1] - right[0]:
+                    left, right = right, left
+                # push the larger side first so the smaller one is handled next
+                if right[0] < right[1]:
+                    stack.append((right[0], right[1], depth - 1))
+                if left[0] < left[1]:
+                    stack.append((left[0], left[1], depth - 1))
+
+    return {"comparisons": comparisons, "moves": moves}
+
+
+_QUICK_MODES = {"lomuto": _quick_sort, "introsort": _introsort}
+
+
+def _quick_core(mode):
+    if mode not in _QUICK_MODES:
+        raise ValueError(f"unknown quick sort mode: {mode!r}")
+    return _QUICK_MODES[mode]
+
+
+def quick_sort(arr, record=True, mode="lomuto", key=None, reverse=False):
+    if key is not None or reverse:
+        return _sort_by_key(quick_sort, arr, key, reverse, record, mode=mode)
+    core = _quick_core(mode)
+    a = arr.copy()
+    return _run(core(a, record=record), a, record)
+
+
+def quick_sort_stream(arr, mode="lomuto"):
+    core = _quick_core(mode)
     a = arr.copy()
-    steps = []
+    return SortStream(core(a), a)
+
+
+# --- Counting Sort with offset, sparse and radix modes ---
+# The histogram covers [min, max] instead of [0, max], so negative values work
+# and a large minimum costs nothing. When the span is much larger than n
+# ("auto" mode) a dense list would be mostly zeros: with few distinct values a
+# dict histogram is used (its keys ordered by radix sort, still comparison
+# free), otherwise the whole input falls back to radix_sort_lsd(base=None). metrics gain
+# "mode" and "histogram_bytes" (size of the counting structures).
+DENSE_SPAN_FACTOR = 4
+
+
+def _counting_sort(a, k=None, record=True, mode="auto"):
     comparisons = 0
     moves = 0
 
     if not a:
-        return steps, {"comparisons": 0, "moves": 0, "seconds": 0.0}
+        return {"comparisons": 0, "moves": 0, "mode": mode, "histogram_bytes": 0}
+    if mode not in ("auto", "dense", "sparse", "radix"):
+        raise ValueError(f"unknown counting sort mode: {mode!r}")
+
+    n = len(a)
+    if k is not None:
+        # legacy explicit histogram size: values in [0, k)
+        lo, span, mode = 0, k, "dense"
+    else:
+        lo = min(a)
+        span = max(a) - lo + 1
+
+    hist = None
+    if mode == "auto":
+        if span <= DENSE_SPAN_FACTOR * n + 256:
+            mode = "dense"
+        else:
+            hist = {}
+            for v in a:
+                hist[v] = hist.get(v, 0) + 1
+            mode = "sparse" if len(hist) * 4 <= n else "radix"
 
-    if k is None:
-        k = max(a) + 1
+    if mode == "radix":
+        counters = yield from _radix_sort_lsd(a, None, record=record)
+        return {
+            **counters,
+            "mode": "radix",
+            "histogram_bytes": sys.getsizeof([0] * counters["base"]),
+        }
 
-    start = time.perf_counter()
+    out = _aux(a, [0] * n)
+    if mode == "dense":
+        # count
+        count = _aux(a, [0] * span)
+        for v in a:
+            count[v - lo] += 1
+        histogram_bytes = sys.getsizeof(count)
+        # prefix sum
+        for i in range(1, span):
+            count[i] += count[i - 1]
 
-    # count
-    count = [0] * k
-    for v in a:
-        count[v] += 1
-    # prefix sum
-    for i in range(1, k):
-        count[i] += count[i - 1]
+        for v in reversed(a):
+            count[v - lo] -= 1
+            out[count[v - lo]] = v
+    else:
+        if hist is None:
+            hist = {}
+            for v in a:
+                hist[v] = hist.get(v, 0) + 1
+        # order the distinct keys without comparisons, then prefix-sum them
+        keys = _aux(a, [v - lo for v in hist])
+        _run(_radix_sort_lsd(keys, None, record=False), keys, False)
+        start = {}
+        total = 0
+        for key in keys:
+            start[key + lo] = total
+            total += hist[key + lo]
+        histogram_bytes = sys.getsizeof(hist) + sys.getsizeof(start) + sys.getsizeof(keys)
 
-    out = [0] * len(a)
-    for v in reversed(a):
-        count[v] -= 1
-        out[count[v]] = v
+        for v in a:
+            out[start[v]] = v
+            start[v] += 1
 
     for i, v in enumerate(out):
         a[i] = v
         moves += 1
-        steps.append({"array": a.copy(), "active_index": i, "sorted_boundary": i})
+        if record:
+            yield (i,), i, i
 
-    seconds = time.perf_counter() - start
-    metrics = {"comparisons": comparisons, "moves": moves, "seconds": seconds}
-    return steps, metrics
+    return {
+        "comparisons": comparisons,
+        "moves": moves,
+        "mode": mode,
+        "histogram_bytes": histogram_bytes,
+    }
 
 
-def radix_sort_lsd(arr, base=10):
+def counting_sort(arr, k=None, record=True, backend="python", mode="auto", key=None,
+                  reverse=False):
+    if key is not None or reverse:
+        # k bounds the values, not the keys, so it does not carry over
+        return _sort_by_key(counting_sort, arr, key, reverse, record, numeric_only=True,
+                            by_placement=True, backend=backend, mode=mode)
+    if backend == "numpy":
+        from kernels_numpy import counting_sort_np
+        return counting_sort_np(arr, k, record=record, mode=mode)
+    _check_backend(backend)
     a = arr.copy()
-    steps = []
+    return _run(_counting_sort(a, k, record=record, mode=mode), a, record)
+
+
+def counting_sort_stream(arr, k=None, mode="auto"):
+    a = arr.copy()
+    return SortStream(_counting_sort(a, k, mode=mode), a)
+
+
+# --- Radix Sort (LSD) ---
+# Power-of-two bases (and base=None, which picks one) extract digits with
+# shifts and masks instead of // and %. base=None chooses the digit width
+# that minimises passes * (n + 2**bits) for the actual key width, so 32/64-bit
+# keys take a few passes. Negative values are handled by flipping the sign
+# bit: keys get a 2**(w-1) bias, w being the two's complement width of the
+# data. A pass in which every key has the same digit is skipped.
+# metrics gain "base", "passes" (executed) and "skipped_passes".
+def _choose_radix_bits(n, key_bits):
+    if key_bits == 0:
+        return 8
+    best_bits, best_cost = 1, None
+    for bits in range(1, 17):
+        cost = -(-key_bits // bits) * (n + (1 << bits))
+        if best_cost is None or cost < best_cost:
+            best_bits, best_cost = bits, cost
+    return best_bits
+
+
+def _radix_keys(minv, maxv):
+    # bias that maps signed values onto non-negative keys (sign-bit flip)
+    if minv >= 0:
+        return 0, maxv
+    # ~minv is the magnitude bits of minv: -2**k fits in k + 1 bits
+    width = max((~minv).bit_length(), maxv.bit_length()) + 1
+    bias = 1 << (width - 1)
+    return bias, maxv + bias
+
+
+def _radix_sort_lsd(a, base=10, record=True):
     comparisons = 0
     moves = 0
 
     if not a:
-        return steps, {"comparisons": 0, "moves": 0, "seconds": 0.0}
-    if base < 2:
+        return {"comparisons": 0, "moves": 0, "base": base, "passes": 0, "skipped_passes": 0}
+    if base is not None and base < 2:
         raise ValueError("radix base must be >= 2")
 
-    start = time.perf_counter()
-
-    def digit(x, exp):
-        return (x // exp) % base
+    n = len(a)
+    bias, max_key = _radix_keys(min(a), max(a))
+    if base is None:
+        base = 1 << _choose_radix_bits(n, max_key.bit_length())
+    bits = base.bit_length() - 1 if base & (base - 1) == 0 else None
+    mask = base - 1
 
+    passes = skipped = 0
     exp = 1
-    maxv = max(a)
+    shift = 0
 
     # for each digit place
-    while maxv // exp > 0:
-        # stable counting sort by current digit
-        count = [0] * base
+    while max_key >= exp:
+        # digits of the current place, by shift/mask when the base allows it
+        if bits is not None:
+            digits = _aux(a, [((v + bias) >> shift) & mask for v in a])
+        else:
+            digits = _aux(a, [((v + bias) // exp) % base for v in a])
+        exp *= base
+        shift += bits or 0
 
         # count
-        for v in a:
-            d = digit(v, exp)
+        count = _aux(a, [0] * base)
+        for d in digits:
             count[d] += 1
+        if n in count:
+            # every key has the same digit here: the pass would not reorder
+            skipped += 1
+            continue
+        passes += 1
 
         # prefix sums
         for i in range(1, base):
             count[i] += count[i - 1]
 
         # build output(scan from right)
-        out = [0] * len(a)
-        for i in range(len(a) - 1, -1, -1):
-            v = a[i]
-            d = digit(v, exp)
+        out = _aux(a, [0] * n)
+        for i in range(n - 1, -1, -1):
+            d = digits[i]
             count[d] -= 1
-            out[count[d]] = v
+            out[count[d]] = a[i]
 
         for i, v in enumerate(out):
             a[i] = v
             moves += 1
-            steps.append({"array": a.copy(), "active_index": i, "sorted_boundary": i})
-        exp *= base
+            if record:
+                yield (i,), i, i
 
-    seconds = time.perf_counter() - start
-    metrics = {"comparisons": comparisons, "moves": moves, "seconds": seconds}
-    return steps, metrics
+    return {
+        "comparisons": comparisons,
+        "moves": moves,
+        "base": base,
+        "passes": passes,
+        "skipped_passes": skipped,
+    }
+
+
+def radix_sort_lsd(arr, base=10, record=True, backend="python", key=None, reverse=False):
+    if key is not None or reverse:
+        return _sort_by_key(radix_sort_lsd, arr, key, reverse, record, numeric_only=True,
+                            by_placement=True, base=base, backend=backend)
+    if backend == "numpy":
+        from kernels_numpy import radix_sort_lsd_np
+        return radix_sort_lsd_np(arr, base, record=record)
+    _check_backend(backend)
+    a = arr.copy()
+    return _run(_radix_sort_lsd(a, base, record=record), a, record)
+
+
+def radix_sort_lsd_stream(arr, base=10):
+    a = arr.copy()
+    return SortStream(_radix_sort_lsd(a, base), a)
 
 # --- Heap Sort (max-heap, in-place) with metrics & step recording ---
-# steps: her adımda {"array": a.copy(), "active_index": i, "sorted_boundary": b}
+# steps: her adımda (yazılan indeksler, active_index, sorted_boundary) üretilir
 # - active_index: o karede yeni yazılan / swap’e giren indeks
 # - sorted_boundary: heapsort’ta sıralı kuyruk (suffix) başlangıcı; j >= boundary -> "sorted"
 # metrics:
 # - comparisons: her a[l] > a[m] veya a[r] > a[m] kontrolü 1 karşılaştırma
 # - moves: diziye her yazma 1; swap 2 move
-def heap_sort(arr):
-    a = arr.copy()
-    steps = []
+def _heap_sort(a, record=True):
     comparisons = 0
     moves = 0
 
     heap_sorted = -1
 
-    def snapshot(active_i, boundary):
-        steps.append({"array": a.copy(), "active_index": active_i, "sorted_boundary": boundary})
-
     def swap(i, j):
         nonlocal moves
         if i == j:
-            return
+            return False
         a[i], a[j] = a[j], a[i]
         moves += 2
-        snapshot(i, heap_sorted)
-    
+        return True
+
     def heapify(n, i):
         nonlocal comparisons
         while True:
@@ -289,44 +1148,47 @@ def heap_sort(arr):
             if largest == i:
                 break
 
-            swap(i, largest)
+            if swap(i, largest) and record:
+                yield (i, largest), i, heap_sorted
             i = largest
 
-    start = time.perf_counter()
-
     n = len(a)
     if n <= 1:
-        metrics = {"comparisons": 0, "moves": 0, "seconds": 0.0}
-        return steps, metrics
-    
+        return {"comparisons": 0, "moves": 0}
+
     # build max heap
     for i in range(n // 2 - 1, -1, -1):
-        heapify(n,i)
+        yield from heapify(n,i)
     # extract max
     for end in range(n-1, 0, -1):
-        swap(0, end)
+        if swap(0, end) and record:
+            yield (0, end), 0, heap_sorted
         heap_sorted = end
-        heapify(end, 0)
-    
-    seconds = time.perf_counter() - start
-    metrics = {"comparisons": comparisons, "moves": moves, "seconds": seconds}
-    return steps, metrics
+        yield from heapify(end, 0)
 
-def shell_sort(arr):
+    return {"comparisons": comparisons, "moves": moves}
+
+
+def heap_sort(arr, record=True, key=None, reverse=False):
+    if key is not None or reverse:
+        return _sort_by_key(heap_sort, arr, key, reverse, record)
     a = arr.copy()
-    steps = []
+    return _run(_heap_sort(a, record=record), a, record)
+
+
+def heap_sort_stream(arr):
+    a = arr.copy()
+    return SortStream(_heap_sort(a), a)
+
+
+def _shell_sort(a, record=True):
     comparisons = 0
     moves = 0
 
-    def snap(active_i, boundary =-1):
-        steps.append({"array": a.copy(), "active_index": active_i, "sorted_boundary":boundary})
-    
-    start = time.perf_counter()
-
     n = len(a)
     if n <= 1:
-        return steps, {"comparisons":0, "moves":0, "seconds": 0.0}
-    
+        return {"comparisons":0, "moves":0}
+
     gap = n // 2
     while gap > 0:
         for i in range(gap,n):
@@ -338,61 +1200,150 @@ def shell_sort(arr):
                 if a[j] > key:
                     a[j + gap] = a[j]
                     moves += 1
-                    snap(j + gap)
+                    if record:
+                        yield (j + gap,), j + gap, -1
                     j -= gap
                 else:
                     break
             a[j + gap] = key
             moves += 1
-            snap(j + gap)
-        
+            if record:
+                yield (j + gap,), j + gap, -1
+
         gap //= 2
-    
-    seconds = time.perf_counter() - start
-    metrics = {"comparisons": comparisons, "moves": moves, "seconds": seconds}
-    return steps, metrics
 
-def bucket_sort(arr, num_buckets = None):
+    return {"comparisons": comparisons, "moves": moves}
+
+
+def shell_sort(arr, record=True, key=None, reverse=False):
+    if key is not None or reverse:
+        return _sort_by_key(shell_sort, arr, key, reverse, record)
+    a = arr.copy()
+    return _run(_shell_sort(a, record=record), a, record)
+
+
+def shell_sort_stream(arr):
     a = arr.copy()
-    steps = []
+    return SortStream(_shell_sort(a), a)
+
+
+# --- Bucket Sort ---
+# Values are min-max normalized when any of them is negative (the default
+# scaling by max alone only works for non-negative input). adaptive=True
+# always normalizes by min-max and places bucket boundaries at quantiles of a
+# seeded sample, so skewed input still spreads over the buckets. Buckets
+# larger than max_bucket are handed to the `inner` sort: any key of
+# _INNER_SORTS, or "bucket" for a recursive adaptive pass. metrics gain
+# "bucket_sizes", "empty_buckets" and "oversized_buckets".
+BUCKET_SAMPLE_PER_BUCKET = 8
+BUCKET_MAX_DEPTH = 8
+
+_INNER_SORTS = {
+    "insertion": _insertion_sort,
+    "merge": _merge_sort,
+    "tim": _tim_sort,
+    "quick": _introsort,
+    "heap": _heap_sort,
+    "shell": _shell_sort,
+}
+
+
+def _quantile_boundaries(values, num_buckets, seed):
+    # num_buckets - 1 cut points taken from a sorted random sample
+    rng = random.Random(seed)
+    size = min(len(values), max(64, BUCKET_SAMPLE_PER_BUCKET * num_buckets))
+    sample = rng.sample(values, size)
+    _, m = _run(_tim_sort(sample, record=False), sample, False)
+    bounds = [sample[(i * size) // num_buckets] for i in range(1, num_buckets)]
+    return bounds, m["comparisons"]
+
+
+def _bucket_sort(a, num_buckets = None, record=True, adaptive=False,
+                 inner="tim", max_bucket=None, seed=0, depth=0):
     comparisons = 0
     moves = 0
 
+    if inner != "bucket" and inner not in _INNER_SORTS:
+        raise ValueError(f"unknown inner sort: {inner!r}")
+
     if not a:
-        return steps, {"comparisons": 0, "moves": 0, "seconds": 0.0}
+        return {"comparisons": 0, "moves": 0, "bucket_sizes": [],
+                "empty_buckets": 0, "oversized_buckets": 0}
 
     n = len(a)
 
     if num_buckets is None:
         num_buckets = max(1, int(math.sqrt(n)))
 
-    start = time.perf_counter()
-
+    minv = min(a)
     maxv = max(a)
 
     # normlize values range between 0 and 1
-    if maxv == 0:
-        seconds = time.perf_counter() - start
+    if adaptive or minv < 0:
+        if minv == maxv:
+            for i in range(n):
+                if record:
+                    yield (), i, i
+            return {"comparisons": 0, "moves": 0, "bucket_sizes": [n],
+                    "empty_buckets": 0, "oversized_buckets": 0}
+        width = maxv - minv
+        normalized = _aux(a, [(x - minv) / width for x in a])
+    else:
+        if maxv == 0:
+            for i, v in enumerate(a):
+                if record:
+                    yield (), i, i
+            return {"comparisons": 0, "moves": 0, "bucket_sizes": [n],
+                    "empty_buckets": 0, "oversized_buckets": 0}
+        normalized = _aux(a, [x / (maxv + 1.0) for x in a])
 
-        for i, v in enumerate(a):
-            steps.append({"array": a.copy(), "active_index": i, "sorted_boundary":i})
-        return steps, {"comparisons":0, "moves":0, "seconds": seconds}
-    
-    normalized = [x / (maxv + 1.0) for x in a]
-    
     #create buckets
-    buckets = [[] for _ in range(num_buckets)]
+    buckets = [_aux(a, []) for _ in range(num_buckets)]
 
     #split values to buckets
-    for v_norm, v_orig in zip(normalized, a):
-        idx = int(v_norm * num_buckets)
-        if idx >= num_buckets:
-            idx = num_buckets - 1
-        buckets[idx].append(v_orig)
+    if adaptive:
+        bounds, sample_comparisons = _quantile_boundaries(normalized, num_buckets, seed)
+        comparisons += sample_comparisons
+        for v_norm, v_orig in zip(normalized, a):
+            # bisect_right over the boundaries
+            lo, hi = 0, len(bounds)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                comparisons += 1
+                if v_norm < bounds[mid]:
+                    hi = mid
+                else:
+                    lo = mid + 1
+            buckets[lo].append(v_orig)
+    else:
+        for v_norm, v_orig in zip(normalized, a):
+            idx = int(v_norm * num_buckets)
+            if idx >= num_buckets:
+                idx = num_buckets - 1
+            buckets[idx].append(v_orig)
 
-    # sort buckets
+    if max_bucket is None:
+        max_bucket = max(32, 4 * n // num_buckets) if adaptive else n
 
+    # sort buckets
+    oversized = 0
     for b in buckets:
+        if len(b) > max_bucket:
+            oversized += 1
+            method = inner
+            # a bucket pass that did not split the input, or went too deep,
+            # would not make progress
+            if method == "bucket" and (len(b) == n or depth >= BUCKET_MAX_DEPTH):
+                method = "tim"
+            if method == "bucket":
+                core = _bucket_sort(b, None, record=False, adaptive=True, inner=inner,
+                                    seed=seed, depth=depth + 1)
+            else:
+                core = _INNER_SORTS[method](b, record=False)
+            _, m = _run(core, b, False)
+            comparisons += m["comparisons"]
+            moves += m["moves"]
+            continue
         for i in range(1,len(b)):
             key = b[i]
             j = i - 1
@@ -400,20 +1351,62 @@ def bucket_sort(arr, num_buckets = None):
                 comparisons +=1
                 if b[j] > key:
                     b[j + 1] = b[j]
+                    moves += 1
                     j -= 1
                 else:
                     break
             b[j + 1] = key
-    
+            moves += 1
+
     # save at main
     write_i = 0
     for b in buckets:
         for v in b:
             a[write_i] = v
             moves += 1
-            steps.append({"array":a.copy(),"active_index":write_i,"sorted_boundary":write_i})
+            if record:
+                yield (write_i,), write_i, write_i
             write_i += 1
-    
-    seconds = time.perf_counter() - start
-    metrics = {"comparisons": comparisons,"moves":moves,"seconds":seconds}
-    return steps, metrics
\ No newline at end of file
+
+    sizes = [len(b) for b in buckets]
+    return {
+        "comparisons": comparisons,
+        "moves": moves,
+        "bucket_sizes": sizes,
+        "empty_buckets": sizes.count(0),
+        "oversized_buckets": oversized,
+    }
+
+
+def bucket_sort(arr, num_buckets = None, record=True, backend="python",
+                adaptive=False, inner="tim", max_bucket=None, key=None, reverse=False):
+    if key is not None or reverse:
+        return _sort_by_key(bucket_sort, arr, key, reverse, record, numeric_only=True,
+                            by_placement=True, num_buckets=num_buckets, backend=backend,
+                            adaptive=adaptive, inner=inner, max_bucket=max_bucket)
+    if backend == "numpy":
+        from kernels_numpy import bucket_sort_np
+        return bucket_sort_np(arr, num_buckets, record=record, adaptive=adaptive,
+                              inner=inner, max_bucket=max_bucket)
+    _check_backend(backend)
+    a = arr.copy()
+    return _run(_bucket_sort(a, num_buckets, record=record, adaptive=adaptive,
+                             inner=inner, max_bucket=max_bucket), a, record)
+
+
+def bucket_sort_stream(arr, num_buckets = None, adaptive=False, inner="tim", max_bucket=None):
+    a = arr.copy()
+    return SortStream(_bucket_sort(a, num_buckets, adaptive=adaptive, inner=inner,
+                                   max_bucket=max_bucket), a)
+
+
+# --- Sample Sort (parallel.py) ---
+# Splitters from a sorted random sample cut the input into one bucket per
+# worker process; blocks are sorted and exchanged through shared memory.
+# Metrics-only: record must be False.
+def sample_sort(arr, record=False, workers=None, speedup=False, seed=0, key=None, reverse=False):
+    if key is not None or reverse:
+        return _sort_by_key(sample_sort, arr, key, reverse, record, numeric_only=True,
+                            int64_keys=True, workers=workers, speedup=speedup, seed=seed)
+    from parallel import parallel_sample_sort
+    return parallel_sample_sort(arr, workers, record=record, speedup=speedup, seed=seed)
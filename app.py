@@ -1,16 +1,72 @@
+import contextlib
+import os
 import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import matplotlib.pyplot as plt
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
-import statistics
 
 import algorithms as alg
+import benchmark as bench
+import datasets
+from cache import TraceCache, cache_key
+from steptrace import select_frames
+from trace_player import trace_player
 
 st.title("Sorting Algorithm Visualizer")
 
+# above this many elements animations switch to plain bars without labels
+LARGE_N = 60
+
+
+@st.cache_resource
+def get_trace_cache():
+    # one cache per server process, shared by every session
+    return TraceCache(disk_dir=os.path.join(".cache", "traces"))
+
+
+trace_cache = get_trace_cache()
+
+
+@st.cache_resource
+def get_trace_jobs():
+    # one background worker per server process: the sorts are pure Python
+    # and hold the GIL, and a single worker keeps memory-profiled runs from
+    # overlapping. Futures are shared so reruns never queue the same trace
+    # twice; finished traces are served by trace_cache.
+    return {
+        "executor": ThreadPoolExecutor(max_workers=1, thread_name_prefix="traces"),
+        "futures": {},
+        "lock": threading.Lock(),
+    }
+
+
+def _compute_trace(name, fn, data, profile_memory, params):
+    with alg.memory_profile() if profile_memory else contextlib.nullcontext():
+        return trace_cache.run(name, fn, data, **params)
+
+
+def submit_trace(name, fn, data, profile_memory=False, **params):
+    """Future for trace_cache.run(name, fn, data, **params) on the background worker."""
+    # memory figures come from the run that filled the cache, so profiled
+    # results are cached under their own names
+    if profile_memory:
+        name += "+memory"
+    jobs = get_trace_jobs()
+    key = cache_key(name, params, data)
+    with jobs["lock"]:
+        fut = jobs["futures"].get(key)
+        if fut is None:
+            fut = jobs["executor"].submit(_compute_trace, name, fn, list(data), profile_memory, params)
+            jobs["futures"][key] = fut
+            fut.add_done_callback(lambda _, key=key: jobs["futures"].pop(key, None))
+    return fut
+
+
 def render_metrics(m):
     if not m:
         return
@@ -26,65 +82,102 @@ def render_metrics(m):
         st.metric("Moves", f"{moves:,}")
 
 st.subheader("Input Configuration")
-length = st.slider("List length", 5, 20, 8)
-data = random.sample(range(1, 30), length)
+length = st.slider("List length", 5, 500, 8)
+distribution = st.selectbox(
+    "Input distribution", ["random sample"] + list(datasets.GENERATORS)
+)
+if distribution == "random sample":
+    # keep the sample across reruns so cached traces can be reused
+    sample_key = ("random sample", length)
+    if st.button("New random array") or st.session_state.get("sample_key") != sample_key:
+        st.session_state["sample_key"] = sample_key
+        st.session_state["sample"] = random.sample(range(1, max(30, 2 * length)), length)
+    data = st.session_state["sample"]
+else:
+    seed = st.number_input("Seed", min_value=0, value=0, step=1)
+    data = datasets.load_dataset(distribution, length, int(seed)).tolist()
 st.write(f"Input array: {data}")
 
+max_frames = st.slider(
+    "Max animation frames",
+    min_value=50,
+    max_value=2000,
+    value=300,
+    step=50,
+    help="Longer traces are decimated to this many keyframes; pass/merge boundaries and the final state are always kept.",
+)
+
+quick_mode = st.selectbox(
+    "Quick Sort variant",
+    ["lomuto", "introsort"],
+    help="introsort: iterative, ninther pivots, heap sort fallback and insertion sort for small ranges.",
+)
+
+renderer = st.radio(
+    "Animation renderer",
+    ["Plotly", "Client-side player"],
+    horizontal=True,
+    help="The client-side player receives a packed delta trace and plays it in the browser.",
+)
+
 benchmark_mode = st.checkbox("Benchmark mode", value = False)
 runs = st.slider("Benchmark runs", min_value=5,max_value=100,value=30,step=5) if benchmark_mode else None
-
+instrument = benchmark_mode and st.checkbox(
+    "Instrumented counts",
+    value=False,
+    help="One extra probed run per job: reads, writes, swaps and auxiliary buffers counted the same way for every algorithm, plus the instrumentation slowdown.",
+)
+parallel_workers = st.slider(
+    "Parallel workers",
+    min_value=0,
+    max_value=os.cpu_count() or 1,
+    value=0,
+    help="Also benchmark parallel merge sort and sample sort on this many worker processes (0: off). Reports speedup over the sequential sort and load imbalance.",
+) if benchmark_mode else 0
+profile_memory = st.checkbox(
+    "Profile memory",
+    value=False,
+    help="tracemalloc peak memory, auxiliary space and trace bytes per algorithm. Profiled runs are slower.",
+)
+
+comparison_key = (tuple(data), quick_mode, profile_memory)
 
 if st.button("Run Comparison"):
     if benchmark_mode:
-        algo_list = [
-            ("Insertion Sort", lambda arr:alg.insertion_sort(arr)),
-            ("Merge Sort", lambda arr:alg.merge_sort(arr)),
-            ("Quick Sort", lambda arr:alg.quick_sort(arr)),
-            ("Counting Sort", lambda arr:alg.counting_sort(arr)),
-            ("Radix Sort (LSD)", lambda arr: alg.radix_sort_lsd(arr, base=10)),
-            ("Heap Sort", lambda arr:alg.heap_sort(arr)),
-            ("Shell Sort", lambda arr:alg.shell_sort(arr)),
-            ("Bucket Sort", lambda arr:alg.bucket_sort(arr)),
-        ]
-        rows = []
-        for name, fn in algo_list:
-            times_ms = []
-            comps = []
-            moves = []
-
-            for _ in range(runs):
-                arr_copy = data.copy()
-                steps, m = fn(arr_copy)
-                times_ms.append(m["seconds"] * 1000)
-                comps.append(m["comparisons"])
-                moves.append(m["moves"])
-            
-            avg_ms = statistics.mean(times_ms)
-            std_ms = statistics.pstdev(times_ms) if len(times_ms) > 1 else 0.0
-            avg_comps = statistics.mean(comps)
-            avg_moves = statistics.mean(moves)
-
-            sorted_ok = (steps[-1]["array"] == sorted(data)) if steps else False
-
-            rows.append({
-                "Algorithm": name,
-                "Avg_ms": avg_ms,
-                "Std_ms": std_ms,
-                "Avg_Comparisons": avg_comps,
-                "Avg_Moves": avg_moves,
-                "Sorted OK (last run)": sorted_ok,
-                "Runs": runs,
-            })
-
-        df_bench = pd.DataFrame(rows).sort_values("Avg_ms", ascending=True)
+        # metrics-only runs spread over a process pool; the table refreshes
+        # as each (algorithm, run) job finishes
+        bench_table = st.empty()
+        results = []
+        for result in bench.run_benchmark(data, runs, instrument=instrument, memory=profile_memory,
+                                          parallel_workers=parallel_workers):
+            results.append(result)
+            bench_table.dataframe(
+                pd.DataFrame(bench.summarize(results)), use_container_width=True
+            )
+        bench_table.empty()
+
+        df_bench = pd.DataFrame(bench.summarize(results)).sort_values("Avg_ms", ascending=True)
 
         st.subheader(f"Benchmark (runs = {runs})")
         st.dataframe(
             df_bench.style.format({
                 "Avg_ms": "{:.3f}",
                 "Std_ms": "{:.3f}",
+                "Median_ms": "{:.3f}",
+                "IQR_ms": "{:.3f}",
                 "Avg_Comparisons": "{:.1f}",
                 "Avg_Moves": "{:.1f}",
+                "Avg_Reads": "{:.1f}",
+                "Avg_Writes": "{:.1f}",
+                "Avg_Swaps": "{:.1f}",
+                "Avg_Aux_Allocs": "{:.1f}",
+                "Avg_Aux_Cells": "{:.1f}",
+                "Probe_Overhead_x": "{:.1f}",
+                "Peak_KB": "{:.1f}",
+                "Aux_KB": "{:.1f}",
+                "Trace_KB": "{:.1f}",
+                "Speedup_x": "{:.2f}",
+                "Imbalance_x": "{:.2f}",
             }),
             use_container_width=True,
         )
@@ -98,26 +191,12 @@ if st.button("Run Comparison"):
 
         st.stop()
 
-    data_insertion = data.copy()
-    data_merge = data.copy()
-    data_quick = data.copy()
-    data_counting = data.copy()
-    data_radix = data.copy()
-    data_heap = data.copy()
-    data_shell = data.copy()
-    data_bucket = data.copy()
-
-    steps_insertion, metrics_insertion = alg.insertion_sort(data_insertion)
-    steps_merge, metrics_merge = alg.merge_sort(data_merge)
-    steps_quick, metrics_quick = alg.quick_sort(data_quick)
-    steps_counting, metrics_counting = alg.counting_sort(data_counting)
-    steps_radix, metrics_radix = alg.radix_sort_lsd(data_radix, base=10)
-    steps_heap, metrics_heap = alg.heap_sort(data_heap)
-    steps_shell, metrics_shell = alg.shell_sort(data_shell)
-    steps_bucket, metrics_bucket = alg.bucket_sort(data_bucket)
-
-
-    def create_animation(steps, title, color_fn):
+    st.session_state["comparison_key"] = comparison_key
+
+# the comparison stays up while the user switches algorithms (each switch is
+# a rerun) until the input or an option that changes the traces changes
+if not benchmark_mode and st.session_state.get("comparison_key") == comparison_key:
+    def create_animation(steps, title, color_fn, max_frames=None):
         if not steps:
             return go.Figure(
                 layout=go.Layout(
@@ -129,29 +208,38 @@ if st.button("Run Comparison"):
                     annotations=[dict(text="No steps to display", showarrow=False)],
                 )
             )
+
+        # past LARGE_N elements per-point text is unreadable anyway: draw
+        # plain bars so each frame carries only heights and colors
+        large = len(steps[0]["array"]) > LARGE_N
+
+        def trace_for(array, colors):
+            if large:
+                return go.Bar(
+                    x=list(range(len(array))),
+                    y=array,
+                    marker=dict(color=colors, line=dict(width=0)),
+                )
+            return go.Scatter(
+                x=list(range(len(array))),
+                y=array,
+                mode="markers+text",
+                marker=dict(size=28, color=colors),
+                text=array,
+                textposition="middle center",
+            )
+
+        selected = select_frames(steps, max_frames)
         frames = []
-        for i, step in enumerate(steps):
+        for i in selected:
+            step = steps[i]
             array = step["array"]
             active_index = step.get("active_index", -1)
             sorted_boundary = step.get("sorted_boundary", -1)
 
             colors = color_fn(len(array), active_index, sorted_boundary)
 
-            frames.append(
-                go.Frame(
-                    data=[
-                        go.Scatter(
-                            x=list(range(len(array))),
-                            y=array,
-                            mode="markers+text",
-                            marker=dict(size=28, color=colors),
-                            text=array,
-                            textposition="middle center",
-                        )
-                    ],
-                    name=f"Step {i+1}",
-                )
-            )
+            frames.append(go.Frame(data=[trace_for(array, colors)], name=f"Step {i+1}"))
 
         initial = steps[0]
         initial_colors = color_fn(
@@ -161,22 +249,15 @@ if st.button("Run Comparison"):
         )
 
         fig = go.Figure(
-            data=[
-                go.Scatter(
-                    x=list(range(len(initial["array"]))),
-                    y=initial["array"],
-                    mode="markers+text",
-                    marker=dict(size=28, color=initial_colors),
-                    text=initial["array"],
-                    textposition="middle center",
-                )
-            ],
+            data=[trace_for(initial["array"], initial_colors)],
             layout=go.Layout(
                 width=900,
                 height=420,
                 title=title,
                 xaxis=dict(range=[-0.5, len(initial["array"]) - 0.5]),
-                yaxis=dict(range=[0, max(max(s["array"]) for s in steps) + 5]),
+                # sorting only permutes values, so the final frame has the max
+                yaxis=dict(range=[0, max(steps[-1]["array"]) + 5]),
+                bargap=0,
                 updatemenus=[
                     dict(
                         type="buttons",
@@ -195,7 +276,7 @@ if st.button("Run Comparison"):
                                 "label": f"{i+1}",
                                 "method": "animate",
                             }
-                            for i in range(len(frames))
+                            for i in selected
                         ],
                         "transition": {"duration": 0},
                         "x": 0,
@@ -289,121 +370,79 @@ if st.button("Run Comparison"):
         ]
 
 
-    tab_ins, tab_mer, tab_quick, tab_count, tab_radix, tab_heap, tab_shell, tab_bucket = st.tabs(
-        ["Insertion","Merge","Quick","Counting","Radix (LSD)","Heap", "Shell", "Bucket"]
-    )
+    # (label, title, cache name, function, kwargs, color_fn, player palette)
+    sorts = [
+        ("Insertion", "Insertion Sort", "insertion_sort", alg.insertion_sort, {}, insertion_colors, "insertion"),
+        ("Merge", "Merge Sort", "merge_sort", alg.merge_sort, {}, merge_colors, "merge"),
+        ("Tim", "Tim Sort", "tim_sort", alg.tim_sort, {}, merge_colors, "merge"),
+        ("Quick", "Quick Sort", "quick_sort", alg.quick_sort, {"mode": quick_mode}, quick_colors, "quick"),
+        ("Counting", "Counting Sort", "counting_sort", alg.counting_sort, {}, counting_colors, "counting"),
+        ("Radix (LSD)", "Radix Sort (LSD)", "radix_sort_lsd", alg.radix_sort_lsd, {"base": 10}, radix_colors, "radix"),
+        ("Heap", "Heap Sort", "heap_sort", alg.heap_sort, {}, heap_colors, "heap"),
+        ("Shell", "Shell Sort", "shell_sort", alg.shell_sort, {}, shell_colors, "shell"),
+        ("Bucket", "Bucket Sort", "bucket_sort", alg.bucket_sort, {}, bucket_colors, "bucket"),
+    ]
+
+    def show_trace(steps, title, color_fn, palette):
+        if renderer == "Client-side player":
+            trace_player(steps, title, palette, key=f"player_{title}")
+        else:
+            st.plotly_chart(
+                create_animation(steps, title, color_fn, max_frames),
+                use_container_width=True,
+            )
 
-    with tab_ins:
-        st.plotly_chart(
-            create_animation(steps_insertion, "Insertion Sort", insertion_colors),
-            use_container_width=True,
-        )
-    with tab_mer:
-        st.plotly_chart(
-            create_animation(steps_merge, "Merge Sort", merge_colors),
-            use_container_width=True,
-        )
-    with tab_quick:
-        st.plotly_chart(
-            create_animation(steps_quick, "Quick Sort", quick_colors),
-            use_container_width=True,
-        )
-    with tab_count:
-        st.plotly_chart(
-            create_animation(steps_counting, "Counting Sort", counting_colors),
-            use_container_width=True,
-        )
-    with tab_radix:
-        st.plotly_chart(
-            create_animation(steps_radix, "Radix Sort (LSD)", radix_colors),
-            use_container_width=True,
-        )
-    with tab_heap:
-        st.plotly_chart(
-            create_animation(steps_heap, "Heap Sort", heap_colors),
-            use_container_width=True,
-        )
-    with tab_shell:
-        st.plotly_chart(
-            create_animation(steps_shell, "Shell Sort", shell_colors),
-            use_container_width=True,
-        )
-    with tab_bucket:
-        st.plotly_chart(
-            create_animation(steps_bucket, "Bucket Sort", bucket_colors),
-            use_container_width=True,
-        )
+    # only the visible algorithm's figure is built; its trace is queued
+    # first and the others follow in the background to fill the summary
+    view = st.radio("Algorithm", [spec[0] for spec in sorts], horizontal=True, key="algorithm_view")
+    selected = next(spec for spec in sorts if spec[0] == view)
+    futures = {}
+    for label, _, name, fn, params, _, _ in [selected] + [spec for spec in sorts if spec is not selected]:
+        futures[label] = submit_trace(name, fn, data, profile_memory, **params)
+
+    _, title, _, _, _, color_fn, palette = selected
+    steps, metrics = futures[view].result()
+    show_trace(steps, title, color_fn, palette)
+    render_metrics(metrics)
+
+    def final_array(steps):
+        # already-sorted input can leave a trace with no writes at all
+        return steps[-1]["array"] if steps else data
+
+    def memory_columns(m):
+        if "peak_bytes" not in m:
+            return {}
+        return {
+            "Peak_KB": m["peak_bytes"] / 1024,
+            "Aux_KB": m["aux_bytes"] / 1024,
+            "Trace_KB": m["trace_bytes"] / 1024,
+        }
+
+    def summary_row(title, steps, metrics):
+        return {
+            "Algorithm": title,
+            "Time_ms": metrics["seconds"] * 1000,
+            "Comparisons": metrics["comparisons"],
+            "Moves": metrics["moves"],
+            **memory_columns(metrics),
+            "Frames": len(steps),
+            "Sorted OK": final_array(steps) == sorted(data),
+        }
 
-    df = pd.DataFrame(
-        [
-            {
-                "Algorithm": "Insertion Sort",
-                "Time_ms": metrics_insertion["seconds"] * 1000,
-                "Comparisons": metrics_insertion["comparisons"],
-                "Moves": metrics_insertion["moves"],
-                "Frames": len(steps_insertion),
-                "Sorted OK": steps_insertion[-1]["array"] == sorted(data)
-            },
-            {
-                "Algorithm": "Merge Sort",
-                "Time_ms": metrics_merge["seconds"] * 1000,
-                "Comparisons": metrics_merge["comparisons"],
-                "Moves": metrics_merge["moves"],
-                "Frames": len(steps_merge),
-                "Sorted OK": steps_merge[-1]["array"] == sorted(data)
-            },
-            {
-                "Algorithm": "Quick Sort",
-                "Time_ms": metrics_quick["seconds"] * 1000,
-                "Comparisons": metrics_quick["comparisons"],
-                "Moves": metrics_quick["moves"],
-                "Frames": len(steps_quick),
-                "Sorted OK": steps_quick[-1]["array"] == sorted(data)
-            },
-            {
-                "Algorithm": "Counting Sort",
-                "Time_ms": metrics_counting["seconds"] * 1000,
-                "Comparisons": metrics_counting["comparisons"],
-                "Moves": metrics_counting["moves"],
-                "Frames": len(steps_counting),
-                "Sorted OK": steps_counting[-1]["array"] == sorted(data)
-            },
-            {
-                "Algorithm": "Radix Sort(LSD)",
-                "Time_ms": metrics_radix["seconds"] * 1000,
-                "Comparisons": metrics_radix["comparisons"],
-                "Moves": metrics_radix["moves"],
-                "Frames": len(steps_radix),
-                "Sorted OK": steps_radix[-1]["array"] == sorted(data)
-            },
-            {
-                "Algorithm": "Heap Sort",
-                "Time_ms": metrics_heap["seconds"] * 1000,
-                "Comparisons": metrics_heap["comparisons"],
-                "Moves": metrics_heap["moves"],
-                "Frames": len(steps_heap),
-                "Sorted OK": steps_heap[-1]["array"] == sorted(data)
-            },
-            {
-                "Algorithm": "Shell Sort",
-                "Time_ms": metrics_shell["seconds"] * 1000,
-                "Comparisons": metrics_shell["comparisons"],
-                "Moves": metrics_shell["moves"],
-                "Frames": len(steps_shell),
-                "Sorted OK": steps_shell[-1]["array"] == sorted(data)
-            },
-            {
-                "Algorithm": "Bucket Sort",
-                "Time_ms": metrics_bucket["seconds"] * 1000,
-                "Comparisons": metrics_bucket["comparisons"],
-                "Moves": metrics_bucket["moves"],
-                "Frames": len(steps_bucket),
-                "Sorted OK": steps_bucket[-1]["array"] == sorted(data)
-            }
-        ]
-    )
     st.subheader("Summary Table")
-    st.dataframe(df.style.format({"Time_ms": "{:.2f}"}), use_container_width=True)
+    summary_table = st.empty()
+    labels = {fut: label for label, fut in futures.items()}
+    rows = {}
+    for fut in as_completed(futures.values()):
+        label = labels[fut]
+        title = next(spec[1] for spec in sorts if spec[0] == label)
+        rows[label] = summary_row(title, *fut.result())
+        # rows in tab order, filled in as their traces finish
+        df = pd.DataFrame([rows[spec[0]] for spec in sorts if spec[0] in rows])
+        summary_table.dataframe(
+            df.style.format({"Time_ms": "{:.2f}", "Peak_KB": "{:.1f}", "Aux_KB": "{:.1f}", "Trace_KB": "{:.1f}"}),
+            use_container_width=True,
+        )
 
     csv = df.to_csv(index=False).encode("utf-8")
     st.download_button(
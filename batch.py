@@ -0,0 +1,263 @@
+# batch.py - sort many small arrays at once
+#
+# Usage: python batch.py --rows 20000 --width 8
+#        python batch.py --rows 5000 --width 64 --high 100000
+#
+# sort_batch() takes a 2-D array (one array per row) or a list of arrays.
+# Rows of equal length are stacked and sorted together with whole-batch NumPy
+# operations, so the per-call overhead of algorithms.py (list copy, core
+# generator, perf_counter) is paid once per batch instead of once per row:
+#   network   Batcher odd-even merge network, one min/max per comparator
+#             layer across all rows (widths up to NETWORK_MAX_WIDTH)
+#   counting  one offset histogram for the whole batch (small integer spans)
+#   radix     LSD radix on the whole batch, a stable row-wise argsort per digit
+#   python    fallback: algorithms.<algorithm>(row, record=False) per row
+# The CLI measures throughput in arrays per second for every method.
+import argparse
+import time
+from functools import lru_cache
+
+import numpy as np
+
+import algorithms as alg
+from algorithms import DENSE_SPAN_FACTOR, _choose_radix_bits, _radix_keys
+from kernels_numpy import _digit_dtype
+
+NETWORK_MAX_WIDTH = 32
+AUTO_NETWORK_WIDTH = 16  # above this "auto" prefers counting/radix
+COUNTING_MAX_CELLS = 1 << 24  # rows * span histogram cells
+METHODS = ("auto", "network", "counting", "radix", "python")
+
+
+@lru_cache(maxsize=None)
+def network_layers(n):
+    """Comparators (i, j), i < j, of Batcher's odd-even merge sort for width n.
+
+    Grouped in layers of disjoint pairs, so each layer is one vectorized step.
+    """
+    layers = []
+    p = 1
+    while p < n:
+        k = p
+        while k >= 1:
+            pairs = [(i + j, i + j + k)
+                     for j in range(k % p, n - k, 2 * k)
+                     for i in range(min(k, n - j - k))
+                     if (i + j) // (2 * p) == (i + j + k) // (2 * p)]
+            if pairs:
+                layers.append(tuple(pairs))
+            k //= 2
+        p *= 2
+    return tuple(layers)
+
+
+@lru_cache(maxsize=None)
+def _network_index(n):
+    return [(np.array([i for i, _ in layer]), np.array([j for _, j in layer]))
+            for layer in network_layers(n)]
+
+
+def _sort_network(x):
+    rows, w = x.shape
+    x = x.copy()
+    moves = np.zeros(rows, dtype=np.int64)
+    comparators = 0
+    for i, j in _network_index(w):
+        lo, hi = x[:, i], x[:, j]
+        swap = lo > hi
+        x[:, i] = np.where(swap, hi, lo)
+        x[:, j] = np.where(swap, lo, hi)
+        moves += 2 * swap.sum(axis=1)
+        comparators += len(i)
+    return x, np.full(rows, comparators, dtype=np.int64), moves
+
+
+def _sort_counting(x):
+    # row r, value v -> histogram cell r * span + (v - lo); the repeat of the
+    # flattened histogram lays the rows out one after another, already sorted
+    rows, w = x.shape
+    lo = int(x.min())
+    span = int(x.max()) - lo + 1
+    cells = (x - lo) + np.arange(rows)[:, None] * span
+    count = np.bincount(cells.ravel(), minlength=rows * span)
+    values = np.tile(np.arange(lo, lo + span, dtype=x.dtype), rows)
+    out = np.repeat(values, count).reshape(rows, w)
+    return out, np.zeros(rows, dtype=np.int64), np.full(rows, w, dtype=np.int64)
+
+
+def _sort_radix(x):
+    rows, w = x.shape
+    x = x.astype(np.int64, copy=False)
+    bias, max_key = _radix_keys(int(x.min()), int(x.max()))
+    bits = _choose_radix_bits(w, max_key.bit_length())
+    base = 1 << bits
+    keys = x.view(np.uint64) ^ np.uint64(bias) if bias == 1 << 63 else (x + bias).astype(np.uint64)
+    digit_dtype = _digit_dtype(base)
+    moves = np.zeros(rows, dtype=np.int64)
+    place = 0
+    while max_key >= base ** place:
+        digits = (keys >> np.uint64(bits * place)) & np.uint64(base - 1)
+        place += 1
+        # like the single-array sorts, a row skips passes with one digit value
+        moving = np.any(digits != digits[:, :1], axis=1)
+        if not moving.any():
+            continue
+        order = np.argsort(digits.astype(digit_dtype), axis=1, kind="stable")
+        x = np.take_along_axis(x, order, axis=1)
+        keys = np.take_along_axis(keys, order, axis=1)
+        moves += w * moving
+    return x, np.zeros(rows, dtype=np.int64), moves
+
+
+def _sort_python(rows, algorithm, kwargs):
+    fn = getattr(alg, algorithm)
+    out, comparisons, moves = [], [], []
+    for row in rows:
+        s, m = fn(list(row), record=False, **kwargs)
+        out.append(s)
+        comparisons.append(m["comparisons"])
+        moves.append(m["moves"])
+    return out, comparisons, moves
+
+
+_KERNELS = {"network": _sort_network, "counting": _sort_counting, "radix": _sort_radix}
+
+
+def _is_int(x):
+    # uint64 does not fit the int64 keys of the radix and counting kernels
+    return x.dtype.kind == "i" or (x.dtype.kind == "u" and x.dtype.itemsize < 8)
+
+
+def choose_method(x, method="auto"):
+    """Kernel for one stacked (rows, width) group; checks explicit choices."""
+    if method not in METHODS:
+        raise ValueError(f"unknown batch method: {method!r}")
+    rows, w = x.shape
+    if method == "network" and w > NETWORK_MAX_WIDTH:
+        raise ValueError(f"sorting networks are limited to width {NETWORK_MAX_WIDTH}")
+    if method in ("counting", "radix") and not _is_int(x):
+        raise TypeError(f"the {method} batch method only sorts integer arrays")
+    if method != "auto":
+        return method
+    if w <= AUTO_NETWORK_WIDTH:
+        return "network"
+    if _is_int(x):
+        span = int(x.max()) - int(x.min()) + 1
+        if span <= DENSE_SPAN_FACTOR * w + 256 and rows * span <= COUNTING_MAX_CELLS:
+            return "counting"
+        return "radix"
+    return "python"
+
+
+def _sort_group(x, method, algorithm, kwargs):
+    # (sorted rows, per-row comparisons, per-row moves, method) for one width
+    m = choose_method(x, method) if x.size else "network"
+    if m == "python":
+        return (*_sort_python(x.tolist(), algorithm, kwargs), m)
+    sorted_x, comparisons, moves = _KERNELS[m](x)
+    return sorted_x, comparisons.tolist(), moves.tolist(), m
+
+
+def sort_batch(arrays, method="auto", algorithm="tim_sort", **kwargs):
+    """Sort every row of a 2-D array, or every array in a list.
+
+    Returns (sorted, metrics). `sorted` is an ndarray for ndarray input and a
+    list of lists otherwise. metrics has per-row "comparisons" and "moves"
+    lists (counted by the kernel that sorted the row), "methods" mapping each
+    kernel to its row count, and "seconds"/"arrays_per_second" for the whole
+    batch. `algorithm` and `kwargs` are only used by the "python" method.
+    """
+    as_array = isinstance(arrays, np.ndarray)
+    if as_array and arrays.ndim != 2:
+        raise ValueError("sort_batch expects a 2-D array or a list of arrays")
+    rows = arrays if as_array else [np.asarray(r) for r in arrays]
+
+    start = time.perf_counter()
+    n = len(rows)
+    methods = {}
+    if as_array:
+        out, comparisons, moves, m = _sort_group(arrays, method, algorithm, kwargs)
+        out = np.asarray(out, dtype=arrays.dtype).reshape(arrays.shape)
+        methods[m] = n
+    else:
+        groups = {}
+        for r, row in enumerate(rows):
+            groups.setdefault(len(row), []).append(r)
+        out = [None] * n
+        comparisons = [0] * n
+        moves = [0] * n
+        for idx in groups.values():
+            x = np.stack([rows[r] for r in idx])
+            sorted_x, comp, mov, m = _sort_group(x, method, algorithm, kwargs)
+            if isinstance(sorted_x, np.ndarray):
+                sorted_x = sorted_x.tolist()
+            for k, r in enumerate(idx):
+                out[r] = sorted_x[k]
+                comparisons[r] = comp[k]
+                moves[r] = mov[k]
+            methods[m] = methods.get(m, 0) + len(idx)
+    seconds = time.perf_counter() - start
+
+    metrics = {
+        "comparisons": comparisons,
+        "moves": moves,
+        "methods": methods,
+        "rows": n,
+        "seconds": seconds,
+        "arrays_per_second": n / seconds if seconds > 0 else 0.0,
+    }
+    return out, metrics
+
+
+def throughput(arrays, method="auto", repeat=5, **kwargs):
+    """Best-of-`repeat` arrays per second for sort_batch(arrays, method)."""
+    best = 0.0
+    for _ in range(repeat):
+        _, m = sort_batch(arrays, method, **kwargs)
+        best = max(best, m["arrays_per_second"])
+    return best
+
+
+def _loop_throughput(rows, algorithm, repeat=5):
+    # the baseline: one algorithms.py call per array
+    fn = getattr(alg, algorithm)
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in rows:
+            fn(row, record=False)
+        seconds = time.perf_counter() - start
+        if seconds > 0:
+            best = max(best, len(rows) / seconds)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch sorting throughput (arrays/second)")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--high", type=int, default=1000, help="values are drawn from [0, high)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--algorithm", default="tim_sort",
+                        help="algorithms.py function for the per-array baseline")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    x = rng.integers(0, args.high, size=(args.rows, args.width))
+    rows = x.tolist()
+    print(f"{args.rows} arrays of width {args.width}, values in [0, {args.high})")
+    print(f"{'loop ' + args.algorithm:<20} {_loop_throughput(rows, args.algorithm, args.repeat):14,.0f} arrays/s")
+    for method in METHODS[1:]:
+        try:
+            choose_method(x, method)
+        except (ValueError, TypeError):
+            continue
+        rate = throughput(x, method, args.repeat, algorithm=args.algorithm)
+        print(f"{method:<20} {rate:14,.0f} arrays/s")
+    _, m = sort_batch(x)
+    print(f"auto picks {', '.join(m['methods'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# benchmark.py - process-pool benchmark engine used by app.py's benchmark mode
+#
+# Every (algorithm, run) pair is an independent job. Jobs are spread over a
+# ProcessPoolExecutor whose workers are pinned to one CPU each and warm up
+# every algorithm once before their first timed run. Results are yielded as
+# soon as they finish, so callers can fill their tables incrementally. Timed
+# runs have the garbage collector off; perfcheck.py builds on the same pieces
+# for calibrated, baseline-compared measurements.
+# instrument=True adds one probe.probe_run per job: uniform read/write/swap/
+# comparison/aux counts plus the instrumentation slowdown over the plain run.
+# memory=True profiles the first run of every algorithm with tracemalloc
+# (alg.memory_profile): auxiliary space of a metrics-only run, and peak and
+# trace bytes of a recorded run.
+# parallel_workers=N adds parallel merge sort and sample sort (parallel.py).
+# They run in this process after the pool has finished, one at a time, so
+# their own worker processes have every CPU; each job also times the
+# sequential algorithm for the speedup.
+import gc
+import os
+import statistics
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing as mp
+
+import algorithms as alg
+from probe import probe_run
+
+# (display name, function name in algorithms.py, extra kwargs)
+ALGORITHMS = [
+    ("Insertion Sort", "insertion_sort", {}),
+    ("Merge Sort", "merge_sort", {}),
+    ("Tim Sort", "tim_sort", {}),
+    ("Quick Sort", "quick_sort", {}),
+    ("Quick Sort (Introsort)", "quick_sort", {"mode": "introsort"}),
+    ("Counting Sort", "counting_sort", {}),
+    ("Radix Sort (LSD)", "radix_sort_lsd", {"base": 10}),
+    ("Heap Sort", "heap_sort", {}),
+    ("Shell Sort", "shell_sort", {}),
+    ("Bucket Sort", "bucket_sort", {}),
+]
+
+
+
+def parallel_algorithms(workers):
+    return [
+        (f"Parallel Merge Sort ({workers} workers)", "merge_sort", {"workers": workers, "speedup": True}),
+        (f"Sample Sort ({workers} workers)", "sample_sort", {"workers": workers, "speedup": True}),
+    ]
+
+
+_warmed = set()
+
+
+@contextmanager
+def gc_disabled():
+    """Collect once, then keep the garbage collector off inside the block."""
+    was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _init_worker(cpu_queue):
+    # each worker takes one CPU id off the queue and pins itself to it
+    cpu = cpu_queue.get()
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except OSError:
+            pass
+
+
+def _run_job(name, func_name, kwargs, data, run, warmup, instrument=False, memory=False):
+    fn = getattr(alg, func_name)
+    if name not in _warmed:
+        for _ in range(warmup):
+            fn(data.copy(), record=False, **kwargs)
+        _warmed.add(name)
+    with gc_disabled():
+        out, m = fn(data.copy(), record=False, **kwargs)
+    result = {
+        "Algorithm": name,
+        "run": run,
+        "seconds": m["seconds"],
+        "comparisons": m["comparisons"],
+        "moves": m["moves"],
+        "sorted_ok": out == sorted(data),
+    }
+    if "workers" in kwargs:
+        # metrics-only and not instrumentable; see parallel.py
+        result["imbalance"] = m["imbalance"]
+        result["speedup"] = m["speedup"]
+        return result
+    if instrument:
+        _, pm = probe_run(fn, data, **kwargs)
+        result["probe"] = pm["probe"]
+        result["probe_seconds"] = pm["seconds"]
+    if memory and run == 0:
+        with alg.memory_profile():
+            _, mm = fn(data.copy(), record=False, **kwargs)
+            _, mt = fn(data.copy(), record=True, **kwargs)
+        result["aux_bytes"] = mm["aux_bytes"]
+        result["peak_bytes"] = mt["peak_bytes"]
+        result["trace_bytes"] = mt["trace_bytes"]
+    return result
+
+
+def run_benchmark(data, runs, algorithms=ALGORITHMS, workers=None, warmup=1,
+                  instrument=False, memory=False, parallel_workers=None):
+    """Yield one result dict per (algorithm, run) job, in completion order."""
+    cpus = _available_cpus()
+    workers = workers or len(cpus)
+    ctx = mp.get_context()
+    cpu_queue = ctx.Queue()
+    for w in range(workers):
+        # more workers than CPUs: the extra ones stay unpinned
+        cpu_queue.put(cpus[w] if w < len(cpus) else None)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(cpu_queue,),
+    ) as pool:
+        futures = [
+            pool.submit(_run_job, name, func_name, kwargs, data, run, warmup, instrument, memory)
+            for run in range(runs)
+            for name, func_name, kwargs in algorithms
+        ]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+    if parallel_workers:
+        for run in range(runs):
+            for name, func_name, kwargs in parallel_algorithms(parallel_workers):
+                yield _run_job(name, func_name, kwargs, data, run, warmup)
+
+
+def _iqr(values):
+    if len(values) < 2:
+        return 0.0
+    q1, _, q3 = statistics.quantiles(values, n=4)
+    return q3 - q1
+
+
+def summarize(results):
+    """Aggregate job results into one row per algorithm (app.py's df_bench)."""
+    by_algo = {}
+    for r in results:
+        by_algo.setdefault(r["Algorithm"], []).append(r)
+    rows = []
+    for name, rs in by_algo.items():
+        times_ms = [r["seconds"] * 1000 for r in rs]
+        row = {
+            "Algorithm": name,
+            "Avg_ms": statistics.mean(times_ms),
+            "Std_ms": statistics.pstdev(times_ms) if len(times_ms) > 1 else 0.0,
+            "Median_ms": statistics.median(times_ms),
+            "IQR_ms": _iqr(times_ms),
+            "Avg_Comparisons": statistics.mean(r["comparisons"] for r in rs),
+            "Avg_Moves": statistics.mean(r["moves"] for r in rs),
+            "Sorted OK (last run)": max(rs, key=lambda r: r["run"])["sorted_ok"],
+            "Runs": len(rs),
+        }
+        if "probe" in rs[0]:
+            for counter in ("reads", "writes", "swaps", "aux_allocs", "aux_cells"):
+                row[f"Avg_{counter.title()}"] = statistics.mean(r["probe"][counter] for r in rs)
+            ratios = [r["probe_seconds"] / r["seconds"] for r in rs if r["seconds"] > 0]
+            row["Probe_Overhead_x"] = statistics.mean(ratios) if ratios else 0.0
+        if "speedup" in rs[0]:
+            row["Speedup_x"] = statistics.mean(r["speedup"] for r in rs)
+            row["Imbalance_x"] = statistics.mean(r["imbalance"] for r in rs)
+        profiled = [r for r in rs if "peak_bytes" in r]
+        if profiled:
+            for key, col in (("peak_bytes", "Peak_KB"), ("aux_bytes", "Aux_KB"), ("trace_bytes", "Trace_KB")):
+                row[col] = statistics.mean(r[key] for r in profiled) / 1024
+        rows.append(row)
+    return rows
@@ -0,0 +1,165 @@
+# cache.py - content-addressed cache for step traces and metrics
+#
+# Entries are keyed by (algorithm name, parameters, hash of the input array)
+# plus a hash of the modules that compute the results, so a disk tier written
+# by an older version of the sorts or the trace format is never read back.
+# A byte-bounded in-memory LRU sits in front of an optional pickle-per-entry
+# disk tier, so Streamlit reruns and other sessions viewing the same dataset
+# reuse results instead of re-sorting.
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+# the modules whose code determines a cached (steps, metrics) value
+CODE_FILES = ("algorithms.py", "steptrace.py", "kernels_numpy.py", "parallel.py")
+
+
+def _input_digest(data):
+    h = hashlib.sha1()
+    try:
+        h.update(b"q")
+        h.update(array("q", data).tobytes())
+    except (TypeError, OverflowError):
+        h = hashlib.sha1(b"r")
+        h.update(repr(list(data)).encode())
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """Hash of CODE_FILES; part of every key, so code changes miss the cache."""
+    h = hashlib.sha1()
+    for name in CODE_FILES:
+        h.update(name.encode())
+        try:
+            with open(os.path.join(_HERE, name), "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(b"-")
+    return h.hexdigest()
+
+
+def cache_key(name, params, data):
+    params_s = json.dumps(params or {}, sort_keys=True, default=repr)
+    raw = f"{code_version()}|{name}|{params_s}|{len(data)}|{_input_digest(data)}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _entry_bytes(value):
+    steps, metrics = value
+    size = getattr(steps, "nbytes", None)
+    if size is None:
+        size = sys.getsizeof(steps)
+    return size + sys.getsizeof(metrics)
+
+
+class TraceCache:
+    """(steps, metrics) results shared across reruns; thread-safe."""
+
+    def __init__(self, max_bytes=256 * 2**20, disk_dir=None, max_disk_bytes=2 * 2**30):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _put_memory(self, key, value, nbytes):
+        if nbytes > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            _, (_, old_bytes) = self._entries.popitem(last=False)
+            self._bytes -= old_bytes
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return None
+
+    def _write_disk(self, key, value):
+        path = self._disk_path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self._trim_disk()
+
+    def _trim_disk(self):
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".pkl"):
+                path = os.path.join(self.disk_dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._put_memory(key, value, _entry_bytes(value))
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._put_memory(key, value, _entry_bytes(value))
+        if self.disk_dir:
+            self._write_disk(key, value)
+
+    def run(self, name, fn, data, **params):
+        """fn(data, **params), memoized on (name, params, data)."""
+        key = cache_key(name, params, data)
+        value = self.get(key)
+        if value is None:
+            value = fn(data, **params)
+            self.put(key, value)
+        return value
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,86 @@
+# datasets.py - seeded input distributions, cached on disk as .npy files
+#
+# Every generator takes (n, rng) and returns an int64 array. load_dataset()
+# keys the cache on (kind, n, seed), so big inputs are generated once and
+# reloaded on later Streamlit reruns or benchmark sweeps.
+import os
+
+import numpy as np
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "datasets")
+
+
+def uniform(n, rng):
+    return rng.integers(0, max(n, 1) * 4, size=n)
+
+
+def sorted_(n, rng):
+    return np.arange(1, n + 1)
+
+
+def reversed_(n, rng):
+    return np.arange(n, 0, -1)
+
+
+def nearly_sorted(n, rng, swaps=0.02):
+    # sorted run with ~2% of positions swapped with a random partner
+    a = np.arange(1, n + 1)
+    k = max(1, int(n * swaps)) if n > 1 else 0
+    i = rng.integers(0, n, size=k)
+    j = rng.integers(0, n, size=k)
+    for x, y in zip(i, j):
+        a[x], a[y] = a[y], a[x]
+    return a
+
+
+def few_unique(n, rng, unique=8):
+    return rng.integers(1, unique + 1, size=n)
+
+
+def sawtooth(n, rng, teeth=4):
+    period = max(1, -(-n // teeth))
+    return np.arange(n) % period + 1
+
+
+def zipf(n, rng, a=1.5, cap=10**6):
+    return np.minimum(rng.zipf(a, size=n), cap)
+
+
+def wide_range(n, rng, high=10**7):
+    # few values spread over a huge span: counting sort's worst case
+    return rng.integers(0, high, size=n)
+
+
+GENERATORS = {
+    "uniform": uniform,
+    "sorted": sorted_,
+    "reversed": reversed_,
+    "nearly_sorted": nearly_sorted,
+    "few_unique": few_unique,
+    "sawtooth": sawtooth,
+    "zipf": zipf,
+    "wide_range": wide_range,
+}
+
+
+def generate(kind, n, seed=0):
+    if kind not in GENERATORS:
+        raise ValueError(f"unknown distribution: {kind!r}")
+    rng = np.random.default_rng(seed)
+    return np.asarray(GENERATORS[kind](n, rng), dtype=np.int64)
+
+
+def load_dataset(kind, n, seed=0, cache_dir=CACHE_DIR):
+    """generate(), memoized on disk; pass cache_dir=None to skip the cache."""
+    if cache_dir is None:
+        return generate(kind, n, seed)
+    path = os.path.join(cache_dir, f"{kind}_n{n}_s{seed}.npy")
+    if os.path.exists(path):
+        return np.load(path, allow_pickle=False)
+    data = generate(kind, n, seed)
+    os.makedirs(cache_dir, exist_ok=True)
+    # write to a temp file first so concurrent reruns never read a partial file
+    tmp = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(tmp, data, allow_pickle=False)
+    os.replace(tmp, path)
+    return data
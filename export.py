@@ -0,0 +1,276 @@
+# export.py - render a sorting trace to GIF, MP4 or a PNG sequence
+#
+# Usage: python export.py --algorithm heap --n 60 --out heap.gif
+#        python export.py --algorithm merge --n 200 --out frames/ --format png
+#
+# Frames are rendered in chunks by a process pool. Each worker builds one
+# Agg figure when it starts and, per frame, only calls set_height/set_color
+# on the bars that changed before drawing the canvas. The parent consumes
+# chunks in order with at most two per worker in flight and pipes the raw
+# RGBA frames straight into ffmpeg (MP4, GIF); PNG frames are written by
+# the workers themselves. Without ffmpeg, GIFs fall back to Pillow, which
+# keeps every frame (palettized, one byte per pixel) until it writes the
+# file.
+import argparse
+import os
+import random
+import shutil
+import subprocess
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from main import ALGORITHMS
+from steptrace import StepTrace, select_frames
+
+COLORS = {"active": "tab:red", "sorted": "tab:green", "plain": "tab:gray"}
+CHUNK = 24  # frames per pool job
+
+_worker = {}
+
+
+def record(stream):
+    """Collect a *_stream generator into a StepTrace."""
+    steps = StepTrace(stream.array)
+    for event in stream:
+        steps.record(event["array"], event["written"], event["active_index"], event["sorted_boundary"])
+    return steps
+
+
+def _state(j, active, boundary, rule):
+    if j == active:
+        return "active"
+    if (rule == "le" and j <= boundary) or (rule == "eq" and j == boundary) or (
+        rule == "ge" and boundary != -1 and j >= boundary
+    ):
+        return "sorted"
+    return "plain"
+
+
+def _init_worker(trace, rule, title, size, dpi):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    initial = trace.initial
+    n = len(initial)
+    fig = Figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    # sorting only permutes values, so the initial range holds for every frame
+    lo, hi = min(min(initial), 0), max(max(initial), 1)
+    bars = ax.bar(range(n), initial, width=0.9 if n <= 100 else 1.0,
+                  color=COLORS["plain"], linewidth=0)
+    ax.set_xlim(-0.5, n - 0.5)
+    ax.set_ylim(lo, hi + (hi - lo) * 0.05)
+    ax.set_xticks([])
+    ax.set_title(title)
+    label = ax.text(0.01, 0.97, "", transform=ax.transAxes, va="top")
+    _worker.update(
+        trace=trace,
+        rule=rule,
+        canvas=canvas,
+        bars=bars,
+        label=label,
+        heights=list(initial),
+        states=["plain"] * n,
+    )
+
+
+def _show(a, active, boundary, text):
+    # touch only the bars whose height or color differs from the last frame
+    w = _worker
+    bars, heights, states, rule = w["bars"], w["heights"], w["states"], w["rule"]
+    for j, v in enumerate(a):
+        if v != heights[j]:
+            bars[j].set_height(v)
+            heights[j] = v
+        state = _state(j, active, boundary, rule)
+        if state != states[j]:
+            bars[j].set_color(COLORS[state])
+            states[j] = state
+    w["label"].set_text(text)
+    w["canvas"].draw()
+
+
+def _render_chunk(first, indices, png_dir=None):
+    """Render steps `indices` (-1 is the initial array) as frames first, first + 1, ...
+
+    Returns (width, height, [raw RGBA bytes]); with png_dir the frames are
+    saved there instead and the list is empty.
+    """
+    trace, canvas = _worker["trace"], _worker["canvas"]
+    width, height = canvas.get_width_height()
+    total = len(trace)
+    a, pos = None, None
+    frames = []
+    for k, i in enumerate(indices):
+        if i == -1:
+            a, pos = trace.initial, -1
+        elif a is None:
+            a, pos = trace.array_at(i), i
+        else:
+            for step in range(pos + 1, i + 1):
+                for index, _, new in trace.deltas(step):
+                    a[index] = new
+            pos = i
+        if i == -1:
+            _show(a, -1, -1, "initial")
+        else:
+            _show(a, trace.active_indices[i], trace.sorted_boundaries[i], f"step {i + 1} / {total}")
+        rgba = bytes(canvas.buffer_rgba())
+        if png_dir is None:
+            frames.append(rgba)
+        else:
+            from PIL import Image
+
+            path = os.path.join(png_dir, f"frame_{first + k:05d}.png")
+            Image.frombuffer("RGBA", (width, height), rgba, "raw", "RGBA", 0, 1).save(path)
+    return width, height, frames
+
+
+def _ffmpeg():
+    try:
+        from matplotlib import rcParams
+        path = rcParams["animation.ffmpeg_path"]
+    except (ImportError, KeyError):
+        path = "ffmpeg"
+    return shutil.which(path)
+
+
+class _FFmpegWriter:
+    def __init__(self, path, size, fps, gif):
+        cmd = [
+            _ffmpeg(), "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{size[0]}x{size[1]}",
+            "-r", str(fps), "-i", "-",
+        ]
+        if gif:
+            cmd += ["-vf", "split[a][b];[a]palettegen[p];[b][p]paletteuse"]
+        else:
+            # yuv420p needs even dimensions
+            cmd += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-c:v", "libx264", "-pix_fmt", "yuv420p"]
+        cmd.append(path)
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def write(self, rgba):
+        self.proc.stdin.write(rgba)
+
+    def close(self):
+        self.proc.stdin.close()
+        if self.proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {self.proc.returncode}")
+
+
+class _PillowGifWriter:
+    def __init__(self, path, size, fps):
+        self.path, self.size = path, size
+        self.duration = int(1000 / fps)
+        self.frames = []
+
+    def write(self, rgba):
+        from PIL import Image
+
+        image = Image.frombuffer("RGBA", self.size, rgba, "raw", "RGBA", 0, 1).convert("RGB")
+        if self.frames:
+            image = image.quantize(palette=self.frames[0])
+        else:
+            image = image.quantize()
+        self.frames.append(image)
+
+    def close(self):
+        first, *rest = self.frames
+        first.save(self.path, save_all=True, append_images=rest, duration=self.duration, loop=0)
+
+
+class _NullWriter:
+    def write(self, rgba):
+        pass
+
+    def close(self):
+        pass
+
+
+def _open_writer(fmt, out, size, fps):
+    if fmt == "png":
+        return _NullWriter()
+    if _ffmpeg():
+        return _FFmpegWriter(out, size, fps, gif=(fmt == "gif"))
+    if fmt == "gif":
+        return _PillowGifWriter(out, size, fps)
+    raise RuntimeError("MP4 export needs ffmpeg on PATH (or matplotlib's animation.ffmpeg_path)")
+
+
+def export(trace, out, fmt=None, title="", rule="le", fps=30, max_frames=600,
+           size=(900, 420), dpi=100, workers=None):
+    """Write `trace` to `out` as gif, mp4 or png (a directory); returns the frame count."""
+    fmt = (fmt or os.path.splitext(out)[1].lstrip(".") or "png").lower()
+    if fmt not in ("gif", "mp4", "png"):
+        raise ValueError(f"unknown export format: {fmt!r}")
+    png_dir = None
+    if fmt == "png":
+        png_dir = out
+        os.makedirs(png_dir, exist_ok=True)
+
+    indices = [-1] + select_frames(trace, max(max_frames - 1, 2) if max_frames else None)
+    chunks = [indices[k:k + CHUNK] for k in range(0, len(indices), CHUNK)]
+    workers = workers or os.cpu_count() or 1
+    writer = None
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(trace, rule, title, size, dpi),
+    ) as pool:
+        pending = deque()
+        next_chunk = 0
+        try:
+            while next_chunk < len(chunks) or pending:
+                # bounded look-ahead: finished chunks wait in memory only
+                # until the writer reaches them
+                while next_chunk < len(chunks) and len(pending) < 2 * workers:
+                    first = next_chunk * CHUNK
+                    pending.append(pool.submit(_render_chunk, first, chunks[next_chunk], png_dir))
+                    next_chunk += 1
+                width, height, frames = pending.popleft().result()
+                if writer is None:
+                    writer = _open_writer(fmt, out, (width, height), fps)
+                for rgba in frames:
+                    writer.write(rgba)
+        finally:
+            for fut in pending:
+                fut.cancel()
+        if writer is not None:
+            writer.close()
+    return len(indices)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a sorting animation")
+    parser.add_argument("--algorithm", "-a", default="insertion", choices=sorted(ALGORITHMS))
+    parser.add_argument("--n", type=int, default=40, help="number of random values")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--values", type=int, nargs="+", help="sort these values instead")
+    parser.add_argument("--out", required=True, help="output .gif/.mp4 file or PNG directory")
+    parser.add_argument("--format", choices=["gif", "mp4", "png"], help="default: from --out")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--max-frames", type=int, default=600)
+    parser.add_argument("--width", type=int, default=900)
+    parser.add_argument("--height", type=int, default=420)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.values:
+        data = args.values
+    else:
+        rng = random.Random(args.seed)
+        data = rng.sample(range(1, max(30, 2 * args.n)), args.n)
+    if not data:
+        parser.error("nothing to sort")
+
+    title, stream_fn, kwargs, rule = ALGORITHMS[args.algorithm]
+    trace = record(stream_fn(data, **kwargs))
+    frames = export(trace, args.out, args.format, title, rule, args.fps, args.max_frames,
+                    (args.width, args.height), workers=args.workers)
+    print(f"wrote {frames} frames ({len(trace)} steps) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
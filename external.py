@@ -0,0 +1,330 @@
+# external.py - external merge sort for binary integer files larger than RAM
+#
+# Usage: python external.py data.bin sorted.bin --dtype int64 --memory 64M
+#        python external.py --generate data.bin --n 50000000
+#
+# The input is read through numpy.memmap. Phase 1 cuts it into runs that fit
+# the memory budget, sorts each run in memory with an algorithms.py function
+# (NumPy radix by default) and writes it back at the same offset of a run
+# file. Phase 2 merges up to fan_in adjacent runs at a time with a binary
+# heap; every run is read, and the output written, in blocks of
+# buffer_items, so a pass does a few large reads per run instead of one per
+# element. Merged runs keep their offsets, so passes alternate between two
+# run files and the last pass writes the output file.
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import algorithms as alg
+from steptrace import StepTrace
+
+# The run sort and the merge buffers work on Python lists: a pointer plus an
+# int object (up to 36 bytes for 64-bit values) per item, not itemsize.
+LIST_ITEM_BYTES = 8 + 36
+SORT_SPACE_FACTOR = 3  # lists the run sort holds at once: input, copy, output
+DEFAULT_BUFFER_BYTES = 1 << 20
+TRACE_POINTS = 256
+_SIGN_BIT = np.uint64(1 << 63)
+
+
+def parse_size(text):
+    """'64M', '1.5G', '4096' -> bytes."""
+    text = str(text).strip().upper()
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+class _RunReader:
+    """Sequential reader of one run, refilled a block at a time."""
+
+    def __init__(self, src, start, length, buffer_items, io):
+        self.src, self.pos, self.end = src, start, start + length
+        self.buffer_items = buffer_items
+        self.io = io
+        self.block, self.i = [], 0
+
+    def next(self):
+        # None once the run is exhausted
+        if self.i == len(self.block):
+            if self.pos == self.end:
+                return None
+            stop = min(self.pos + self.buffer_items, self.end)
+            chunk = np.asarray(self.src[self.pos:stop])
+            self.io["bytes_read"] += chunk.nbytes
+            self.io["read_calls"] += 1
+            self.block, self.i, self.pos = chunk.tolist(), 0, stop
+        v = self.block[self.i]
+        self.i += 1
+        return v
+
+
+class _RunWriter:
+    def __init__(self, dst, start, buffer_items, io):
+        self.dst, self.pos = dst, start
+        self.buffer_items = buffer_items
+        self.io = io
+        self.block = []
+
+    def write(self, v):
+        self.block.append(v)
+        if len(self.block) == self.buffer_items:
+            self.flush()
+
+    def flush(self):
+        if not self.block:
+            return
+        chunk = np.asarray(self.block, dtype=self.dst.dtype)
+        self.dst[self.pos:self.pos + len(chunk)] = chunk
+        self.io["bytes_written"] += chunk.nbytes
+        self.io["write_calls"] += 1
+        self.pos += len(chunk)
+        self.block = []
+
+
+def _sift_down(heap, pos):
+    # heap of [value, reader] pairs, ordered by value; returns comparisons
+    n = len(heap)
+    item = heap[pos]
+    comparisons = 0
+    while True:
+        child = 2 * pos + 1
+        if child >= n:
+            break
+        if child + 1 < n:
+            comparisons += 1
+            if heap[child + 1][0] < heap[child][0]:
+                child += 1
+        comparisons += 1
+        if heap[child][0] < item[0]:
+            heap[pos] = heap[child]
+            pos = child
+        else:
+            break
+    heap[pos] = item
+    return comparisons
+
+
+def _merge(src, dst, runs, buffer_items, io):
+    """k-way merge of the adjacent `runs` of src into dst at the same offset."""
+    writer = _RunWriter(dst, runs[0][0], buffer_items, io)
+    heap = []
+    for start, length in runs:
+        reader = _RunReader(src, start, length, buffer_items, io)
+        v = reader.next()
+        if v is not None:
+            heap.append([v, reader])
+    comparisons = 0
+    for pos in range(len(heap) // 2 - 1, -1, -1):
+        comparisons += _sift_down(heap, pos)
+    moves = 0
+    while heap:
+        top = heap[0]
+        writer.write(top[0])
+        moves += 1
+        v = top[1].next()
+        if v is None:
+            last = heap.pop()
+            if not heap:
+                break
+            heap[0] = last
+        else:
+            top[0] = v
+        comparisons += _sift_down(heap, 0)
+    writer.flush()
+    return comparisons, moves
+
+
+class _CoarseTrace:
+    """StepTrace over TRACE_POINTS evenly spaced positions, one step per run."""
+
+    def __init__(self, src, n, points=TRACE_POINTS):
+        self.positions = np.linspace(0, n - 1, num=min(points, n)).astype(np.int64)
+        self.view = np.asarray(src[self.positions]).tolist()
+        self.steps = StepTrace(self.view)
+
+    def update(self, dst, start, length):
+        lo = int(np.searchsorted(self.positions, start))
+        hi = int(np.searchsorted(self.positions, start + length))
+        if lo == hi:
+            return
+        self.view[lo:hi] = np.asarray(dst[self.positions[lo:hi]]).tolist()
+        # sorted_boundary marks the end of the range just written
+        self.steps.record(self.view, range(lo, hi), -1, hi - 1)
+
+
+def _to_signed(chunk):
+    # uint64 does not fit the int64 the sorts (and the NumPy kernels) work
+    # on; flipping the sign bit maps it onto int64 in the same order
+    if chunk.dtype == np.uint64:
+        return (chunk ^ _SIGN_BIT).view(np.int64)
+    return chunk
+
+
+def _from_signed(values, dtype):
+    if dtype == np.uint64:
+        return values.view(np.uint64) ^ _SIGN_BIT
+    return values.astype(dtype, copy=False)
+
+
+def _memmap(path, dtype, n, mode):
+    if n == 0:
+        # numpy cannot map an empty file
+        if mode == "w+":
+            open(path, "wb").close()
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, shape=(n,))
+
+
+def external_sort(path, out_path, dtype="int64", memory=64 << 20, record=False,
+                  algorithm="radix_sort_lsd", buffer_bytes=DEFAULT_BUFFER_BYTES,
+                  fan_in=None, tmp_dir=None, **kwargs):
+    """Sort the binary array in `path` into `out_path` within `memory` bytes.
+
+    Runs hold memory // (LIST_ITEM_BYTES * SORT_SPACE_FACTOR) values and are
+    sorted with algorithms.<algorithm>(run, record=False, **kwargs); the
+    default is the NumPy LSD radix with an automatic base. fan_in defaults to
+    as many input blocks as the budget holds next to the output block, each
+    block counted as a Python list of buffer_items values. Returns
+    (out_path, metrics), or (coarse StepTrace, metrics) with record=True;
+    metrics add run, merge-pass and I/O counters to comparisons/moves.
+    """
+    dtype = np.dtype(dtype)
+    if dtype.kind not in "iu":
+        raise TypeError("external_sort only sorts integer files")
+    if algorithm == "radix_sort_lsd" and not kwargs:
+        kwargs = {"base": None, "backend": "numpy"}
+    fn = getattr(alg, algorithm)
+    n = os.path.getsize(path) // dtype.itemsize
+    run_items = max(1, memory // (LIST_ITEM_BYTES * SORT_SPACE_FACTOR))
+    # buffer_bytes is the size of one read/write on disk; in memory a block
+    # is a list, so at least three (two runs and the output) must fit
+    buffer_items = max(1, min(buffer_bytes // dtype.itemsize, run_items,
+                              memory // (3 * LIST_ITEM_BYTES)))
+    if fan_in is None:
+        fan_in = memory // (buffer_items * LIST_ITEM_BYTES) - 1
+    fan_in = max(2, fan_in)
+
+    start = time.perf_counter()
+    io = {"bytes_read": 0, "bytes_written": 0, "read_calls": 0, "write_calls": 0}
+    comparisons = moves = 0
+    src = _memmap(path, dtype, n, "r")
+    trace = _CoarseTrace(src, n) if record and n else None
+
+    single = n <= run_items
+    tmp_paths = []
+    if not single:
+        for _ in range(2):
+            fd, tmp = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+            os.close(fd)
+            tmp_paths.append(tmp)
+    try:
+        # phase 1: sorted runs
+        dst = _memmap(out_path if single else tmp_paths[0], dtype, n, "w+")
+        runs = []
+        for lo in range(0, n, run_items):
+            chunk = np.asarray(src[lo:lo + run_items])
+            io["bytes_read"] += chunk.nbytes
+            io["read_calls"] += 1
+            out, m = fn(_to_signed(chunk).tolist(), record=False, **kwargs)
+            dst[lo:lo + len(chunk)] = _from_signed(np.asarray(out, dtype=np.int64), dtype)
+            io["bytes_written"] += chunk.nbytes
+            io["write_calls"] += 1
+            comparisons += m["comparisons"]
+            moves += m["moves"]
+            runs.append((lo, len(chunk)))
+            if trace is not None:
+                trace.update(dst, lo, len(chunk))
+        num_runs = len(runs)
+
+        # phase 2: merge passes, fan_in adjacent runs into one
+        passes = 0
+        while len(runs) > 1:
+            src, last = dst, len(runs) <= fan_in
+            target = out_path if last else tmp_paths[(passes + 1) % 2]
+            dst = _memmap(target, dtype, n, "w+")
+            merged = []
+            for g in range(0, len(runs), fan_in):
+                group = runs[g:g + fan_in]
+                c, mv = _merge(src, dst, group, buffer_items, io)
+                comparisons += c
+                moves += mv
+                length = sum(k for _, k in group)
+                merged.append((group[0][0], length))
+                if trace is not None:
+                    trace.update(dst, group[0][0], length)
+            runs = merged
+            passes += 1
+        if isinstance(dst, np.memmap):
+            dst.flush()
+        del src, dst
+    finally:
+        for tmp in tmp_paths:
+            os.remove(tmp)
+    seconds = time.perf_counter() - start
+
+    metrics = {
+        "comparisons": comparisons,
+        "moves": moves,
+        "seconds": seconds,
+        "n": n,
+        "runs": num_runs,
+        "run_items": run_items,
+        "merge_passes": passes,
+        "fan_in": fan_in,
+        "buffer_items": buffer_items,
+        **io,
+    }
+    if record:
+        return (trace.steps if trace is not None else StepTrace([])), metrics
+    return out_path, metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="External merge sort of a binary integer file")
+    parser.add_argument("input")
+    parser.add_argument("output", nargs="?")
+    parser.add_argument("--dtype", default="int64")
+    parser.add_argument("--memory", default="64M", help="memory budget, e.g. 256M or 2G")
+    parser.add_argument("--buffer", default="1M", help="I/O block size per run")
+    parser.add_argument("--fan-in", type=int, default=None)
+    parser.add_argument("--algorithm", default="radix_sort_lsd",
+                        help="algorithms.py function that sorts the runs")
+    parser.add_argument("--tmp-dir", default=None)
+    parser.add_argument("--generate", action="store_true",
+                        help="write --n random values of --dtype to INPUT and exit")
+    parser.add_argument("--n", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        rng = np.random.default_rng(args.seed)
+        info = np.iinfo(args.dtype)
+        mm = _memmap(args.input, args.dtype, args.n, "w+")
+        step = 1 << 20
+        for lo in range(0, args.n, step):
+            k = min(step, args.n - lo)
+            mm[lo:lo + k] = rng.integers(info.min, info.max, size=k, dtype=args.dtype,
+                                         endpoint=True)
+        if args.n:
+            mm.flush()
+        print(f"wrote {args.n} values to {args.input}")
+        return
+    if not args.output:
+        parser.error("an OUTPUT path is required")
+
+    _, m = external_sort(args.input, args.output, args.dtype, parse_size(args.memory),
+                         algorithm=args.algorithm, buffer_bytes=parse_size(args.buffer),
+                         fan_in=args.fan_in, tmp_dir=args.tmp_dir)
+    print(f"sorted {m['n']} values in {m['seconds']:.2f} s: {m['runs']} runs of "
+          f"{m['run_items']}, {m['merge_passes']} merge passes (fan-in {m['fan_in']})")
+    print(f"read {m['bytes_read'] / 2**20:.1f} MiB in {m['read_calls']} calls, "
+          f"wrote {m['bytes_written'] / 2**20:.1f} MiB in {m['write_calls']} calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+# kernels_numpy.py - NumPy backend for the non-comparison sorts
+#
+# Same results and comparisons/moves metrics as the pure-Python versions in
+# algorithms.py, but the histogram, prefix-sum and scatter phases run as
+# vectorized NumPy ops. With record=True the per-pass output arrays are fed
+# to StepTrace.record_pass, so the animation frames are identical.
+import math
+import sys
+import time
+
+import numpy as np
+
+from algorithms import (
+    DENSE_SPAN_FACTOR,
+    _INNER_SORTS,
+    _bucket_sort,
+    _choose_radix_bits,
+    _quantile_boundaries,
+    _radix_keys,
+    _run,
+)
+from steptrace import StepTrace
+
+
+def _as_int_array(a):
+    arr = np.asarray(a)
+    if arr.size and arr.dtype.kind not in "iu":
+        raise TypeError("the numpy backend only sorts integer arrays")
+    if arr.size and arr.dtype == np.uint64 and arr.max() > np.iinfo(np.int64).max:
+        raise OverflowError("the numpy backend only sorts integers that fit in int64")
+    return arr.astype(np.int64, copy=False)
+
+
+def _as_number_array(a):
+    # all-int (int64) or all-float (float64) input: NumPy would turn a mix,
+    # or ints past int64, into float64 and return floats
+    arr = np.asarray(a)
+    if arr.dtype == np.float64 and all(isinstance(v, float) for v in a):
+        return arr
+    if arr.dtype.kind not in "iu":
+        raise TypeError("the numpy backend only sorts all-int or all-float arrays")
+    return _as_int_array(arr)
+
+
+def _digit_dtype(base):
+    # small digit dtypes let argsort(kind="stable") use numpy's radix sort
+    if base <= 1 << 8:
+        return np.uint8
+    if base <= 1 << 16:
+        return np.uint16
+    return np.int64
+
+
+def _smaller_before(ranks):
+    # for each i: number of j < i with ranks[j] < ranks[i]; bottom-up merge
+    # levels, each answered for all elements at once with searchsorted
+    n = len(ranks)
+    out = np.zeros(n, dtype=np.int64)
+    pos = np.arange(n, dtype=np.int64)
+    width = 1
+    while width < n:
+        block = pos // (2 * width)
+        right = (pos // width) % 2 == 1
+        keys = block * n + ranks
+        left_keys = np.sort(keys[~right])
+        lo = np.searchsorted(left_keys, block[right] * n)
+        hi = np.searchsorted(left_keys, keys[right])
+        out[right] += hi - lo
+        width *= 2
+    return out
+
+
+def _finish(a, passes, counters, start, record):
+    seconds = time.perf_counter() - start
+    metrics = {**counters, "seconds": seconds}
+    if not record:
+        return passes[-1] if passes else list(a), metrics
+    steps = StepTrace(a)
+    for out in passes:
+        steps.record_pass(out)
+    return steps, metrics
+
+
+def _finish_unchanged(a, counters, start, record):
+    # nothing to sort: one step per slot without writes, like the Python core
+    seconds = time.perf_counter() - start
+    metrics = {**counters, "seconds": seconds}
+    if not record:
+        return list(a), metrics
+    steps = StepTrace(a)
+    for i in range(len(a)):
+        steps.record(a, (), i, i)
+    return steps, metrics
+
+
+def counting_sort_np(arr, k=None, record=True, mode="auto"):
+    a = list(arr)
+    if not a:
+        counters = {"comparisons": 0, "moves": 0, "mode": mode, "histogram_bytes": 0}
+        return _finish(a, [], counters, time.perf_counter(), record)
+    if mode not in ("auto", "dense", "sparse", "radix"):
+        raise ValueError(f"unknown counting sort mode: {mode!r}")
+
+    start = time.perf_counter()
+    x = _as_int_array(a)
+    n = len(a)
+    if k is not None:
+        lo, span, mode = 0, k, "dense"
+    else:
+        lo = int(x.min())
+        span = int(x.max()) - lo + 1
+    values = count = None
+    if mode == "auto":
+        # same choice as the Python version: dense for small spans, else
+        # sparse when keys repeat a lot (>= 4 per distinct key on average)
+        if span <= DENSE_SPAN_FACTOR * n + 256:
+            mode = "dense"
+        else:
+            values, count = np.unique(x, return_counts=True)
+            mode = "sparse" if len(values) * 4 <= n else "radix"
+
+    if mode == "radix":
+        out, counters = radix_sort_lsd_np(a, None, record=record)
+        counters["mode"] = "radix"
+        counters["histogram_bytes"] = sys.getsizeof([0] * counters["base"])
+        return out, counters
+
+    if mode == "dense":
+        # offset histogram; the prefix-sum + scatter phase collapses into one
+        # repeat, since value v fills [cumsum(count)[v-1], cumsum(count)[v])
+        count = np.bincount(x - lo, minlength=span)
+        out = np.repeat(np.arange(lo, lo + len(count)), count)
+        histogram_bytes = count.nbytes
+    else:
+        if values is None:
+            values, count = np.unique(x, return_counts=True)
+        out = np.repeat(values, count)
+        histogram_bytes = values.nbytes + count.nbytes
+    passes = [out.tolist()]
+    counters = {
+        "comparisons": 0,
+        "moves": n,
+        "mode": mode,
+        "histogram_bytes": histogram_bytes,
+    }
+    return _finish(a, passes, counters, start, record)
+
+
+def radix_sort_lsd_np(arr, base=10, record=True):
+    a = list(arr)
+    if not a:
+        counters = {"comparisons": 0, "moves": 0, "base": base, "passes": 0, "skipped_passes": 0}
+        return _finish(a, [], counters, time.perf_counter(), record)
+    if base is not None and base < 2:
+        raise ValueError("radix base must be >= 2")
+
+    start = time.perf_counter()
+    x = _as_int_array(a)
+    n = len(a)
+    bias, max_key = _radix_keys(int(x.min()), int(x.max()))
+    if base is None:
+        base = 1 << _choose_radix_bits(n, max_key.bit_length())
+    bits = base.bit_length() - 1 if base & (base - 1) == 0 else None
+    # unsigned keys; a bias of 2**63 is exactly the int64 sign-bit flip
+    keys = x.view(np.uint64) ^ np.uint64(bias) if bias == 1 << 63 else (x + bias).astype(np.uint64)
+    digit_dtype = _digit_dtype(base)
+
+    passes = []
+    skipped = 0
+    place = 0
+    while max_key >= base ** place:
+        if bits is not None:
+            digits = (keys >> np.uint64(bits * place)) & np.uint64(base - 1)
+        else:
+            digits = (keys // np.uint64(base ** place)) % np.uint64(base)
+        place += 1
+        if np.all(digits == digits[0]):
+            skipped += 1
+            continue
+        # stable scatter by digit == stable argsort of the digit column
+        order = np.argsort(digits.astype(digit_dtype), kind="stable")
+        x = x[order]
+        keys = keys[order]
+        passes.append(x.tolist())
+    counters = {
+        "comparisons": 0,
+        "moves": n * len(passes),
+        "base": base,
+        "passes": len(passes),
+        "skipped_passes": skipped,
+    }
+    return _finish(a, passes, counters, start, record)
+
+
+def _bisect_right_counted(bounds, x):
+    # vectorized form of the counted binary search in algorithms._bucket_sort
+    lo = np.zeros(len(x), dtype=np.int64)
+    hi = np.full(len(x), len(bounds), dtype=np.int64)
+    comparisons = 0
+    while True:
+        active = lo < hi
+        steps = int(np.count_nonzero(active))
+        if not steps:
+            return lo, comparisons
+        comparisons += steps
+        mid = (lo + hi) // 2
+        less = x < bounds[np.minimum(mid, len(bounds) - 1)]
+        hi = np.where(active & less, mid, hi)
+        lo = np.where(active & ~less, mid + 1, lo)
+
+
+def _unit_range(x, minv, maxv):
+    # (x - minv) / (maxv - minv) in float64, without the int64 overflow of
+    # spans past 2**63 and rounded like the Python version's int division
+    if x.dtype.kind == "f":
+        return (x - minv) / (maxv - minv)
+    minv, span = int(minv), int(maxv) - int(minv)
+    if span < 1 << 53:
+        # differences are exact in float64, so one rounding, like int / int
+        return (x - minv).astype(np.float64) / span
+    return np.array([(v - minv) / span for v in x.tolist()], dtype=np.float64)
+
+
+def bucket_sort_np(arr, num_buckets=None, record=True, adaptive=False, inner="tim",
+                   max_bucket=None):
+    if inner != "bucket" and inner not in _INNER_SORTS:
+        raise ValueError(f"unknown inner sort: {inner!r}")
+    a = list(arr)
+    if not a:
+        counters = {"comparisons": 0, "moves": 0, "bucket_sizes": [],
+                    "empty_buckets": 0, "oversized_buckets": 0}
+        return _finish(a, [], counters, time.perf_counter(), record)
+
+    n = len(a)
+    if num_buckets is None:
+        num_buckets = max(1, int(math.sqrt(n)))
+
+    start = time.perf_counter()
+    x = _as_number_array(a)
+    minv, maxv = x.min(), x.max()
+    single = {"comparisons": 0, "moves": 0, "bucket_sizes": [n],
+              "empty_buckets": 0, "oversized_buckets": 0}
+    comparisons = 0
+    if adaptive or minv < 0:
+        if minv == maxv:
+            return _finish_unchanged(a, single, start, record)
+        norm = _unit_range(x, minv, maxv)
+    else:
+        if maxv == 0:
+            return _finish_unchanged(a, single, start, record)
+        norm = x / (maxv + 1.0)
+
+    if adaptive:
+        # same seeded sample and cut points as the Python version
+        bounds, comparisons = _quantile_boundaries(norm.tolist(), num_buckets, 0)
+        idx, search_comparisons = _bisect_right_counted(np.asarray(bounds, dtype=np.float64), norm)
+        comparisons += search_comparisons
+    else:
+        idx = (norm * num_buckets).astype(np.int64)
+        idx = np.clip(idx, 0, num_buckets - 1)
+
+    # buckets in input order, then sorted inside each bucket
+    grouped_order = np.argsort(idx, kind="stable")
+    grouped = x[grouped_order]
+    bucket_of = idx[grouped_order]
+    out = grouped[np.lexsort((grouped, bucket_of))]
+
+    sizes = np.bincount(idx, minlength=num_buckets)
+    if max_bucket is None:
+        max_bucket = max(32, 4 * n // num_buckets) if adaptive else n
+    oversized = np.flatnonzero(sizes > max_bucket)
+
+    # insertion sort inside a bucket compares each key with every larger
+    # earlier key, plus one stopping comparison unless it reaches the front.
+    # Buckets are value-ordered, so "larger earlier keys" can be counted on
+    # the whole grouped array.
+    ranks = np.empty(n, dtype=np.int64)
+    ranks[np.argsort(grouped, kind="stable")] = np.arange(n)
+    greater_before = np.arange(n) - _smaller_before(ranks)
+    bucket_start = np.searchsorted(bucket_of, bucket_of, side="left")
+    pos_in_bucket = np.arange(n) - bucket_start
+    per_key = greater_before + (greater_before < pos_in_bucket)
+    insertion = ~np.isin(bucket_of, oversized)
+    comparisons += int(per_key[insertion].sum())
+    # one move per shifted key, one to place every key after the first
+    moves = n + int(greater_before[insertion].sum())
+    moves += int(np.count_nonzero(pos_in_bucket[insertion] > 0))
+
+    # oversized buckets go through the Python inner sort for their counters
+    for b in oversized:
+        bucket = grouped[bucket_of == b].tolist()
+        if inner == "bucket" and len(bucket) < n:
+            core = _bucket_sort(bucket, None, record=False, adaptive=True,
+                                inner=inner, depth=1)
+        else:
+            core = _INNER_SORTS["tim" if inner == "bucket" else inner](bucket, record=False)
+        _, m = _run(core, bucket, False)
+        comparisons += m["comparisons"]
+        moves += m["moves"]
+
+    passes = [out.tolist()]
+    counters = {
+        "comparisons": comparisons,
+        "moves": moves,
+        "bucket_sizes": sizes.tolist(),
+        "empty_buckets": int(np.count_nonzero(sizes == 0)),
+        "oversized_buckets": len(oversized),
+    }
+    return _finish(a, passes, counters, start, record)
@@ -1,21 +1,212 @@
-from algorithms import insertion_sort
+# main.py - play a sorting trace in the terminal
+#
+# Usage: python main.py --algorithm heap --n 60 --speed 200
+#
+# Steps come from the algorithm's *_stream generator while it runs, so long
+# traces start playing at once and are never stored. Bars are drawn with ANSI
+# escapes; a frame only rewrites the cells of bars whose height or color
+# changed since the last frame, and frames are capped at --fps (several
+# steps per frame when --speed is higher). Works over SSH, no browser needed.
+import argparse
+import random
+import shutil
+import sys
+import time
 
-my_list = [5, 2, 4, 6, 1, 3]
-steps = insertion_sort(my_list)
-prev = None
+import algorithms as alg
 
+# slug -> (title, stream function, kwargs, color rule). The rules are the
+# ones trace_player.PALETTES uses: a bar j is "sorted" when j <= boundary
+# ("le"), j >= boundary ("ge"), j == boundary ("eq") or never ("none").
+ALGORITHMS = {
+    "insertion": ("Insertion Sort", alg.insertion_sort_stream, {}, "le"),
+    "merge": ("Merge Sort", alg.merge_sort_stream, {}, "le"),
+    "tim": ("Tim Sort", alg.tim_sort_stream, {}, "le"),
+    "quick": ("Quick Sort", alg.quick_sort_stream, {}, "eq"),
+    "introsort": ("Quick Sort (Introsort)", alg.quick_sort_stream, {"mode": "introsort"}, "eq"),
+    "counting": ("Counting Sort", alg.counting_sort_stream, {}, "eq"),
+    "radix": ("Radix Sort (LSD)", alg.radix_sort_lsd_stream, {"base": 10}, "le"),
+    "heap": ("Heap Sort", alg.heap_sort_stream, {}, "ge"),
+    "shell": ("Shell Sort", alg.shell_sort_stream, {}, "none"),
+    "bucket": ("Bucket Sort", alg.bucket_sort_stream, {}, "le"),
+}
 
-def print_step(step, prev_step=None):
-    for i, num in enumerate(step):
-        bar = "█" * num
-        if prev_step and prev_step[i] != num:
-            print(f"{num:>2} {bar} <- shifted")
+RESET = "\x1b[0m"
+COLORS = {"active": "\x1b[31m", "sorted": "\x1b[32m", "plain": "\x1b[37m"}
+
+
+class TerminalRenderer:
+    """Vertical bars, one column group per element, redrawn cell by cell."""
+
+    def __init__(self, values, rule, out=None, color=True, size=None):
+        cols, rows = size or shutil.get_terminal_size()
+        self.n = len(values)
+        if self.n > cols:
+            raise ValueError(f"{self.n} bars do not fit in {cols} terminal columns")
+        self.width = max(1, min(3, cols // self.n))
+        self.height = max(4, rows - 2)  # two lines below the bars for status
+        self.rule = rule
+        self.out = out or sys.stdout
+        self.color = color
+        self.lo, self.hi = min(values), max(values)
+        self.heights = [0] * self.n
+        self.states = ["plain"] * self.n
+        self.active = -1
+        self.boundary = -1
+        self._buf = []
+
+    def _bar_height(self, v):
+        if self.hi == self.lo:
+            return self.height
+        return 1 + int((v - self.lo) * (self.height - 1) / (self.hi - self.lo))
+
+    def _state(self, j):
+        if j == self.active:
+            return "active"
+        b, rule = self.boundary, self.rule
+        if (rule == "le" and j <= b) or (rule == "eq" and j == b) or (rule == "ge" and b != -1 and j >= b):
+            return "sorted"
+        return "plain"
+
+    def _recolor_candidates(self, active, boundary):
+        # bars whose color can differ between the drawn and the new state
+        cand = {self.active, active}
+        b0, b1 = self.boundary, boundary
+        if self.rule == "le":
+            cand.update(range(min(b0, b1) + 1, max(b0, b1) + 1))
+        elif self.rule == "ge":
+            b0 = self.n if b0 == -1 else b0
+            b1 = self.n if b1 == -1 else b1
+            cand.update(range(min(b0, b1), max(b0, b1)))
+        elif self.rule == "eq":
+            cand.update((b0, b1))
+        cand.discard(-1)
+        return {j for j in cand if 0 <= j < self.n}
+
+    def _draw_cells(self, j, levels, h, state):
+        if self.color:
+            self._buf.append(COLORS[state])
+        x = j * self.width + 1
+        for level in levels:
+            y = self.height - level + 1
+            cell = "█" * self.width if level <= h else " " * self.width
+            self._buf.append(f"\x1b[{y};{x}H{cell}")
+
+    def draw_full(self, a, active=-1, boundary=-1):
+        self._buf.append("\x1b[2J\x1b[?25l")
+        self.active, self.boundary = active, boundary
+        for j, v in enumerate(a):
+            self.heights[j] = self._bar_height(v)
+            self.states[j] = self._state(j)
+            self._draw_cells(j, range(1, self.height + 1), self.heights[j], self.states[j])
+
+    def update(self, a, changed, active, boundary):
+        """Redraw the bars in `changed` (written indices) and recolored ones."""
+        recolor = self._recolor_candidates(active, boundary)
+        self.active, self.boundary = active, boundary
+        for j in set(changed) | recolor:
+            h = self._bar_height(a[j])
+            state = self._state(j)
+            old_h = self.heights[j]
+            if state != self.states[j]:
+                levels = range(1, max(h, old_h) + 1)
+            elif h != old_h:
+                levels = range(min(h, old_h) + 1, max(h, old_h) + 1)
+            else:
+                continue
+            self._draw_cells(j, levels, h, state)
+            self.heights[j] = h
+            self.states[j] = state
+
+    def status(self, text):
+        self._buf.append(f"{RESET}\x1b[{self.height + 1};1H\x1b[2K{text}")
+
+    def flush(self):
+        self.out.write("".join(self._buf))
+        self.out.flush()
+        self._buf.clear()
+
+    def close(self):
+        self.out.write(f"{RESET}\x1b[{self.height + 2};1H\x1b[?25h\n")
+        self.out.flush()
+
+
+def play(stream, renderer, title, speed=60.0, fps=30.0):
+    """Consume `stream`, drawing at most `fps` frames per second.
+
+    Each frame advances max(1, speed / fps) steps, so playback runs at
+    `speed` steps per second; if drawing falls behind, frames are not
+    made up later.
+    """
+    per_frame = max(1.0, speed / fps)
+    interval = per_frame / speed
+    renderer.draw_full(stream.array)
+    renderer.status(f"{title}  step 0")
+    renderer.flush()
+    next_frame = time.perf_counter() + interval
+    changed = set()
+    credit = per_frame
+    steps = 0
+    event = None
+    for event in stream:
+        changed.update(event["written"])
+        steps += 1
+        credit -= 1
+        if credit > 0:
+            continue
+        credit += per_frame
+        renderer.update(event["array"], changed, event["active_index"], event["sorted_boundary"])
+        changed.clear()
+        renderer.status(f"{title}  step {steps}")
+        renderer.flush()
+        now = time.perf_counter()
+        if next_frame > now:
+            time.sleep(next_frame - now)
+            next_frame += interval
         else:
-            print(f"{num:>2} {bar}")
-    print("-" * 20)
+            next_frame = now + interval
+    if event is not None:
+        renderer.update(event["array"], changed, -1, event["sorted_boundary"])
+    m = stream.metrics
+    renderer.status(
+        f"{title}  {steps} steps  comparisons {m['comparisons']}  moves {m['moves']}  "
+        f"{m['seconds'] * 1000:.2f} ms in the algorithm"
+    )
+    renderer.flush()
+    return steps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a sorting trace in the terminal")
+    parser.add_argument("--algorithm", "-a", default="insertion", choices=sorted(ALGORITHMS))
+    parser.add_argument("--n", type=int, default=40, help="number of random values")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--values", type=int, nargs="+", help="sort these values instead")
+    parser.add_argument("--speed", type=float, default=60.0, help="steps per second")
+    parser.add_argument("--fps", type=float, default=30.0, help="maximum frames per second")
+    parser.add_argument("--no-color", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.values:
+        data = args.values
+    else:
+        rng = random.Random(args.seed)
+        data = rng.sample(range(1, max(30, 2 * args.n)), args.n)
+    if not data:
+        parser.error("nothing to sort")
+
+    title, stream_fn, kwargs, rule = ALGORITHMS[args.algorithm]
+    try:
+        renderer = TerminalRenderer(data, rule, color=not args.no_color)
+    except ValueError as exc:
+        parser.error(str(exc))
+    try:
+        play(stream_fn(data, **kwargs), renderer, title, args.speed, args.fps)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        renderer.close()
 
 
-for i, step in enumerate(steps):
-    print(f"Step {i + 1}: {step}")
-    print_step(step, prev)
-    prev = step
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+# parallel.py - multi-process merge sort and sample sort over shared memory
+#
+# The input is copied once into a multiprocessing.shared_memory segment that
+# holds two int64 (all-int input) or float64 (all-float input) buffers of n
+# values; worker processes attach to it by name, so no array is ever pickled,
+# only (lo, hi) ranges.
+#   merge sort   every worker sorts one block with algorithms.merge_sort,
+#                then adjacent runs are merged pairwise, round by round. Each
+#                merge is split into output segments whose input ranges are
+#                found by binary search (co-ranking), so all workers take
+#                part in every round, the last one included.
+#   sample sort  splitters come from a sorted random sample of max(32,
+#                log2 n) values per worker (oversampling); every worker
+#                sorts its block and cuts it at the splitters, then worker j
+#                gathers the j-th piece of every block (bucket exchange) and
+#                merges them with algorithms.tim_sort into place.
+# Metrics hold the usual totals plus per-worker comparisons/moves/busy time,
+# the load imbalance (max / mean busy time) and, with speedup=True, the
+# wall-clock speedup over the sequential algorithm on the same input.
+import array
+import math
+import os
+import random
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import algorithms as alg
+
+MIN_SAMPLES_PER_WORKER = 32
+
+_shared = {}
+
+
+def _init_worker(name, typecode, n):
+    shm = shared_memory.SharedMemory(name=name)
+    _shared.update(shm=shm, view=shm.buf.cast(typecode), n=n)
+
+
+def _typecode(values):
+    # one buffer type for the whole input: a mix would be rounded through
+    # float64 (large ints, bools) or fail in a worker (None, str)
+    if all(type(v) is int for v in values):
+        if not (-(1 << 63) <= min(values) and max(values) < 1 << 63):
+            raise OverflowError("parallel sorts need int values that fit in int64")
+        return "q"
+    if all(type(v) is float for v in values):
+        return "d"
+    raise TypeError("parallel sorts need all-int or all-float values")
+
+
+def _read(buf, lo, hi):
+    base = buf * _shared["n"]
+    return _shared["view"][base + lo:base + hi].tolist()
+
+
+def _write(buf, lo, values):
+    view = _shared["view"]
+    base = buf * _shared["n"]
+    view[base + lo:base + lo + len(values)] = array.array(view.format, values)
+
+
+def _result(start, comparisons, moves):
+    return {"pid": os.getpid(), "seconds": time.perf_counter() - start,
+            "comparisons": comparisons, "moves": moves}
+
+
+def _sort_block(buf, lo, hi, algorithm):
+    start = time.perf_counter()
+    out, m = getattr(alg, algorithm)(_read(buf, lo, hi), record=False)
+    _write(buf, lo, out)
+    return _result(start, m["comparisons"], m["moves"])
+
+
+def _copy_range(src, lo, hi):
+    start = time.perf_counter()
+    _write(1 - src, lo, _read(src, lo, hi))
+    return _result(start, 0, hi - lo)
+
+
+def _merge_segment(src, a_lo, a_hi, b_hi, k_lo, k_hi):
+    """Outputs k_lo..k_hi of merging runs [a_lo, a_hi) and [a_hi, b_hi) of src."""
+    start = time.perf_counter()
+    view = _shared["view"]
+    base = src * _shared["n"]
+    na, nb = a_hi - a_lo, b_hi - a_hi
+    comparisons = 0
+
+    def corank(k):
+        # elements of the left run among the first k outputs; ties go left
+        nonlocal comparisons
+        lo, hi = max(0, k - nb), min(k, na)
+        while lo < hi:
+            i = (lo + hi) // 2
+            comparisons += 1
+            if view[base + a_lo + i] <= view[base + a_hi + k - i - 1]:
+                lo = i + 1
+            else:
+                hi = i
+        return lo
+
+    i0, i1 = corank(k_lo), corank(k_hi)
+    left = _read(src, a_lo + i0, a_lo + i1)
+    right = _read(src, a_hi + k_lo - i0, a_hi + k_hi - i1)
+    out = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        comparisons += 1
+        if left[i] <= right[j]:
+            out.append(left[i])
+            i += 1
+        else:
+            out.append(right[j])
+            j += 1
+    out.extend(left[i:])
+    out.extend(right[j:])
+    _write(1 - src, a_lo + k_lo, out)
+    return _result(start, comparisons, len(out))
+
+
+def _splitters(arr, workers, seed):
+    # oversampling: max(32, log2 n) sampled values per bucket and a splitter
+    # at every such stretch of the sorted sample, so bucket sizes stay close
+    # to n / workers; returns (splitters, sample sort comparisons)
+    n = len(arr)
+    per_worker = max(MIN_SAMPLES_PER_WORKER, math.ceil(math.log2(n)))
+    rng = random.Random(seed)
+    sample = [arr[i] for i in rng.sample(range(n), min(n, per_worker * workers))]
+    sample, m = alg.tim_sort(sample, record=False)
+    size = len(sample)
+    return [sample[j * size // workers] for j in range(1, workers)], m["comparisons"]
+
+
+def _bisect_left(values, x):
+    # counted binary search: first index with values[i] >= x
+    lo, hi = 0, len(values)
+    comparisons = 0
+    while lo < hi:
+        mid = (lo + hi) // 2
+        comparisons += 1
+        if values[mid] < x:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo, comparisons
+
+
+def _sort_and_cut(lo, hi, splitters, algorithm):
+    # sample sort phase 1: sort block, return where each bucket starts in it
+    start = time.perf_counter()
+    out, m = getattr(alg, algorithm)(_read(0, lo, hi), record=False)
+    _write(0, lo, out)
+    comparisons = m["comparisons"]
+    cuts = [0]
+    for s in splitters:
+        cut, c = _bisect_left(out, s)
+        cuts.append(cut)
+        comparisons += c
+    cuts.append(len(out))
+    result = _result(start, comparisons, m["moves"])
+    result["cuts"] = cuts
+    return result
+
+
+def _gather_bucket(pieces, out_lo, algorithm):
+    # sample sort phase 2: the bucket's sorted piece of every block, merged
+    # (tim sort finds the runs and merges them) into buffer 1
+    start = time.perf_counter()
+    values = []
+    for lo, hi in pieces:
+        values.extend(_read(0, lo, hi))
+    out, m = getattr(alg, algorithm)(values, record=False)
+    _write(1, out_lo, out)
+    return _result(start, m["comparisons"], m["moves"] + len(out))
+
+
+class _InlineExecutor:
+    """workers=1: run the tasks in this process, on the same shared buffers."""
+
+    def submit(self, fn, *args):
+        fut = Future()
+        fut.set_result(fn(*args))
+        return fut
+
+
+def _blocks(n, parts):
+    return [(n * p // parts, n * (p + 1) // parts) for p in range(parts)]
+
+
+def _run_parallel(arr, workers, body):
+    # shared buffers and pool around body(pool, n, workers) -> (result buffer,
+    # extra metrics); returns (sorted list, metrics) without totals/speedup
+    n = len(arr)
+    typecode = _typecode(arr)
+    itemsize = array.array(typecode).itemsize
+    shm = shared_memory.SharedMemory(create=True, size=2 * n * itemsize)
+    view = shm.buf.cast(typecode)
+    saved = dict(_shared)
+    try:
+        view[:n] = array.array(typecode, arr)
+        if workers == 1:
+            _shared.update(shm=shm, view=view, n=n)
+            buf, extra, tasks = body(_InlineExecutor(), n, workers)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shm.name, typecode, n)) as pool:
+                buf, extra, tasks = body(pool, n, workers)
+        out = view[buf * n:(buf + 1) * n].tolist()
+    finally:
+        _shared.clear()
+        _shared.update(saved)
+        view.release()
+        shm.close()
+        shm.unlink()
+    return out, extra, tasks
+
+
+def _worker_metrics(tasks, workers):
+    by_pid = {}
+    for t in tasks:
+        w = by_pid.setdefault(t["pid"], {"tasks": 0, "comparisons": 0, "moves": 0, "seconds": 0.0})
+        w["tasks"] += 1
+        w["comparisons"] += t["comparisons"]
+        w["moves"] += t["moves"]
+        w["seconds"] += t["seconds"]
+    per_worker = [by_pid[pid] for pid in sorted(by_pid)]
+    # workers that never got a task count as idle for the imbalance
+    busy = [w["seconds"] for w in per_worker] + [0.0] * (workers - len(per_worker))
+    mean = sum(busy) / len(busy)
+    return per_worker, (max(busy) / mean if mean > 0 else 1.0)
+
+
+def _parallel_sort(arr, workers, record, speedup, sequential, body):
+    if record:
+        raise ValueError("parallel sorts do not record steps; use record=False")
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    start = time.perf_counter()
+    if len(arr) < 2:
+        out, extra, tasks = list(arr), {}, []
+    else:
+        out, extra, tasks = _run_parallel(arr, workers, body)
+    seconds = time.perf_counter() - start
+    per_worker, imbalance = _worker_metrics(tasks, workers)
+    metrics = {
+        "comparisons": sum(t["comparisons"] for t in tasks) + extra.pop("comparisons", 0),
+        "moves": sum(t["moves"] for t in tasks),
+        "seconds": seconds,
+        "workers": workers,
+        "per_worker": per_worker,
+        "imbalance": imbalance,
+        **extra,
+    }
+    if speedup:
+        _, m = sequential(arr, record=False)
+        metrics["sequential_seconds"] = m["seconds"]
+        metrics["speedup"] = m["seconds"] / seconds if seconds > 0 else 0.0
+    return out, metrics
+
+
+def parallel_merge_sort(arr, workers=None, record=False, speedup=False):
+    """Merge sort on `workers` processes; (sorted list, metrics).
+
+    Stable, like merge_sort. metrics add "rounds" (pairwise merge rounds).
+    """
+    def body(pool, n, workers):
+        runs = _blocks(n, workers)
+        tasks = [f.result() for f in [pool.submit(_sort_block, 0, lo, hi, "merge_sort")
+                                      for lo, hi in runs if hi > lo]]
+        runs = [r for r in runs if r[1] > r[0]]
+        src = rounds = 0
+        while len(runs) > 1:
+            futures, merged = [], []
+            for p in range(0, len(runs), 2):
+                if p + 1 == len(runs):
+                    lo, hi = runs[p]
+                    futures.append(pool.submit(_copy_range, src, lo, hi))
+                    merged.append(runs[p])
+                    continue
+                (a_lo, a_hi), (_, b_hi) = runs[p], runs[p + 1]
+                total = b_hi - a_lo
+                # output segments in proportion to the merge's share of n
+                parts = max(1, round(workers * total / n))
+                for s in range(parts):
+                    futures.append(pool.submit(_merge_segment, src, a_lo, a_hi, b_hi,
+                                               total * s // parts, total * (s + 1) // parts))
+                merged.append((a_lo, b_hi))
+            tasks.extend(f.result() for f in futures)
+            runs = merged
+            src = 1 - src
+            rounds += 1
+        return src, {"rounds": rounds}, tasks
+
+    return _parallel_sort(arr, workers, record, speedup, alg.merge_sort, body)
+
+
+def parallel_sample_sort(arr, workers=None, record=False, speedup=False, seed=0):
+    """Sample sort on `workers` processes; (sorted list, metrics).
+
+    Blocks are sorted with tim_sort and every bucket is merged with it, so
+    equal keys keep their input order. metrics add "bucket_sizes" and the
+    sample sort's comparisons.
+    """
+    def body(pool, n, workers):
+        splitters, sample_comparisons = _splitters(arr, workers, seed)
+        blocks = _blocks(n, workers)
+        cut_results = [f.result() for f in [pool.submit(_sort_and_cut, lo, hi, splitters, "tim_sort")
+                                            for lo, hi in blocks]]
+        # bucket j: piece [cuts[j], cuts[j + 1]) of every block, written after
+        # all of buckets 0..j-1
+        futures, sizes = [], []
+        out_lo = 0
+        for j in range(workers):
+            pieces = [(lo + r["cuts"][j], lo + r["cuts"][j + 1])
+                      for (lo, _), r in zip(blocks, cut_results)]
+            size = sum(hi - lo for lo, hi in pieces)
+            if size:
+                futures.append(pool.submit(_gather_bucket, pieces, out_lo, "tim_sort"))
+            sizes.append(size)
+            out_lo += size
+        tasks = cut_results + [f.result() for f in futures]
+        return 1, {"comparisons": sample_comparisons, "bucket_sizes": sizes}, tasks
+
+    return _parallel_sort(arr, workers, record, speedup, alg.tim_sort, body)
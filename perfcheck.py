@@ -0,0 +1,201 @@
+# perfcheck.py - statistical benchmark with saved baselines
+#
+# Usage: python perfcheck.py --n 2000 --save baselines/main.json
+#        python perfcheck.py --n 2000 --compare baselines/main.json
+#
+# Every algorithm is timed in calibrated samples (timeit-style autorange:
+# enough loops per sample to reach --min-time), with the garbage collector
+# off while timing. Reports median, IQR and a bootstrap confidence interval
+# of the median. --compare bootstraps the ratio of medians against a saved
+# baseline and exits with status 1 if any algorithm is significantly slower.
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import algorithms as alg
+from benchmark import ALGORITHMS, gc_disabled
+from datasets import GENERATORS, load_dataset
+
+SCHEMA_VERSION = 1
+BOOTSTRAP_RESAMPLES = 2000
+
+
+def _time_loops(fn, data, kwargs, loops):
+    # seconds per call as measured by the sort itself (input copy excluded)
+    total = 0.0
+    with gc_disabled():
+        for _ in range(loops):
+            _, m = fn(data, record=False, **kwargs)
+            total += m["seconds"]
+    return total / loops
+
+
+def autorange(fn, data, kwargs, min_time=0.2):
+    """Loops per sample so one sample takes at least min_time (1, 2, 5, 10, ...)."""
+    scale = 1
+    while True:
+        for loops in (scale, 2 * scale, 5 * scale):
+            if _time_loops(fn, data, kwargs, loops) * loops >= min_time:
+                return loops
+        scale *= 10
+
+
+def bootstrap_ci(samples, stat=statistics.median, confidence=0.95, seed=0):
+    rng = random.Random(seed)
+    n = len(samples)
+    values = sorted(stat(rng.choices(samples, k=n)) for _ in range(BOOTSTRAP_RESAMPLES))
+    tail = (1 - confidence) / 2
+    return values[int(tail * BOOTSTRAP_RESAMPLES)], values[int((1 - tail) * BOOTSTRAP_RESAMPLES) - 1]
+
+
+def describe(samples, confidence=0.95):
+    if len(samples) > 1:
+        q1, _, q3 = statistics.quantiles(samples, n=4)
+    else:
+        q1 = q3 = samples[0]
+    lo, hi = bootstrap_ci(samples, confidence=confidence)
+    return {
+        "median": statistics.median(samples),
+        "iqr": q3 - q1,
+        "ci": [lo, hi],
+        "min": min(samples),
+        "max": max(samples),
+    }
+
+
+def measure(data, samples=15, min_time=0.2, algorithms=ALGORITHMS, log=print):
+    results = {}
+    for name, func_name, kwargs in algorithms:
+        fn = getattr(alg, func_name)
+        try:
+            fn(data, record=False, **kwargs)  # warm-up
+            loops = autorange(fn, data, kwargs, min_time)
+            times = [_time_loops(fn, data, kwargs, loops) for _ in range(samples)]
+        except (RecursionError, MemoryError) as exc:
+            # e.g. Lomuto quick sort on sorted input; no result, so no baseline entry
+            log(f"{name:<24} skipped: {type(exc).__name__}")
+            continue
+        results[name] = {"loops": loops, "samples": times, **describe(times)}
+        r = results[name]
+        log(f"{name:<24} median {r['median'] * 1000:9.3f} ms  IQR {r['iqr'] * 1000:8.3f} ms  "
+            f"CI [{r['ci'][0] * 1000:.3f}, {r['ci'][1] * 1000:.3f}]  ({loops} loops x {samples})")
+    return results
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def make_baseline(results, params):
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+
+
+def save_baseline(baseline, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(baseline, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("schema") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: baseline schema {baseline.get('schema')!r}, "
+                         f"expected {SCHEMA_VERSION}")
+    return baseline
+
+
+def compare(baseline, results, threshold=0.05, confidence=0.95, seed=0):
+    """Bootstrap the current/baseline ratio of medians for every algorithm.
+
+    "slower" when the whole confidence interval lies above 1 + threshold,
+    "faster" when it lies below 1 - threshold, "same" otherwise.
+    """
+    rng = random.Random(seed)
+    tail = (1 - confidence) / 2
+    rows = []
+    for name, cur in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        old, new = base["samples"], cur["samples"]
+        ratios = sorted(
+            statistics.median(rng.choices(new, k=len(new)))
+            / statistics.median(rng.choices(old, k=len(old)))
+            for _ in range(BOOTSTRAP_RESAMPLES)
+        )
+        lo = ratios[int(tail * BOOTSTRAP_RESAMPLES)]
+        hi = ratios[int((1 - tail) * BOOTSTRAP_RESAMPLES) - 1]
+        if lo > 1 + threshold:
+            verdict = "slower"
+        elif hi < 1 - threshold:
+            verdict = "faster"
+        else:
+            verdict = "same"
+        rows.append({
+            "algorithm": name,
+            "ratio": cur["median"] / base["median"],
+            "ci": [lo, hi],
+            "verdict": verdict,
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Statistical benchmark with baselines")
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--distribution", default="uniform", choices=sorted(GENERATORS))
+    parser.add_argument("--samples", type=int, default=15)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per sample")
+    parser.add_argument("--threshold", type=float, default=0.05,
+                        help="relative slowdown that counts as a regression")
+    parser.add_argument("--save", help="write the results as a baseline JSON")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    args = parser.parse_args(argv)
+
+    params = {"n": args.n, "seed": args.seed, "distribution": args.distribution}
+    baseline = load_baseline(args.compare) if args.compare else None
+    if baseline is not None and baseline["params"] != params:
+        parser.error(f"baseline was measured with {baseline['params']}, not {params}")
+
+    data = load_dataset(args.distribution, args.n, args.seed).tolist()
+    results = measure(data, args.samples, args.min_time)
+
+    if args.save:
+        save_baseline(make_baseline(results, params), args.save)
+        print(f"\nwrote {args.save}")
+
+    if baseline is not None:
+        print(f"\nagainst {args.compare} (revision {baseline.get('revision') or '?'})")
+        rows = compare(baseline, results, args.threshold)
+        for r in rows:
+            print(f"{r['algorithm']:<24} x{r['ratio']:.3f}  "
+                  f"CI [{r['ci'][0]:.3f}, {r['ci'][1]:.3f}]  {r['verdict']}")
+        if any(r["verdict"] == "slower" for r in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# probe.py - opt-in instrumentation for the sorting cores in algorithms.py
+#
+# The cores keep their own "comparisons"/"moves" cost model. For counts that
+# mean the same thing in every algorithm, probe_run() sorts an instrumented
+# copy instead: the array becomes a ProbedList (a list subclass that counts
+# element reads, writes and swaps), every element a ProbedValue (counts
+# comparisons), and auxiliary buffers are registered through algorithms._aux
+# or by slicing. Nothing of this exists on a normal run, so it costs nothing
+# when it is not used.
+COUNTERS = (
+    "reads",
+    "writes",
+    "swaps",
+    "comparisons",
+    "aux_reads",
+    "aux_writes",
+    "aux_allocs",
+    "aux_cells",
+)
+
+
+class Probe:
+    """Shared counters for one instrumented run."""
+
+    def __init__(self):
+        self.counts = dict.fromkeys(COUNTERS, 0)
+
+    def aux(self, values):
+        """Register an auxiliary buffer and return its instrumented version."""
+        buf = ProbedList(values, self, aux=True)
+        self.counts["aux_allocs"] += 1
+        self.counts["aux_cells"] += len(buf)
+        return buf
+
+    def as_dict(self):
+        return dict(self.counts)
+
+
+class ProbedList(list):
+    """list that reports element accesses to a Probe.
+
+    A swap is two writes that exchange the values of the two most recently
+    read slots, which is what `a[i], a[j] = a[j], a[i]` compiles to.
+    """
+
+    def __init__(self, values, probe, aux=False):
+        super().__init__(values)
+        self.probe = probe
+        self._read_key = "aux_reads" if aux else "reads"
+        self._write_key = "aux_writes" if aux else "writes"
+        self._last_reads = (None, None)
+        self._pending = None  # first write of a possible swap
+
+    def __getitem__(self, i):
+        counts = self.probe.counts
+        if isinstance(i, slice):
+            values = super().__getitem__(i)
+            counts[self._read_key] += len(values)
+            return self.probe.aux(values)
+        counts[self._read_key] += 1
+        value = super().__getitem__(i)
+        self._last_reads = (self._last_reads[1], (i, value))
+        self._pending = None
+        return value
+
+    def __setitem__(self, i, value):
+        counts = self.probe.counts
+        if isinstance(i, slice):
+            values = list(value)
+            counts[self._write_key] += len(values)
+            self._pending = None
+            return super().__setitem__(i, values)
+        counts[self._write_key] += 1
+        pending = self._pending
+        if pending is not None and self._is_swap(pending, (i, value)):
+            counts["swaps"] += 1
+            self._pending = None
+        else:
+            self._pending = (i, value)
+        super().__setitem__(i, value)
+
+    def _is_swap(self, first, second):
+        # both writes store the value just read from the other slot
+        r1, r2 = self._last_reads
+        if r1 is None or first[0] == second[0]:
+            return False
+        reads = {r1[0]: r1[1], r2[0]: r2[1]}
+        return reads.get(second[0]) is first[1] and reads.get(first[0]) is second[1]
+
+    def __iter__(self):
+        self.probe.counts[self._read_key] += len(self)
+        return super().__iter__()
+
+    def __reversed__(self):
+        self.probe.counts[self._read_key] += len(self)
+        return super().__reversed__()
+
+    def append(self, value):
+        self.probe.counts[self._write_key] += 1
+        self.probe.counts["aux_cells"] += 1
+        super().append(value)
+
+    def copy(self):
+        return ProbedList(super().__iter__(), self.probe)
+
+
+def _unwrap(x):
+    return x.value if type(x) is ProbedValue else x
+
+
+class ProbedValue:
+    """Element wrapper counting element-vs-element comparisons.
+
+    Comparisons against plain numbers (derived keys, constants) and
+    arithmetic are not counted; arithmetic returns plain numbers.
+    """
+
+    __slots__ = ("value", "probe")
+
+    def __init__(self, value, probe):
+        self.value = value
+        self.probe = probe
+
+    def __lt__(self, other):
+        if type(other) is ProbedValue:
+            self.probe.counts["comparisons"] += 1
+            return self.value < other.value
+        return self.value < other
+
+    def __le__(self, other):
+        if type(other) is ProbedValue:
+            self.probe.counts["comparisons"] += 1
+            return self.value <= other.value
+        return self.value <= other
+
+    def __gt__(self, other):
+        if type(other) is ProbedValue:
+            self.probe.counts["comparisons"] += 1
+            return self.value > other.value
+        return self.value > other
+
+    def __ge__(self, other):
+        if type(other) is ProbedValue:
+            self.probe.counts["comparisons"] += 1
+            return self.value >= other.value
+        return self.value >= other
+
+    def __eq__(self, other):
+        if type(other) is ProbedValue:
+            self.probe.counts["comparisons"] += 1
+            return self.value == other.value
+        return self.value == other
+
+    def __ne__(self, other):
+        if type(other) is ProbedValue:
+            self.probe.counts["comparisons"] += 1
+            return self.value != other.value
+        return self.value != other
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __index__(self):
+        return self.value.__index__()
+
+    def __int__(self):
+        return int(self.value)
+
+    def __float__(self):
+        return float(self.value)
+
+    def __neg__(self):
+        return -self.value
+
+    def __getattr__(self, name):
+        # int/float methods such as bit_length
+        return getattr(self.value, name)
+
+    def __repr__(self):
+        return f"ProbedValue({self.value!r})"
+
+
+def _binary(op):
+    def forward(self, other):
+        return op(self.value, _unwrap(other))
+
+    def reflected(self, other):
+        return op(_unwrap(other), self.value)
+
+    return forward, reflected
+
+
+for _name, _op in {
+    "add": lambda x, y: x + y,
+    "sub": lambda x, y: x - y,
+    "mul": lambda x, y: x * y,
+    "truediv": lambda x, y: x / y,
+    "floordiv": lambda x, y: x // y,
+    "mod": lambda x, y: x % y,
+    "lshift": lambda x, y: x << y,
+    "rshift": lambda x, y: x >> y,
+    "and": lambda x, y: x & y,
+    "or": lambda x, y: x | y,
+    "xor": lambda x, y: x ^ y,
+}.items():
+    _fwd, _rev = _binary(_op)
+    setattr(ProbedValue, f"__{_name}__", _fwd)
+    setattr(ProbedValue, f"__r{_name}__", _rev)
+
+
+def probe_run(fn, arr, **kwargs):
+    """fn(arr, record=False, **kwargs) on an instrumented copy of arr.
+
+    Returns (sorted list, metrics) like a record=False run, with the probe
+    counts under metrics["probe"]. Only the pure-Python backend can be
+    instrumented.
+    """
+    if kwargs.get("backend", "python") != "python":
+        raise ValueError("only the python backend can be instrumented")
+    if kwargs.get("workers") is not None:
+        raise ValueError("parallel sorts cannot be instrumented")
+    if kwargs.get("key") is not None or kwargs.get("reverse"):
+        # keys are taken out of the instrumented list before the sort runs
+        raise ValueError("key=/reverse= sorts cannot be instrumented")
+    probe = Probe()
+    probed = ProbedList((ProbedValue(v, probe) for v in arr), probe)
+    out, metrics = fn(probed, record=False, **kwargs)
+    return [_unwrap(v) for v in list.__iter__(out)], {**metrics, "probe": probe.as_dict()}
@@ -0,0 +1,149 @@
+# scaling.py - headless size-sweep benchmark for every algorithm
+#
+# Usage: python scaling.py --min-n 10 --max-n 1000000 --out scaling_report
+#
+# Sweeps n over a geometric range, times metrics-only runs, fits empirical
+# growth exponents (log-log least squares) and writes JSON + CSV reports.
+import argparse
+import csv
+import json
+import math
+import statistics
+
+import algorithms as alg
+from benchmark import ALGORITHMS
+from datasets import GENERATORS, load_dataset
+
+
+def geometric_sizes(min_n, max_n, per_decade):
+    sizes = []
+    steps = max(1, round(math.log10(max_n / min_n) * per_decade))
+    for i in range(steps + 1):
+        n = round(min_n * (max_n / min_n) ** (i / steps))
+        if not sizes or n > sizes[-1]:
+            sizes.append(n)
+    return sizes
+
+
+def fit_exponent(ns, values):
+    """Slope of log(value) against log(n); None with fewer than two points."""
+    pts = [(math.log(n), math.log(v)) for n, v in zip(ns, values) if n > 1 and v > 0]
+    if len(pts) < 2:
+        return None
+    mx = statistics.mean(x for x, _ in pts)
+    my = statistics.mean(y for _, y in pts)
+    sxx = sum((x - mx) ** 2 for x, _ in pts)
+    if sxx == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in pts) / sxx
+
+
+def fit_report(rows):
+    ns = [r["n"] for r in rows]
+    report = {}
+    for metric in ("seconds", "comparisons", "moves"):
+        values = [r[metric] for r in rows]
+        # exponent of value / (n log n): ~0 means the metric grows as n log n
+        nlogn = [v / (n * math.log2(n)) if n > 1 else 0 for n, v in zip(ns, values)]
+        report[metric] = {
+            "exponent": fit_exponent(ns, values),
+            "exponent_vs_nlogn": fit_exponent(ns, nlogn),
+        }
+    return report
+
+
+def crossovers(results):
+    """Sizes at which one algorithm overtakes another in measured time."""
+    found = []
+    names = list(results)
+    for i, a in enumerate(names):
+        for b in names[i + 1:]:
+            ta = {r["n"]: r["seconds"] for r in results[a]}
+            tb = {r["n"]: r["seconds"] for r in results[b]}
+            common = sorted(set(ta) & set(tb))
+            for prev, n in zip(common, common[1:]):
+                if (ta[prev] < tb[prev]) != (ta[n] < tb[n]):
+                    faster = a if ta[n] < tb[n] else b
+                    found.append({"between": [a, b], "n": n, "faster_after": faster})
+    return found
+
+
+def run_sweep(sizes, repeats=3, budget=2.0, seed=0, distribution="uniform", log=print):
+    inputs = {n: load_dataset(distribution, n, seed).tolist() for n in sizes}
+    results = {}
+    for name, func_name, kwargs in ALGORITHMS:
+        fn = getattr(alg, func_name)
+        rows = []
+        for n in sizes:
+            data = inputs[n]
+            times = []
+            try:
+                for _ in range(repeats):
+                    out, m = fn(data, record=False, **kwargs)
+                    times.append(m["seconds"])
+            except (RecursionError, MemoryError) as exc:
+                log(f"{name:<18} n={n:<9} failed: {type(exc).__name__}")
+                break
+            rows.append({
+                "n": n,
+                "seconds": min(times),
+                "comparisons": m["comparisons"],
+                "moves": m["moves"],
+            })
+            log(f"{name:<18} n={n:<9} {min(times) * 1000:10.3f} ms")
+            # stop growing n once a single run blows the per-size budget
+            if min(times) > budget:
+                log(f"{name:<18} over {budget}s budget, skipping larger n")
+                break
+        results[name] = rows
+    return results
+
+
+def write_reports(results, prefix, params):
+    report = {
+        "params": params,
+        "results": results,
+        "fits": {name: fit_report(rows) for name, rows in results.items()},
+        "crossovers": crossovers(results),
+    }
+    with open(f"{prefix}.json", "w") as f:
+        json.dump(report, f, indent=2)
+    with open(f"{prefix}.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["algorithm", "n", "seconds", "comparisons", "moves"])
+        writer.writeheader()
+        for name, rows in results.items():
+            for r in rows:
+                writer.writerow({"algorithm": name, **r})
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Size-sweep scaling benchmark")
+    parser.add_argument("--min-n", type=int, default=10)
+    parser.add_argument("--max-n", type=int, default=1_000_000)
+    parser.add_argument("--per-decade", type=int, default=3, help="sizes per factor of 10")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=2.0,
+                        help="stop an algorithm once one run takes longer (seconds)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--distribution", default="uniform", choices=sorted(GENERATORS))
+    parser.add_argument("--out", default="scaling_report", help="output path prefix")
+    args = parser.parse_args(argv)
+
+    sizes = geometric_sizes(args.min_n, args.max_n, args.per_decade)
+    results = run_sweep(sizes, args.repeats, args.budget, args.seed, args.distribution)
+    report = write_reports(results, args.out, vars(args))
+
+    print()
+    print(f"{'Algorithm':<18} {'time exp':>9} {'cmp exp':>9} {'time/nlogn':>11}")
+    for name, fits in report["fits"].items():
+        def fmt(v):
+            return f"{v:9.2f}" if v is not None else f"{'-':>9}"
+        print(f"{name:<18} {fmt(fits['seconds']['exponent'])} "
+              f"{fmt(fits['comparisons']['exponent'])} "
+              f"{fmt(fits['seconds']['exponent_vs_nlogn']):>11}")
+    print(f"\nwrote {args.out}.json and {args.out}.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# steptrace.py - compact step traces for the sorting algorithms
+#
+# A trace stores the initial array once, a full keyframe every
+# `keyframe_interval` steps and, per step, the (index, old, new) writes that
+# step made. Any step can be rebuilt by replaying deltas from the nearest
+# keyframe, so memory grows with the number of writes instead of n * steps.
+import struct
+import sys
+from array import array
+
+
+def _value_store(values, like=None):
+    # typed buffer for the element values, falling back to a plain list
+    typecode = like.typecode if isinstance(like, array) else None
+    if like is None:
+        if all(type(v) is int for v in values):
+            typecode = "q"
+        elif all(type(v) is float for v in values):
+            typecode = "d"
+    if typecode is not None:
+        try:
+            return array(typecode, values)
+        except (TypeError, OverflowError):
+            pass
+    return list(values)
+
+
+def _buffer_bytes(buf):
+    if isinstance(buf, array):
+        return buf.itemsize * len(buf)
+    return sys.getsizeof(buf) + sum(sys.getsizeof(v) for v in buf)
+
+
+class StepTrace:
+    """Delta-encoded list of sorting steps.
+
+    Indexing and iteration yield the same dicts the algorithms used to
+    append ({"array", "active_index", "sorted_boundary"}), rebuilt on demand.
+    """
+
+    def __init__(self, initial, keyframe_interval=None):
+        self._initial = _value_store(initial)
+        self._current = list(initial)  # shadow of the live array, for old values
+        self.keyframe_interval = keyframe_interval or max(32, len(initial))
+        self._keyframes = [self._initial]
+        # deltas of step i live in [offsets[i], offsets[i + 1])
+        self._offsets = array("q", [0])
+        self._index = array("q")
+        self._old = _value_store([], like=self._initial)
+        self._new = _value_store([], like=self._initial)
+        self._active = array("q")
+        self._boundary = array("q")
+
+    def _push(self, buf_name, value):
+        buf = getattr(self, buf_name)
+        try:
+            buf.append(value)
+        except (TypeError, OverflowError):
+            buf = list(buf)
+            buf.append(value)
+            setattr(self, buf_name, buf)
+
+    def _extend(self, buf_name, values):
+        buf = getattr(self, buf_name)
+        try:
+            buf.extend(values)
+        except (TypeError, OverflowError):
+            buf = list(buf)
+            buf.extend(values)
+            setattr(self, buf_name, buf)
+
+    def record_pass(self, after):
+        """Record a left-to-right pass that writes after[i] into slot i.
+
+        One step per slot, with active index and sorted boundary both i,
+        which is how the counting/radix/bucket sorts copy out their output.
+        """
+        cur = self._current
+        n = len(after)
+        start = len(self)
+        base = len(self._index)
+        self._index.extend(range(n))
+        self._extend("_old", cur[:n])
+        self._extend("_new", after)
+        self._offsets.extend(range(base + 1, base + n + 1))
+        self._active.extend(range(n))
+        self._boundary.extend(range(n))
+        # keyframes that fall inside the pass: first m slots already written
+        interval = self.keyframe_interval
+        for s in range((start // interval + 1) * interval, start + n + 1, interval):
+            m = s - start
+            self._keyframes.append(
+                _value_store(list(after[:m]) + cur[m:], like=self._initial)
+            )
+        cur[:n] = after
+
+    def record(self, a, written, active_index, sorted_boundary):
+        """Close one step; `written` are the indices of `a` changed by it."""
+        cur = self._current
+        for i in written:
+            v = a[i]
+            self._index.append(i)
+            self._push("_old", cur[i])
+            self._push("_new", v)
+            cur[i] = v
+        self._offsets.append(len(self._index))
+        self._active.append(active_index)
+        self._boundary.append(sorted_boundary)
+        if len(self._active) % self.keyframe_interval == 0:
+            self._keyframes.append(_value_store(cur, like=self._initial))
+
+    def __len__(self):
+        return len(self._active)
+
+    def _normalize(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("step index out of range")
+        return i
+
+    def array_at(self, i):
+        """Array contents after step i, replayed from the nearest keyframe."""
+        i = self._normalize(i)
+        k = (i + 1) // self.keyframe_interval
+        a = list(self._keyframes[k])
+        index, new = self._index, self._new
+        for d in range(self._offsets[k * self.keyframe_interval], self._offsets[i + 1]):
+            a[index[d]] = new[d]
+        return a
+
+    def deltas(self, i):
+        """(index, old, new) writes made by step i."""
+        i = self._normalize(i)
+        lo, hi = self._offsets[i], self._offsets[i + 1]
+        return list(zip(self._index[lo:hi], self._old[lo:hi], self._new[lo:hi]))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = self._normalize(i)
+        return {
+            "array": self.array_at(i),
+            "active_index": self._active[i],
+            "sorted_boundary": self._boundary[i],
+        }
+
+    def __iter__(self):
+        a = list(self._initial)
+        index, new, offsets = self._index, self._new, self._offsets
+        for i in range(len(self)):
+            for d in range(offsets[i], offsets[i + 1]):
+                a[index[d]] = new[d]
+            yield {
+                "array": a.copy(),
+                "active_index": self._active[i],
+                "sorted_boundary": self._boundary[i],
+            }
+
+    @property
+    def initial(self):
+        return list(self._initial)
+
+    @property
+    def active_indices(self):
+        return self._active
+
+    @property
+    def sorted_boundaries(self):
+        return self._boundary
+
+    def to_bytes(self):
+        """Pack the trace for client-side playback (see trace_player.py).
+
+        Little-endian layout, every section padded to 8 bytes:
+        header  b"STRC", u32 version, n, steps, writes, value kind (0 int32, 1 float64)
+        initial values[n]; u32 writes-per-step[steps]; u32 index[writes];
+        new values[writes]; i32 active[steps]; i32 boundary[steps]
+        """
+        values = list(self._initial) + list(self._new)
+        if all(type(v) is int and -2**31 <= v < 2**31 for v in values):
+            kind, typecode = 0, "i"
+        else:
+            kind, typecode = 1, "d"
+        counts = array("I", (self._offsets[i + 1] - self._offsets[i] for i in range(len(self))))
+        sections = [
+            array(typecode, self._initial),
+            counts,
+            array("I", self._index),
+            array(typecode, self._new),
+            array("i", self._active),
+            array("i", self._boundary),
+        ]
+        header = struct.pack(
+            "<4s5I", b"STRC", 1, len(self._initial), len(self), len(self._index), kind
+        )
+        out = [header, b"\0" * (-len(header) % 8)]
+        for section in sections:
+            if sys.byteorder == "big":
+                section.byteswap()
+            raw = section.tobytes()
+            out.append(raw)
+            out.append(b"\0" * (-len(raw) % 8))
+        return b"".join(out)
+
+    @property
+    def nbytes(self):
+        """Approximate bytes held by the trace buffers."""
+        buffers = [self._offsets, self._index, self._old, self._new,
+                   self._active, self._boundary, *self._keyframes]
+        return sum(_buffer_bytes(b) for b in buffers)
+
+
+def select_frames(steps, max_frames):
+    # step indices to animate (app.py, export.py): first/last, pass and
+    # merge boundaries, then evenly spaced steps up to the frame budget
+    n_steps = len(steps)
+    if max_frames is not None:
+        max_frames = max(max_frames, 2)  # first and last step at least
+    if max_frames is None or n_steps <= max_frames:
+        return list(range(n_steps))
+    active = getattr(steps, "active_indices", None)
+    boundary = getattr(steps, "sorted_boundaries", None)
+    if active is None:
+        active = [s.get("active_index", -1) for s in steps]
+        boundary = [s.get("sorted_boundary", -1) for s in steps]
+
+    keep = {0, n_steps - 1}
+    for i in range(1, n_steps):
+        if boundary[i] == active[i]:
+            # output-copy passes (counting/radix/bucket): a pass restarts
+            new_segment = active[i] < active[i - 1]
+        else:
+            new_segment = boundary[i] != boundary[i - 1]
+        if new_segment:
+            keep.update((i - 1, i))
+    keep = sorted(keep)
+    if len(keep) > max_frames:
+        # more boundaries than budget: thin them evenly, keep the end state
+        stride = len(keep) / (max_frames - 1)
+        keep = {keep[int(k * stride)] for k in range(max_frames - 1)}
+        keep.add(n_steps - 1)
+    elif len(keep) < max_frames:
+        spare = max_frames - len(keep)
+        stride = n_steps / spare
+        keep = set(keep) | {int(k * stride) for k in range(spare)}
+    return sorted(keep)
@@ -0,0 +1,110 @@
+import itertools
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import algorithms as alg  # noqa: E402
+from batch import NETWORK_MAX_WIDTH, choose_method, network_layers, sort_batch, throughput  # noqa: E402
+
+
+@pytest.mark.parametrize("n", range(1, 13))
+def test_network_sorts_every_zero_one_input(n):
+    # 0-1 principle: a comparator network that sorts all 0/1 inputs sorts all inputs
+    layers = network_layers(n)
+    for layer in layers:
+        touched = [i for pair in layer for i in pair]
+        assert len(touched) == len(set(touched))  # one layer, disjoint pairs
+        assert all(i < j < n for i, j in layer)
+    for bits in itertools.product((0, 1), repeat=n):
+        a = list(bits)
+        for layer in layers:
+            for i, j in layer:
+                if a[i] > a[j]:
+                    a[i], a[j] = a[j], a[i]
+        assert a == sorted(bits)
+
+
+@pytest.mark.parametrize("n, comparators", [(2, 1), (4, 5), (8, 19), (16, 63), (32, 191)])
+def test_network_sizes_match_batcher(n, comparators):
+    assert sum(len(layer) for layer in network_layers(n)) == comparators
+
+
+def _rows(rng, rows, width, lo, hi, dtype=np.int64):
+    return rng.integers(lo, hi, size=(rows, width), dtype=dtype, endpoint=True)
+
+
+@pytest.mark.parametrize("method, width, lo, hi", [
+    ("network", 1, 0, 9),
+    ("network", 7, -50, 50),
+    ("network", NETWORK_MAX_WIDTH, -10**12, 10**12),
+    ("counting", 20, -5, 40),
+    ("radix", 40, -2**63, 2**63 - 1),
+    ("radix", 9, -8, 3),
+    ("python", 13, -100, 100),
+    ("auto", 5, 0, 3),
+    ("auto", 50, 0, 100),
+    ("auto", 50, -10**15, 10**15),
+])
+def test_sort_batch_2d(method, width, lo, hi):
+    x = _rows(np.random.default_rng(width), 300, width, lo, hi)
+    out, m = sort_batch(x, method)
+    assert isinstance(out, np.ndarray) and out.dtype == x.dtype and out.shape == x.shape
+    np.testing.assert_array_equal(out, np.sort(x, axis=1))
+    assert len(m["comparisons"]) == len(m["moves"]) == m["rows"] == 300
+    assert sum(m["methods"].values()) == 300
+    assert m["arrays_per_second"] > 0
+
+
+def test_sort_batch_floats_and_small_dtypes():
+    rng = np.random.default_rng(1)
+    for x in (rng.normal(size=(50, 10)), rng.normal(size=(50, 40)).astype(np.float32),
+              rng.integers(0, 255, size=(50, 40), dtype=np.uint8)):
+        out, m = sort_batch(x)
+        assert out.dtype == x.dtype
+        np.testing.assert_array_equal(out, np.sort(x, axis=1))
+
+
+def test_sort_batch_list_of_mixed_widths():
+    rng = np.random.default_rng(2)
+    arrays = [rng.integers(-20, 20, size=w).tolist() for w in [3, 0, 8, 3, 40, 8, 1, 40, 100]]
+    out, m = sort_batch(arrays)
+    assert out == [sorted(a) for a in arrays]
+    assert all(type(row) is list for row in out)
+    assert m["methods"] == {"network": 6, "counting": 3}
+
+
+def test_python_method_reports_per_row_metrics():
+    x = _rows(np.random.default_rng(3), 20, 12, 0, 50)
+    out, m = sort_batch(x, "python", algorithm="heap_sort")
+    for row, comparisons, moves in zip(x.tolist(), m["comparisons"], m["moves"]):
+        _, expected = alg.heap_sort(row, record=False)
+        assert (comparisons, moves) == (expected["comparisons"], expected["moves"])
+
+
+def test_network_metrics():
+    x = np.array([[1, 2, 3, 4], [4, 3, 2, 1]])
+    _, m = sort_batch(x, "network")
+    assert m["comparisons"] == [5, 5]
+    assert m["moves"][0] == 0 and m["moves"][1] > 0
+
+
+def test_choose_method_checks_explicit_choices():
+    ints = np.zeros((2, 8), dtype=np.int64)
+    with pytest.raises(ValueError):
+        choose_method(ints, "bogus")
+    with pytest.raises(ValueError):
+        choose_method(np.zeros((2, NETWORK_MAX_WIDTH + 1), dtype=np.int64), "network")
+    for method in ("counting", "radix"):
+        with pytest.raises(TypeError):
+            choose_method(np.zeros((2, 8)), method)
+        with pytest.raises(TypeError):
+            choose_method(np.zeros((2, 8), dtype=np.uint64), method)
+    assert choose_method(np.zeros((2, 64)), "auto") == "python"
+    with pytest.raises(ValueError):
+        sort_batch(np.zeros(5))
+
+
+def test_throughput():
+    x = _rows(np.random.default_rng(4), 200, 8, 0, 100)
+    assert throughput(x, "network", repeat=2) > 0
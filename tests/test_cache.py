@@ -0,0 +1,31 @@
+import cache
+from cache import TraceCache, cache_key
+
+
+def test_key_depends_on_name_params_and_input():
+    base = cache_key("merge_sort", {"a": 1}, [3, 1, 2])
+    assert base == cache_key("merge_sort", {"a": 1}, [3, 1, 2])
+    assert base != cache_key("heap_sort", {"a": 1}, [3, 1, 2])
+    assert base != cache_key("merge_sort", {"a": 2}, [3, 1, 2])
+    assert base != cache_key("merge_sort", {"a": 1}, [3, 2, 1])
+
+
+def test_key_changes_with_code_version(monkeypatch):
+    before = cache_key("merge_sort", {}, [3, 1, 2])
+    monkeypatch.setattr(cache, "code_version", lambda: "other")
+    assert cache_key("merge_sort", {}, [3, 1, 2]) != before
+
+
+def test_disk_entry_from_other_code_version_is_not_read(tmp_path, monkeypatch):
+    calls = []
+
+    def fn(data):
+        calls.append(1)
+        return sorted(data), {}
+
+    TraceCache(disk_dir=str(tmp_path)).run("sorted", fn, [2, 1])
+    TraceCache(disk_dir=str(tmp_path)).run("sorted", fn, [2, 1])
+    assert len(calls) == 1
+    monkeypatch.setattr(cache, "code_version", lambda: "other")
+    TraceCache(disk_dir=str(tmp_path)).run("sorted", fn, [2, 1])
+    assert len(calls) == 2
@@ -0,0 +1,101 @@
+import os
+import random
+
+import pytest
+
+pytest.importorskip("matplotlib")
+Image = pytest.importorskip("PIL.Image")
+
+import algorithms as alg  # noqa: E402
+import export  # noqa: E402
+from main import ALGORITHMS  # noqa: E402
+
+SIZE = (160, 90)
+
+
+def _data(n=30, seed=0):
+    return random.Random(seed).sample(range(1, 100), n)
+
+
+def _trace(slug="heap", data=None):
+    title, stream_fn, kwargs, rule = ALGORITHMS[slug]
+    return export.record(stream_fn(data or _data(), **kwargs)), title, rule
+
+
+@pytest.mark.parametrize("slug", sorted(ALGORITHMS))
+def test_record_matches_the_algorithm_trace(slug):
+    title, stream_fn, kwargs, rule = ALGORITHMS[slug]
+    data = _data()
+    func_name = stream_fn.__name__[:-len("_stream")]
+    steps, _ = getattr(alg, func_name)(data, **kwargs)
+    assert list(export.record(stream_fn(data, **kwargs))) == list(steps)
+
+
+@pytest.mark.parametrize("slug", ["heap", "merge", "counting", "shell"])
+def test_incremental_frames_match_fresh_figures(slug):
+    # one figure updated bar by bar across a chunk draws the same pixels as
+    # a new figure per frame
+    trace, title, rule = _trace(slug)
+    indices = [-1] + list(range(0, len(trace), max(1, len(trace) // 12))) + [len(trace) - 1]
+    export._init_worker(trace, rule, title, SIZE, 50)
+    width, height, frames = export._render_chunk(0, indices)
+    assert (width, height) == SIZE
+    assert len(frames) == len(indices)
+    for k, i in enumerate(indices):
+        export._init_worker(trace, rule, title, SIZE, 50)
+        _, _, (fresh,) = export._render_chunk(0, [i])
+        assert frames[k] == fresh, i
+
+
+def test_png_export(tmp_path):
+    trace, title, rule = _trace()
+    out = tmp_path / "frames"
+    count = export.export(trace, str(out), title=title, rule=rule, max_frames=40,
+                          size=SIZE, workers=2)
+    names = sorted(os.listdir(out))
+    assert count == len(names) <= 40
+    assert names[0] == "frame_00000.png" and names[-1] == f"frame_{count - 1:05d}.png"
+    # frame 0 is the initial array, the last one the sorted array
+    export._init_worker(trace, rule, title, SIZE, 100)
+    _, _, (first, last) = export._render_chunk(0, [-1, len(trace) - 1])
+    for name, raw in ((names[0], first), (names[-1], last)):
+        with Image.open(out / name) as im:
+            assert im.size == SIZE
+            assert im.convert("RGBA").tobytes() == raw
+
+
+def test_gif_export_without_ffmpeg(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "_ffmpeg", lambda: None)
+    trace, title, rule = _trace()
+    path = tmp_path / "heap.gif"
+    count = export.export(trace, str(path), title=title, rule=rule, max_frames=25,
+                          size=SIZE, workers=2)
+    with Image.open(path) as im:
+        assert im.format == "GIF" and im.size == SIZE
+        assert im.n_frames == count
+
+
+@pytest.mark.skipif(export._ffmpeg() is None, reason="needs ffmpeg")
+@pytest.mark.parametrize("fmt", ["gif", "mp4"])
+def test_ffmpeg_export(tmp_path, fmt):
+    trace, title, rule = _trace()
+    path = tmp_path / f"heap.{fmt}"
+    export.export(trace, str(path), title=title, rule=rule, max_frames=25, size=SIZE, workers=2)
+    assert path.stat().st_size > 0
+
+
+def test_export_errors(tmp_path, monkeypatch):
+    trace, _, _ = _trace()
+    with pytest.raises(ValueError):
+        export.export(trace, str(tmp_path / "x.avi"))
+    monkeypatch.setattr(export, "_ffmpeg", lambda: None)
+    with pytest.raises(RuntimeError):
+        export.export(trace, str(tmp_path / "x.mp4"), size=SIZE, workers=1)
+
+
+def test_main_writes_frames(tmp_path, capsys):
+    out = tmp_path / "frames"
+    export.main(["--algorithm", "insertion", "--values", "4", "2", "3", "1", "--out", str(out),
+                 "--width", "160", "--height", "90", "--workers", "1"])
+    assert "frames" in capsys.readouterr().out
+    assert len(os.listdir(out)) > 1
@@ -0,0 +1,46 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from external import external_sort  # noqa: E402
+
+
+@pytest.mark.parametrize("dtype", ["int64", "uint64", "int32", "uint8"])
+def test_round_trip_multi_pass(tmp_path, dtype):
+    info = np.iinfo(dtype)
+    rng = np.random.default_rng(0)
+    data = rng.integers(info.min, info.max, size=5000, dtype=dtype, endpoint=True)
+    # both ends of the range, e.g. INT64_MIN, which the radix run sort biases
+    # by exactly 2**63, and uint64 values on either side of 2**63
+    data[:4] = [info.min, info.max, info.min, 0]
+    if dtype == "uint64":
+        data[4:14] = [0, 1, 2**63 - 1, 2**63, 2**63 + 1, 2**64 - 1, 5, 2**63, 7, 2**64 - 2]
+    src = tmp_path / "in.bin"
+    out = tmp_path / "out.bin"
+    data.tofile(src)
+    # tiny budget: many runs and more than one merge pass
+    _, m = external_sort(str(src), str(out), dtype, memory=16 << 10, buffer_bytes=256, fan_in=4)
+    assert m["runs"] > 4 and m["merge_passes"] > 1
+    result = np.fromfile(out, dtype=dtype)
+    assert result.dtype == np.dtype(dtype)
+    np.testing.assert_array_equal(result, np.sort(data))
+
+
+def test_single_run_and_empty(tmp_path):
+    for data in (np.array([3, -1, 2], dtype=np.int64), np.array([], dtype=np.int64)):
+        src, out = tmp_path / "in.bin", tmp_path / "out.bin"
+        data.tofile(src)
+        external_sort(str(src), str(out))
+        np.testing.assert_array_equal(np.fromfile(out, dtype=np.int64), np.sort(data))
+
+
+@pytest.mark.parametrize("dtype", ["int64", "uint64"])
+def test_default_settings_with_extremes(tmp_path, dtype):
+    info = np.iinfo(dtype)
+    data = np.array([5, info.max, info.min, 0, info.min + 1, info.max - 1, 3] * 200, dtype=dtype)
+    src, out = tmp_path / "in.bin", tmp_path / "out.bin"
+    data.tofile(src)
+    for memory in (64 << 20, 32 << 10):  # one run; several runs and the default fan-in
+        _, m = external_sort(str(src), str(out), dtype, memory=memory)
+        np.testing.assert_array_equal(np.fromfile(out, dtype=dtype), np.sort(data))
+    assert m["runs"] > 1
@@ -0,0 +1,53 @@
+import math
+import random
+
+import pytest
+
+import algorithms as alg
+from algorithms import INTRO_SMALL
+
+
+def test_introsort_fuzz_against_sorted():
+    rng = random.Random(0)
+    for _ in range(300):
+        n = rng.choice([0, 1, 2, 3, INTRO_SMALL, INTRO_SMALL + 1, rng.randint(0, 400)])
+        hi = rng.choice([1, 3, 50, 10**6])
+        data = [rng.randint(-hi, hi) for _ in range(n)]
+        out, m = alg.quick_sort(data, record=False, mode="introsort")
+        assert out == sorted(data)
+        steps, m_rec = alg.quick_sort(data, mode="introsort")
+        assert (steps.array_at(-1) if len(steps) else data) == out
+        assert (m_rec["comparisons"], m_rec["moves"]) == (m["comparisons"], m["moves"])
+
+
+N = 4000
+ADVERSARIAL = {
+    "sorted": list(range(N)),
+    "reversed": list(range(N, 0, -1)),
+    "organ_pipe": list(range(N // 2)) + list(range(N // 2, 0, -1)),
+    "constant": [7] * N,
+    "two_values": [i % 2 for i in range(N)],
+}
+
+
+@pytest.mark.parametrize("kind", sorted(ADVERSARIAL))
+def test_introsort_adversarial_inputs_stay_n_log_n(kind):
+    data = ADVERSARIAL[kind]
+    out, m = alg.quick_sort(data, record=False, mode="introsort")
+    assert out == sorted(data)
+    assert m["comparisons"] < 4 * N * math.log2(N)
+
+
+def test_introsort_falls_back_to_heap_sort():
+    # Lomuto partitions of equal keys are maximally unbalanced, so the depth
+    # limit runs out. On constant input the pivot always ends at high and is
+    # never moved, so a sorted boundary >= 0 can only come from heap_range.
+    data = ADVERSARIAL["constant"]
+    steps, _ = alg.quick_sort(data, mode="introsort")
+    assert steps.array_at(-1) == sorted(data)
+    assert any(b >= 0 for b in steps.sorted_boundaries)
+
+
+def test_lomuto_overflows_where_introsort_does_not():
+    with pytest.raises(RecursionError):
+        alg.quick_sort(ADVERSARIAL["sorted"], record=False)
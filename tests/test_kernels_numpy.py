@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import algorithms as alg  # noqa: E402
+
+METRIC_KEYS = ("comparisons", "moves", "mode", "base", "passes", "skipped_passes",
+               "bucket_sizes", "empty_buckets", "oversized_buckets")
+
+
+def _inputs():
+    rng = random.Random(0)
+    return {
+        "random": [rng.randint(0, 500) for _ in range(300)],
+        "negative": [rng.randint(-400, 400) for _ in range(300)],
+        "duplicates": [rng.randint(1, 6) for _ in range(300)],
+        "wide_range": [rng.randint(-10**9, 10**9) for _ in range(300)],
+        "wide_few_distinct": [rng.choice([0, 10**8, 3 * 10**8, -10**7]) for _ in range(300)],
+        # spans past 2**63: bucket sort must not normalise in int64
+        "wide_int64_span": [-6440695883147817500, -8332644676416592816, 661906188132091940,
+                            1527169275425311224, 137165131739192724, -7637925360916934440,
+                            -7934766882869128037, 941655628529072089],
+        "wide_int64_random": [rng.randint(-2**63, 2**63 - 1) for _ in range(300)],
+        "sorted": list(range(200)),
+        "single": [7],
+        "constant": [5] * 50,
+    }
+
+
+CASES = [
+    ("counting_sort", {}),
+    ("counting_sort", {"mode": "dense"}),
+    ("counting_sort", {"mode": "sparse"}),
+    ("counting_sort", {"mode": "radix"}),
+    ("radix_sort_lsd", {"base": 10}),
+    ("radix_sort_lsd", {"base": 16}),
+    ("radix_sort_lsd", {"base": None}),
+    ("bucket_sort", {}),
+    ("bucket_sort", {"num_buckets": 4}),
+    ("bucket_sort", {"adaptive": True}),
+    ("bucket_sort", {"adaptive": True, "max_bucket": 4, "inner": "heap"}),
+    ("bucket_sort", {"adaptive": True, "max_bucket": 4, "inner": "bucket"}),
+]
+
+
+def _trace(steps):
+    return (
+        [steps.deltas(i) for i in range(len(steps))],
+        list(steps.active_indices),
+        list(steps.sorted_boundaries),
+    )
+
+
+@pytest.mark.parametrize("func_name, kwargs", CASES)
+@pytest.mark.parametrize("kind", sorted(_inputs()))
+def test_numpy_backend_matches_python(func_name, kwargs, kind):
+    data = _inputs()[kind]
+    if func_name == "counting_sort" and kwargs.get("mode") == "dense" and kind.startswith("wide"):
+        pytest.skip("dense histogram over a huge span")
+    fn = getattr(alg, func_name)
+
+    out_py, m_py = fn(data, record=False, **kwargs)
+    out_np, m_np = fn(data, record=False, backend="numpy", **kwargs)
+    assert out_np == out_py == sorted(data)
+    for key in METRIC_KEYS:
+        assert m_np.get(key) == m_py.get(key), key
+
+    steps_py, _ = fn(data, record=True, **kwargs)
+    steps_np, _ = fn(data, record=True, backend="numpy", **kwargs)
+    assert len(steps_np) == len(steps_py)
+    assert _trace(steps_np) == _trace(steps_py)
+
+
+def test_bucket_sort_floats_match_python():
+    rng = random.Random(1)
+    data = [rng.uniform(-50, 50) for _ in range(200)]
+    for kwargs in ({}, {"adaptive": True}):
+        out_py, m_py = alg.bucket_sort(data, record=False, **kwargs)
+        out_np, m_np = alg.bucket_sort(data, record=False, backend="numpy", **kwargs)
+        assert out_np == out_py == sorted(data)
+        assert m_np["comparisons"] == m_py["comparisons"]
+        assert m_np["moves"] == m_py["moves"]
+
+
+@pytest.mark.parametrize("data", [[3, 2.5, 0, 1], [2**63, 1], [2**63, -1], [1.5, None]])
+def test_bucket_sort_rejects_inputs_numpy_would_convert(data):
+    with pytest.raises(TypeError):
+        alg.bucket_sort(data, record=False, backend="numpy")
+
+
+@pytest.mark.parametrize("func_name", ["counting_sort", "radix_sort_lsd", "bucket_sort"])
+def test_uint64_past_int64_is_rejected(func_name):
+    data = list(np.array([2**63, 5], dtype=np.uint64))
+    with pytest.raises(OverflowError):
+        getattr(alg, func_name)(data, record=False, backend="numpy")
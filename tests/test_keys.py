@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+import algorithms as alg
+
+SORTS = [
+    ("insertion_sort", {}),
+    ("merge_sort", {}),
+    ("tim_sort", {}),
+    ("quick_sort", {}),
+    ("quick_sort", {"mode": "introsort"}),
+    ("counting_sort", {}),
+    ("radix_sort_lsd", {}),
+    ("heap_sort", {}),
+    ("shell_sort", {}),
+    ("bucket_sort", {}),
+    ("bucket_sort", {"adaptive": True, "inner": "heap"}),
+]
+NUMERIC_ONLY = {"counting_sort", "radix_sort_lsd", "bucket_sort"}
+
+
+def _records(n=200, seed=0):
+    rng = random.Random(seed)
+    return [{"id": i, "score": rng.randint(-20, 20), "w": rng.uniform(-5, 5),
+             "name": rng.choice("abcde")} for i in range(n)]
+
+
+@pytest.mark.parametrize("func_name, kwargs", SORTS)
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("field", ["score", "w"])
+def test_numeric_keys_match_sorted(func_name, kwargs, reverse, field):
+    recs = _records()
+    calls = []
+
+    def key(r):
+        calls.append(r["id"])
+        return r[field]
+
+    out, m = getattr(alg, func_name)(recs, record=False, key=key, reverse=reverse, **kwargs)
+    assert len(calls) == len(recs) == m["key_calls"]
+    assert out == sorted(recs, key=lambda r: r[field], reverse=reverse)
+
+
+@pytest.mark.parametrize("func_name, kwargs", SORTS)
+def test_reverse_without_key(func_name, kwargs):
+    data = [random.Random(1).randint(-10**20, 10**20) for _ in range(60)]
+    out, _ = getattr(alg, func_name)(data, record=False, reverse=True, **kwargs)
+    assert out == sorted(data, reverse=True)
+
+
+@pytest.mark.parametrize("func_name, kwargs", SORTS)
+def test_record_rejected_with_key(func_name, kwargs):
+    with pytest.raises(ValueError):
+        getattr(alg, func_name)([3, 1, 2], key=lambda x: x, **kwargs)
+    with pytest.raises(ValueError):
+        getattr(alg, func_name)([3, 1, 2], reverse=True, **kwargs)
+
+
+@pytest.mark.parametrize("func_name, kwargs", SORTS)
+def test_empty(func_name, kwargs):
+    out, m = getattr(alg, func_name)([], record=False, key=lambda x: x, **kwargs)
+    assert out == [] and m["key_calls"] == 0
+
+
+@pytest.mark.parametrize("func_name, kwargs", [s for s in SORTS if s[0] not in NUMERIC_ONLY])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_non_numeric_keys_match_sorted(func_name, kwargs, reverse):
+    recs = _records()
+    key = lambda r: (r["name"], r["score"] % 3)  # noqa: E731 - many ties
+    out, _ = getattr(alg, func_name)(recs, record=False, key=key, reverse=reverse, **kwargs)
+    assert out == sorted(recs, key=key, reverse=reverse)
+
+
+@pytest.mark.parametrize("func_name", sorted(NUMERIC_ONLY))
+def test_non_numeric_keys_need_comparison_sort(func_name):
+    with pytest.raises(TypeError):
+        getattr(alg, func_name)(["b", "a"], record=False, key=str.upper)
+
+
+@pytest.mark.parametrize("func_name", ["merge_sort", "sample_sort"])
+def test_parallel_keys(func_name):
+    fn = getattr(alg, func_name)
+    recs = _records(60)
+    out, _ = fn(recs, record=False, workers=2, key=lambda r: r["score"], reverse=True)
+    assert out == sorted(recs, key=lambda r: r["score"], reverse=True)
+    with pytest.raises(TypeError, match="float keys"):
+        fn(recs, record=False, workers=2, key=lambda r: r["w"])
+    with pytest.raises(OverflowError):
+        fn(recs, record=False, workers=2, key=lambda r: r["score"] * 2**60)
+
+
+@pytest.mark.parametrize("mode", ["auto", "dense", "sparse", "radix"])
+def test_counting_sort_counts_raw_keys(mode):
+    recs = _records(500)
+    key = lambda r: r["score"]  # noqa: E731 - span 41
+    out, m = alg.counting_sort(recs, record=False, key=key, mode=mode)
+    assert out == sorted(recs, key=key)
+    _, plain = alg.counting_sort([key(r) for r in recs], record=False, mode=mode)
+    assert m["mode"] == plain["mode"]
+    assert m["moves"] == plain["moves"]
+    if mode in ("auto", "dense"):
+        assert m["mode"] == "dense"
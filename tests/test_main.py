@@ -0,0 +1,137 @@
+import io
+import random
+import re
+
+import pytest
+
+import main
+from main import ALGORITHMS, TerminalRenderer, play
+
+_TOKEN = re.compile(r"\x1b\[(\d+);(\d+)H|\x1b\[(\d*)m|\x1b\[2J|\x1b\[2K|\x1b\[\?25[lh]|(.)", re.S)
+
+
+class Screen:
+    """Just enough of a terminal for the escapes TerminalRenderer writes."""
+
+    def __init__(self):
+        self.cells = {}
+        self.y = self.x = 1
+        self.color = "0"
+
+    def feed(self, text):
+        for m in _TOKEN.finditer(text):
+            if m.group(1):
+                self.y, self.x = int(m.group(1)), int(m.group(2))
+            elif m.group(3) is not None:
+                self.color = m.group(3) or "0"
+            elif m.group(0) == "\x1b[2J":
+                self.cells.clear()
+            elif m.group(0) == "\x1b[2K":
+                self.cells = {k: v for k, v in self.cells.items() if k[0] != self.y}
+            elif m.group(4) is not None:
+                if m.group(4) == "\n":
+                    self.y, self.x = self.y + 1, 1
+                    continue
+                self.cells[self.y, self.x] = (m.group(4), self.color)
+                self.x += 1
+
+    def bars(self, height):
+        # rows 1..height only, blanks dropped
+        return {k: v for k, v in self.cells.items() if k[0] <= height and v[0] != " "}
+
+
+class Recorder(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, s):
+        self.writes.append(s)
+        return super().write(s)
+
+
+def _full_bars(data, values, rule, active, boundary, size):
+    # bar heights scale to the input's range, as in the renderer under test
+    out = Recorder()
+    r = TerminalRenderer(data, rule, out=out, size=size)
+    r.draw_full(values, active, boundary)
+    r.flush()
+    screen = Screen()
+    screen.feed(out.getvalue())
+    return screen.bars(r.height)
+
+
+@pytest.mark.parametrize("slug", sorted(ALGORITHMS))
+def test_diff_redraw_matches_full_redraw_every_step(slug):
+    title, stream_fn, kwargs, rule = ALGORITHMS[slug]
+    rng = random.Random(0)
+    data = rng.sample(range(1, 60), 25)
+    size = (80, 20)
+    out = Recorder()
+    renderer = TerminalRenderer(data, rule, out=out, size=size)
+    screen = Screen()
+    renderer.draw_full(data)
+    renderer.flush()
+    screen.feed(out.getvalue())
+    full_bytes = len(out.getvalue())
+    stream = stream_fn(data, **kwargs)
+    for event in stream:
+        start = len(out.getvalue())
+        renderer.update(event["array"], event["written"], event["active_index"],
+                        event["sorted_boundary"])
+        renderer.flush()
+        screen.feed(out.getvalue()[start:])
+        # only changed cells are sent, far less than a redraw
+        assert len(out.getvalue()) - start < full_bytes
+        assert screen.bars(renderer.height) == _full_bars(
+            data, event["array"], rule, event["active_index"], event["sorted_boundary"], size)
+    assert stream.array == sorted(data)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.mark.parametrize("speed, fps", [(1000.0, 10.0), (50.0, 30.0)])
+def test_play_throttles_frames(monkeypatch, speed, fps):
+    clock = FakeClock()
+    monkeypatch.setattr(main, "time", clock)
+    data = list(range(40, 0, -1))
+    renderer = TerminalRenderer(data, "le", out=Recorder(), size=(80, 20))
+    flushes = []
+    original = renderer.flush
+    renderer.flush = lambda: (flushes.append(clock.now), original())
+    title, stream_fn, kwargs, _ = ALGORITHMS["insertion"]
+    steps = play(stream_fn(data, **kwargs), renderer, title, speed=speed, fps=fps)
+    assert steps > 700
+    # playback takes steps / speed seconds, with at most fps frames a second
+    assert clock.now == pytest.approx(steps / speed, rel=0.05)
+    frames = flushes[1:-1]
+    assert len(frames) <= clock.now * fps + 1
+    assert min(b - a for a, b in zip(frames, frames[1:])) >= 1 / fps - 1e-9
+
+
+def test_main_plays_given_values(monkeypatch, capsys):
+    monkeypatch.setattr(main.time, "sleep", lambda s: None)
+    monkeypatch.setenv("COLUMNS", "80")
+    monkeypatch.setenv("LINES", "24")
+    main.main(["--algorithm", "heap", "--values", "5", "3", "9", "1", "--speed", "1e6",
+               "--no-color"])
+    text = capsys.readouterr().out
+    assert "Heap Sort" in text and "comparisons" in text
+    assert "\x1b[31m" not in text  # --no-color
+    assert text.endswith("\x1b[?25h\n")  # cursor shown again
+
+
+def test_main_rejects_too_many_bars(monkeypatch):
+    monkeypatch.setenv("COLUMNS", "10")
+    monkeypatch.setenv("LINES", "24")
+    with pytest.raises(SystemExit):
+        main.main(["--n", "40"])
@@ -0,0 +1,81 @@
+import tracemalloc
+
+import pytest
+
+import algorithms as alg
+from benchmark import _run_job, summarize
+
+MEMORY_KEYS = {"peak_bytes", "aux_bytes", "trace_bytes"}
+DATA = list(range(2000, 0, -1))
+
+
+def test_metrics_unchanged_outside_profile():
+    _, m = alg.merge_sort(DATA, record=False)
+    assert not MEMORY_KEYS & m.keys()
+
+
+@pytest.mark.parametrize("fn", [alg.insertion_sort, alg.merge_sort, alg.heap_sort,
+                                alg.counting_sort, alg.bucket_sort])
+def test_profile_adds_memory_metrics(fn):
+    data = DATA[:300]
+    with alg.memory_profile():
+        steps, mt = fn(data, record=True)
+        _, mm = fn(data, record=False)
+    assert MEMORY_KEYS <= mt.keys() and MEMORY_KEYS <= mm.keys()
+    assert mt["trace_bytes"] == steps.nbytes > 0
+    assert mm["trace_bytes"] == 0
+    assert mt["peak_bytes"] >= mt["trace_bytes"]
+    assert mt["aux_bytes"] == max(0, mt["peak_bytes"] - mt["trace_bytes"])
+    assert mm["aux_bytes"] == mm["peak_bytes"]
+
+
+def test_aux_bytes_reflect_auxiliary_space():
+    # merge sort copies out n values, heap sort sorts in place
+    with alg.memory_profile():
+        _, merge = alg.merge_sort(DATA, record=False)
+        _, heap = alg.heap_sort(DATA, record=False)
+    assert merge["aux_bytes"] >= 8 * len(DATA) // 2
+    assert heap["aux_bytes"] < merge["aux_bytes"] / 4
+
+
+def test_nested_runs_report_the_outer_run():
+    # bucket sort runs its inner sorts through _run; the figures stay those
+    # of the whole bucket sort
+    with alg.memory_profile():
+        _, m = alg.bucket_sort(DATA, record=False, adaptive=True, max_bucket=8, inner="heap")
+    assert m["peak_bytes"] > 0
+
+
+def test_tracemalloc_is_restored():
+    assert not tracemalloc.is_tracing()
+    with alg.memory_profile():
+        assert tracemalloc.is_tracing()
+        with alg.memory_profile():
+            pass
+        _, m = alg.insertion_sort([3, 1, 2], record=False)
+        assert "peak_bytes" in m
+    assert not tracemalloc.is_tracing()
+    _, m = alg.insertion_sort([3, 1, 2], record=False)
+    assert "peak_bytes" not in m
+
+    tracemalloc.start()
+    try:
+        with alg.memory_profile():
+            pass
+        assert tracemalloc.is_tracing()  # someone else's session stays on
+    finally:
+        tracemalloc.stop()
+
+
+def test_benchmark_memory_columns():
+    data = DATA[:200]
+    results = [_run_job(name, func_name, {}, data, run, 0, memory=True)
+               for run in range(2)
+               for name, func_name in (("Merge Sort", "merge_sort"), ("Heap Sort", "heap_sort"))]
+    assert all(MEMORY_KEYS <= r.keys() for r in results if r["run"] == 0)
+    assert not any(MEMORY_KEYS & r.keys() for r in results if r["run"] == 1)
+    rows = {row["Algorithm"]: row for row in summarize(results)}
+    for row in rows.values():
+        assert {"Peak_KB", "Aux_KB", "Trace_KB"} <= row.keys()
+        assert row["Trace_KB"] > 0
+    assert rows["Merge Sort"]["Aux_KB"] > rows["Heap Sort"]["Aux_KB"]
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+import algorithms as alg
+from parallel import _splitters, parallel_merge_sort, parallel_sample_sort
+
+SORTS = [parallel_merge_sort, parallel_sample_sort]
+
+
+@pytest.mark.parametrize("sort", SORTS)
+@pytest.mark.parametrize("data", [
+    [5, -3, 2**62, 0, 7, -2**63, 1, 1],
+    [2.5, -1.0, 3.25, 0.0, -7.5, 2.5],
+])
+def test_parallel_sorts_int_and_float_input(sort, data):
+    out, m = sort(data, workers=1)
+    assert out == sorted(data)
+    assert all(type(v) is type(data[0]) for v in out)
+    assert m["workers"] == 1
+
+
+@pytest.mark.parametrize("sort", SORTS)
+@pytest.mark.parametrize("data", [
+    [3, 1.5, True],
+    [2**53 + 1, 0.5],
+    [1, 2, None],
+    [1.0, 2.0, "x"],
+])
+def test_parallel_sorts_reject_mixed_input(sort, data):
+    with pytest.raises(TypeError):
+        sort(data, workers=1)
+
+
+def test_merge_sort_workers_rejects_mixed_input():
+    with pytest.raises(TypeError):
+        alg.merge_sort([3, 1.5, True], record=False, workers=2)
+
+
+def test_parallel_sorts_reject_int64_overflow():
+    with pytest.raises(OverflowError):
+        parallel_merge_sort([1 << 63, 0], workers=1)
+
+
+def test_sample_sort_buckets_are_balanced():
+    rng = random.Random(0)
+    data = [rng.randint(0, 10**9) for _ in range(100_000)]
+    out, m = parallel_sample_sort(data, workers=4)
+    assert out == sorted(data)
+    assert sum(m["bucket_sizes"]) == len(data)
+    assert max(m["bucket_sizes"]) <= 1.5 * len(data) / 4
+
+
+def test_splitters_oversample_per_worker():
+    # distinct ranks 0..n-1: bucket sizes follow from the splitters directly
+    n, workers = 20_000, 8
+    data = list(range(n))
+    worst = []
+    for seed in range(40):
+        splitters, comparisons = _splitters(data, workers, seed)
+        assert len(splitters) == workers - 1 and splitters == sorted(splitters)
+        assert comparisons > 0
+        cuts = [0] + splitters + [n]
+        worst.append(max(b - a for a, b in zip(cuts, cuts[1:])) * workers / n)
+    # 8 samples per bucket (the bucket sort's sampling) average about 1.55
+    assert sum(worst) / len(worst) < 1.35
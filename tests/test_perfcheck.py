@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+import perfcheck
+from benchmark import ALGORITHMS
+
+QUICK = [a for a in ALGORITHMS if a[0] in ("Quick Sort", "Quick Sort (Introsort)", "Merge Sort")]
+
+
+def test_measure_skips_algorithms_that_overflow_the_stack():
+    lines = []
+    results = perfcheck.measure(list(range(2000)), samples=2, min_time=0.0,
+                                algorithms=QUICK, log=lines.append)
+    assert set(results) == {"Merge Sort", "Quick Sort (Introsort)"}
+    assert any("Quick Sort" in line and "RecursionError" in line for line in lines)
+
+
+@pytest.mark.parametrize("distribution", ["sorted", "reversed"])
+def test_presorted_distributions_still_save_a_baseline(tmp_path, monkeypatch, distribution):
+    measure = perfcheck.measure
+    monkeypatch.setattr(perfcheck, "measure", lambda data, samples, min_time: measure(
+        data, samples, min_time, algorithms=QUICK, log=lambda _: None))
+    path = tmp_path / "base.json"
+    perfcheck.main(["--distribution", distribution, "--samples", "2", "--min-time", "0",
+                    "--save", str(path)])
+    baseline = json.loads(path.read_text())
+    assert set(baseline["results"]) == {"Merge Sort", "Quick Sort (Introsort)"}
@@ -0,0 +1,15 @@
+import pytest
+
+import algorithms as alg
+from probe import probe_run
+
+
+def test_probe_counts_plain_run():
+    _, m = probe_run(alg.insertion_sort, [3, 1, 2])
+    assert m["probe"]["comparisons"] > 0 and m["probe"]["writes"] > 0
+
+
+@pytest.mark.parametrize("kwargs", [{"key": abs}, {"reverse": True}, {"workers": 2}])
+def test_probe_rejects_uninstrumentable_runs(kwargs):
+    with pytest.raises(ValueError):
+        probe_run(alg.merge_sort, [3, 1, 2], **kwargs)
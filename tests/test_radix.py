@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+import algorithms as alg
+from algorithms import _radix_keys
+
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+
+
+@pytest.mark.parametrize("minv, maxv, bias", [
+    (0, 9, 0),
+    (-1, 0, 1),
+    (-8, 3, 8),
+    (-8, 7, 8),
+    (-8, 8, 16),
+    (-9, 3, 16),
+    (-2**31, 5, 2**31),
+    (INT64_MIN, 0, 2**63),
+    (INT64_MIN, INT64_MAX, 2**63),
+    (-1, INT64_MAX, 2**63),
+])
+def test_radix_keys_bias_is_twos_complement_width(minv, maxv, bias):
+    assert _radix_keys(minv, maxv) == (bias, maxv + bias)
+
+
+def _edge_inputs():
+    rng = random.Random(0)
+    out = {f"-2**{k}": [rng.randint(-2**k, 2**k - 1) for _ in range(50)] + [-2**k]
+           for k in (0, 3, 7, 31, 62)}
+    out["int64"] = [INT64_MIN, INT64_MAX, 0, -1, 1] + [rng.randint(INT64_MIN, INT64_MAX)
+                                                      for _ in range(50)]
+    return out
+
+
+
+@pytest.mark.parametrize("name, data", list(_edge_inputs().items()))
+@pytest.mark.parametrize("base", [10, 16, None])
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_radix_sort_sorts_power_of_two_minimum(name, data, base, backend):
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+    out, _ = alg.radix_sort_lsd(data, base=base, record=False, backend=backend)
+    assert out == sorted(data)
+
+
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_counting_sort_sorts_int64_extremes(backend):
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+    data = [INT64_MIN, 3, INT64_MAX, 0, INT64_MIN, -5]
+    out, _ = alg.counting_sort(data, record=False, backend=backend)
+    assert out == sorted(data)
@@ -0,0 +1,72 @@
+import random
+import tracemalloc
+
+import pytest
+
+import algorithms as alg
+from steptrace import StepTrace
+
+CASES = [
+    ("insertion_sort", {}),
+    ("merge_sort", {}),
+    ("tim_sort", {}),
+    ("quick_sort", {}),
+    ("quick_sort", {"mode": "introsort"}),
+    ("counting_sort", {}),
+    ("counting_sort", {"mode": "dense"}),
+    ("counting_sort", {"mode": "sparse"}),
+    ("counting_sort", {"mode": "radix"}),
+    ("radix_sort_lsd", {"base": 10}),
+    ("radix_sort_lsd", {"base": None}),
+    ("heap_sort", {}),
+    ("shell_sort", {}),
+    ("bucket_sort", {}),
+    ("bucket_sort", {"adaptive": True, "max_bucket": 4, "inner": "heap"}),
+    ("bucket_sort", {"adaptive": True, "inner": "bucket"}),
+]
+
+
+def _inputs():
+    rng = random.Random(0)
+    return {
+        "empty": [],
+        "single": [4],
+        "random": [rng.randint(-50, 200) for _ in range(150)],
+        "duplicates": [rng.randint(0, 3) for _ in range(150)],
+        "reversed": list(range(150, 0, -1)),
+    }
+
+
+@pytest.mark.parametrize("func_name, kwargs", CASES)
+@pytest.mark.parametrize("kind", sorted(_inputs()))
+def test_metrics_only_matches_recorded_run(func_name, kwargs, kind):
+    data = _inputs()[kind]
+    fn = getattr(alg, func_name)
+    out, m = fn(data, record=False, **kwargs)
+    steps, m_rec = fn(data, record=True, **kwargs)
+    assert isinstance(out, list) and isinstance(steps, StepTrace)
+    assert out == sorted(data)
+    assert (steps.array_at(-1) if len(steps) else data) == out
+    assert data == _inputs()[kind]
+    assert m.keys() == m_rec.keys()
+    for key in m:
+        if key != "seconds":
+            assert m[key] == m_rec[key], key
+
+
+def _peak(fn, data, record):
+    tracemalloc.start()
+    try:
+        fn(data, record=record)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("fn", [alg.insertion_sort, alg.heap_sort, alg.shell_sort])
+def test_metrics_only_allocates_nothing_per_step(fn):
+    # n = 400 reversed: thousands of steps, but only O(n) memory
+    data = list(range(400, 0, -1))
+    peak = _peak(fn, data, record=False)
+    assert peak < 512 * len(data)
+    assert _peak(fn, data, record=True) > 10 * peak
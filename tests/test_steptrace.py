@@ -0,0 +1,173 @@
+import random
+import struct
+import sys
+from array import array
+
+import pytest
+
+import algorithms as alg
+from benchmark import ALGORITHMS
+from steptrace import StepTrace, select_frames
+
+
+def _traces():
+    rng = random.Random(0)
+    inputs = {
+        "reversed": list(range(40, 0, -1)),
+        "random": [rng.randint(1, 60) for _ in range(40)],
+    }
+    for name, func_name, kwargs in ALGORITHMS:
+        for kind, data in inputs.items():
+            steps, _ = getattr(alg, func_name)(data, record=True, **kwargs)
+            yield f"{name}-{kind}", steps
+
+
+@pytest.mark.parametrize("label, steps", list(_traces()))
+def test_select_frames_every_budget(label, steps):
+    n_steps = len(steps)
+    for budget in range(1, 2001):
+        frames = select_frames(steps, budget)
+        assert frames == sorted(set(frames))
+        assert len(frames) <= max(budget, 2)
+        if n_steps:
+            assert frames[0] == 0 and frames[-1] == n_steps - 1
+        if n_steps <= max(budget, 2):
+            assert frames == list(range(n_steps))
+
+
+@pytest.mark.parametrize("fn, n, budget", [
+    (alg.merge_sort, 278, 300),
+    (alg.heap_sort, 127, 250),
+])
+def test_select_frames_budget_equal_to_boundaries(fn, n, budget):
+    steps, _ = fn(list(range(n, 0, -1)))
+    frames = select_frames(steps, budget)
+    assert frames[-1] == len(steps) - 1
+    assert len(frames) <= budget
+
+
+def test_select_frames_without_budget():
+    steps, _ = alg.insertion_sort([3, 1, 2])
+    assert select_frames(steps, None) == list(range(len(steps)))
+
+
+def _random_trace(rng, initial, steps, keyframe_interval):
+    # random writes through record/record_pass next to full snapshots
+    a = list(initial)
+    trace = StepTrace(a, keyframe_interval=keyframe_interval)
+    snapshots = []
+    for s in range(steps):
+        if rng.random() < 0.1:
+            after = [rng.choice(initial) for _ in range(rng.randint(1, len(a)))]
+            trace.record_pass(after)
+            for i, v in enumerate(after):
+                a[i] = v
+                snapshots.append((list(a), i, i))
+            continue
+        written = rng.sample(range(len(a)), rng.randint(0, 3))
+        for i in written:
+            a[i] = rng.choice(initial)
+        trace.record(a, written, s % len(a), s % 5 - 1)
+        snapshots.append((list(a), s % len(a), s % 5 - 1))
+    return trace, snapshots
+
+
+@pytest.mark.parametrize("initial", [
+    [5, 3, 9, 1, 7, 2],
+    [0.5, -2.25, 3.0, 1e300, 7.5],
+    [2**70, 1, -3, 2**64],  # past int64: plain list storage
+    ["b", "a", "c"],
+])
+@pytest.mark.parametrize("keyframe_interval", [1, 3, 7, None])
+def test_steptrace_rebuilds_every_step(initial, keyframe_interval):
+    rng = random.Random(len(initial))
+    trace, snapshots = _random_trace(rng, initial, 200, keyframe_interval)
+    assert len(trace) == len(snapshots)
+    assert trace.initial == initial
+    for i, (arr, active, boundary) in enumerate(snapshots):
+        assert trace[i] == {"array": arr, "active_index": active, "sorted_boundary": boundary}
+        assert trace[i - len(trace)] == trace[i]
+    assert list(trace) == [trace[i] for i in range(len(trace))]
+    assert trace[10:20:3] == [trace[i] for i in range(10, 20, 3)]
+    with pytest.raises(IndexError):
+        trace[len(trace)]
+
+
+def test_steptrace_deltas_chain_old_and_new_values():
+    rng = random.Random(1)
+    trace, snapshots = _random_trace(rng, [4, 8, 15, 16, 23, 42], 100, 5)
+    prev = trace.initial
+    for i, (arr, _, _) in enumerate(snapshots):
+        cur = list(prev)
+        for index, old, new in trace.deltas(i):
+            assert cur[index] == old
+            cur[index] = new
+        assert cur == arr
+        prev = arr
+
+
+@pytest.mark.parametrize("name, func_name, kwargs", ALGORITHMS)
+def test_algorithm_traces_match_streamed_snapshots(name, func_name, kwargs):
+    # the trace against full copies taken while the same sort streams
+    rng = random.Random(2)
+    data = [rng.randint(-20, 60) for _ in range(60)]
+    trace, _ = getattr(alg, func_name)(data, **kwargs)
+    stream = getattr(alg, f"{func_name}_stream")(data, **kwargs)
+    snapshots = [(e["array"].copy(), e["active_index"], e["sorted_boundary"]) for e in stream]
+    assert [(s["array"], s["active_index"], s["sorted_boundary"]) for s in trace] == snapshots
+    assert trace.array_at(len(trace) // 2) == snapshots[len(trace) // 2][0]
+
+
+def test_steptrace_stays_smaller_than_snapshots():
+    data = list(range(300, 0, -1))
+    trace, _ = alg.insertion_sort(data)
+    full = len(trace) * len(data) * 8
+    assert trace.nbytes < full / 20
+
+
+def _unpack(raw):
+    # reader for the to_bytes layout, as frontend/trace_player does it
+    magic, version, n, steps, writes, kind = struct.unpack_from("<4s5I", raw)
+    assert (magic, version) == (b"STRC", 1)
+    pos = 24
+    value = "i" if kind == 0 else "d"
+
+    def section(typecode, count):
+        nonlocal pos
+        buf = array(typecode)
+        buf.frombytes(raw[pos:pos + count * buf.itemsize])
+        if sys.byteorder == "big":
+            buf.byteswap()
+        pos += count * buf.itemsize
+        pos += -pos % 8
+        return buf.tolist()
+
+    initial = section(value, n)
+    counts = section("I", steps)
+    index = section("I", writes)
+    new = section(value, writes)
+    active = section("i", steps)
+    boundary = section("i", steps)
+    assert pos == len(raw)
+    a, frames, d = list(initial), [], 0
+    for s in range(steps):
+        for _ in range(counts[s]):
+            a[index[d]] = new[d]
+            d += 1
+        frames.append({"array": list(a), "active_index": active[s],
+                       "sorted_boundary": boundary[s]})
+    return initial, frames
+
+
+@pytest.mark.parametrize("fn, data", [
+    (alg.insertion_sort, [5, -3, 9, 1, 7, 2, 2, 0]),
+    (alg.merge_sort, [5, -3, 9, 1, 7, 2, 2, 0]),
+    (alg.counting_sort, [5, -3, 9, 1, 7, 2, 2, 0]),
+    (alg.merge_sort, [0.5, -2.25, 3.0, 1.5]),
+    (alg.insertion_sort, [2**40, 3, -2**40]),  # past int32: sent as float64
+])
+def test_to_bytes_round_trip(fn, data):
+    trace, _ = fn(data)
+    initial, frames = _unpack(trace.to_bytes())
+    assert initial == data
+    assert frames == list(trace)
@@ -0,0 +1,73 @@
+import random
+import time
+
+import pytest
+
+import algorithms as alg
+from benchmark import ALGORITHMS
+
+
+def _data(n=80, seed=0):
+    rng = random.Random(seed)
+    return [rng.randint(-30, 90) for _ in range(n)]
+
+
+@pytest.mark.parametrize("name, func_name, kwargs", ALGORITHMS)
+def test_stream_matches_batch_run(name, func_name, kwargs):
+    data = _data()
+    stream = getattr(alg, f"{func_name}_stream")(data, **kwargs)
+    events = 0
+    for event in stream:
+        assert event["array"] is stream.array  # live list, nothing copied
+        assert set(event) == {"array", "written", "active_index", "sorted_boundary"}
+        events += 1
+    steps, m = getattr(alg, func_name)(data, **kwargs)
+    assert events == len(steps)
+    assert stream.array == sorted(data)
+    assert data == _data()  # input untouched
+    for key in ("comparisons", "moves"):
+        assert stream.metrics[key] == m[key]
+    assert stream.metrics["seconds"] >= 0
+
+
+def test_stream_is_lazy():
+    # the first event arrives before the sort has done its work
+    data = list(range(3000, 0, -1))
+    stream = alg.insertion_sort_stream(data)
+    first = next(stream)
+    assert stream.metrics is None
+    assert first["written"] == (1,)  # a[1] = a[0], the first shift
+    assert stream.array != sorted(data)
+
+
+def test_stream_written_indices_replay_the_sort():
+    data = _data(seed=3)
+    stream = alg.merge_sort_stream(data)
+    shadow = list(data)
+    for event in stream:
+        for i in event["written"]:
+            shadow[i] = event["array"][i]
+        assert shadow == event["array"]
+    assert shadow == sorted(data)
+
+
+def test_stream_run_drains_and_stays_exhausted():
+    stream = alg.quick_sort_stream(_data(seed=4), mode="introsort")
+    next(stream)
+    metrics = stream.run()
+    assert metrics is stream.metrics
+    assert stream.array == sorted(_data(seed=4))
+    assert list(stream) == []
+    with pytest.raises(StopIteration):
+        next(stream)
+
+
+def test_stream_seconds_exclude_consumer_time():
+    stream = alg.insertion_sort_stream(list(range(200, 0, -1)))
+    waited = 0.0
+    for _ in stream:
+        start = time.perf_counter()
+        while time.perf_counter() - start < 1e-5:
+            pass
+        waited += time.perf_counter() - start
+    assert stream.metrics["seconds"] < waited
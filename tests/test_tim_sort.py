@@ -0,0 +1,86 @@
+import functools
+import random
+
+import algorithms as alg
+
+
+@functools.total_ordering
+class Item:
+    """Compares by key only; tag tells equal items apart."""
+
+    def __init__(self, key, tag):
+        self.key, self.tag = key, tag
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+    def __repr__(self):
+        return f"Item({self.key}, {self.tag})"
+
+
+def _runs_input(rng, n):
+    # concatenated ascending and descending runs of varying length, few
+    # distinct values, so merges gallop and tie often
+    out = []
+    while len(out) < n:
+        length = rng.choice([1, 2, 7, 8, 30, 64, 200, 1000])
+        run = sorted(rng.randint(0, rng.choice([3, 20, 10**6])) for _ in range(length))
+        if rng.random() < 0.3:
+            run.reverse()
+        out.extend(run)
+    return out[:n]
+
+
+def _gallop_inputs():
+    half = list(range(0, 2000, 2))
+    return {
+        # every element of one run beats the other: one gallop empties a side
+        "disjoint": list(range(1000, 2000)) + list(range(1000)),
+        "interleaved": half + [v + 1 for v in half],
+        # long winning streaks that end right at a run boundary
+        "blocks": [v for b in range(20) for v in range(b * 50, b * 50 + 50)][::-1],
+        "one_small": list(range(1, 1500)) + [0],
+        "one_large": [10**6] + list(range(1500)),
+        "equal_runs": [5] * 700 + [3] * 700 + [5] * 700,
+    }
+
+
+def test_tim_sort_fuzz_against_sorted():
+    rng = random.Random(0)
+    for _ in range(150):
+        data = _runs_input(rng, rng.choice([0, 1, 63, 64, 65, 500, 3000]))
+        out, m = alg.tim_sort(data, record=False)
+        assert out == sorted(data)
+        assert m["comparisons"] >= 0 and m["moves"] >= 0
+
+
+def test_tim_sort_gallop_patterns():
+    for name, data in _gallop_inputs().items():
+        out, _ = alg.tim_sort(data, record=False)
+        assert out == sorted(data), name
+        steps, _ = alg.tim_sort(data)
+        assert steps.array_at(-1) == out, name
+
+
+def test_tim_sort_is_stable():
+    rng = random.Random(1)
+    for _ in range(60):
+        keys = _runs_input(rng, rng.choice([100, 700, 2500]))
+        items = [Item(k, i) for i, k in enumerate(keys)]
+        out, _ = alg.tim_sort(items, record=False)
+        assert [(x.key, x.tag) for x in out] == sorted((x.key, x.tag) for x in items)
+    for data in _gallop_inputs().values():
+        items = [Item(k // 7, i) for i, k in enumerate(data)]
+        out, _ = alg.tim_sort(items, record=False)
+        assert [(x.key, x.tag) for x in out] == sorted((x.key, x.tag) for x in items)
+
+
+def test_tim_sort_key_matches_sorted():
+    rng = random.Random(2)
+    records = [(rng.randint(0, 9), i) for i in range(3000)]
+    for reverse in (False, True):
+        out, _ = alg.tim_sort(records, record=False, key=lambda r: r[0], reverse=reverse)
+        assert out == sorted(records, key=lambda r: r[0], reverse=reverse)
@@ -0,0 +1,40 @@
+# trace_player.py - Streamlit component that plays a StepTrace in the browser
+#
+# The server sends only the packed trace (StepTrace.to_bytes: initial array +
+# per-step write deltas + active/boundary indices) and a color rule; playback,
+# scrubbing and speed control run in frontend/trace_player/index.html.
+import base64
+import os
+
+import streamlit.components.v1 as components
+
+_FRONTEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "trace_player")
+_component = components.declare_component("trace_player", path=_FRONTEND)
+
+# How a bar j is colored for (active_index a, sorted_boundary b); "rule" is
+# one of "le" (j <= b), "ge" (j >= b, b != -1), "eq" (j == b) or "none".
+# Mirrors the *_colors functions in app.py.
+PALETTES = {
+    "insertion": {"active": "red", "sorted": "green", "rule": "le"},
+    "merge": {"active": "purple", "sorted": "blue", "rule": "le"},
+    "quick": {"active": "orange", "sorted": "green", "rule": "eq"},
+    "counting": {"active": "purple", "sorted": "green", "rule": "eq"},
+    "radix": {"active": "purple", "sorted": "green", "rule": "le"},
+    "heap": {"active": "orange", "sorted": "green", "rule": "ge"},
+    "shell": {"active": "orange", "sorted": "gray", "rule": "none"},
+    "bucket": {"active": "purple", "sorted": "green", "rule": "le"},
+}
+
+
+def trace_player(steps, title, palette, fps=10, height=460, key=None):
+    """Render `steps` (a StepTrace) with the client-side player."""
+    payload = base64.b64encode(steps.to_bytes()).decode("ascii")
+    return _component(
+        trace=payload,
+        title=title,
+        palette=PALETTES.get(palette, palette),
+        fps=fps,
+        height=height,
+        key=key,
+        default=None,
+    )